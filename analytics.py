@@ -1,6 +1,19 @@
 """
 MCP Client Proxy Analytics Module
 Provides opt-out, privacy-focused analytics using PostHog
+
+Tracking never does work on the caller's thread beyond appending a tuple to a
+bounded deque. A single background worker merges the default properties
+(computed once per process), formats timestamps and hands batches to PostHog
+when FLUSH_BATCH_SIZE events are queued or every FLUSH_INTERVAL seconds. If
+the queue is full, the oldest events are dropped instead of blocking.
+
+When PostHog cannot be reached (air-gapped test networks), failed events go to
+an append-only JSONL spool under <cache root>/analytics instead, and so do new
+ones until the next retry. Each PostHog host and project key has a spool of
+its own, so events are only ever resent to the project they were meant for. The spool is sent at the next start or retry
+(SPOOL_RETRY_INTERVAL). Exit never waits more than EXIT_FLUSH_TIMEOUT seconds
+for PostHog; whatever could not be confirmed sent is left in the spool.
 """
 
 import os
@@ -9,11 +22,17 @@ import uuid
 import platform
 import hashlib
 import atexit
+import json
+import threading
+import time
+from collections import deque
 from typing import Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 from functools import wraps
 import logging
 
+from tools_cache import cache_root
+
 # Import configuration
 try:
     from analytics_config import (
@@ -42,6 +61,97 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Event queue limits (see module docstring)
+MAX_QUEUED_EVENTS = 1000
+FLUSH_BATCH_SIZE = 50
+FLUSH_INTERVAL = 5.0
+
+# Offline spool (see module docstring)
+SPOOL_MAX_BYTES = 1024 * 1024
+SPOOL_RETRY_INTERVAL = 300.0
+EXIT_FLUSH_TIMEOUT = 2.0
+
+
+def spool_path(host: str, api_key: str) -> str:
+    """Spool file for the events of one PostHog host and project key"""
+    digest = hashlib.sha256(f"{host}\n{api_key}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_root(), "analytics", f"spool-{digest}.jsonl")
+
+
+class EventSpool:
+    """
+    Append-only JSONL file of events that could not be sent
+
+    When an append would take the file past max_bytes it is rotated to
+    "<path>.1" (replacing the previous rotation), so the spool never uses
+    more than about twice max_bytes.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = SPOOL_MAX_BYTES):
+        """
+        Initialize the spool
+
+        Args:
+            path: Spool file (default: <cache root>/analytics/spool.jsonl)
+            max_bytes: Size at which the file is rotated
+        """
+        self.path = path or os.path.join(cache_root(), "analytics", "spool.jsonl")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def append(self, records: list):
+        """Append events (dicts) to the spool; I/O errors are ignored"""
+        if not records:
+            return
+        data = "".join(json.dumps(record, default=str) + "\n" for record in records)
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                try:
+                    size = os.path.getsize(self.path)
+                except OSError:
+                    size = 0
+                if size and size + len(data) > self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(data)
+            except OSError:
+                pass
+
+    def take(self) -> list:
+        """Remove and return every spooled event, oldest first"""
+        records = []
+        seen = set()
+        with self._lock:
+            for path in (self.path + ".1", self.path):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        for line in f:
+                            try:
+                                record = json.loads(line)
+                            except ValueError:
+                                continue  # torn write from a killed process
+                            event_id = record.get("uuid")
+                            if event_id in seen:
+                                continue
+                            seen.add(event_id)
+                            records.append(record)
+                    os.remove(path)
+                except OSError:
+                    continue
+        return records
+
+    def __len__(self) -> int:
+        """Number of spooled events"""
+        count = 0
+        for path in (self.path + ".1", self.path):
+            try:
+                with open(path, "rb") as f:
+                    count += sum(1 for _ in f)
+            except OSError:
+                continue
+        return count
+
 
 class MCPAnalytics:
     """
@@ -76,21 +186,31 @@ class MCPAnalytics:
         self.posthog = None
         self.session_id = str(uuid.uuid4())
         self.anonymous_id = self._generate_anonymous_id()
+        # Deque appends/pops are atomic, so producers never take a lock
+        self._queue: deque = deque(maxlen=MAX_QUEUED_EVENTS)
+        self._dropped_events = 0
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._worker: Optional[threading.Thread] = None
+        self._default_props = self._build_default_properties()
+        # Use provided key, environment variable, or configured key
+        self.api_key = (
+            api_key or 
+            os.getenv('MCP_POSTHOG_API_KEY') or 
+            POSTHOG_API_KEY
+        )
+        
+        # Use provided host or configured host
+        self.host = host or POSTHOG_HOST
+        self.spool = EventSpool(spool_path(self.host, self.api_key))
+        self._offline_since: Optional[float] = None  # monotonic time of the last upload failure
+        # Events handed to PostHog that it may not have uploaded yet (spooled if exit cuts the flush short)
+        self._unconfirmed = deque(maxlen=MAX_QUEUED_EVENTS)
         
         if self.debug:
             print(f"[Analytics Debug] Initializing - Enabled: {self.enabled}, Debug: {self.debug}")
         
         if self.enabled and POSTHOG_AVAILABLE:
-            # Use provided key, environment variable, or configured key
-            self.api_key = (
-                api_key or 
-                os.getenv('MCP_POSTHOG_API_KEY') or 
-                POSTHOG_API_KEY
-            )
-            
-            # Use provided host or configured host
-            self.host = host or POSTHOG_HOST
-            
             if self.debug:
                 print(f"[Analytics Debug] API Key: {self.api_key[:20] if self.api_key else 'NOT SET'}...")
                 print(f"[Analytics Debug] Host: {self.host}")
@@ -109,6 +229,10 @@ class MCPAnalytics:
                     on_error=self._on_error
                 )
                 
+                self._worker = threading.Thread(target=self._flush_loop, daemon=True,
+                                                name="MCPAnalyticsFlush")
+                self._worker.start()
+
                 # Register cleanup on exit
                 atexit.register(self._cleanup)
                 
@@ -178,10 +302,20 @@ class MCPAnalytics:
             return str(uuid.uuid4())[:16]
     
     def _on_error(self, error: Exception, items: list):
-        """Handle PostHog errors gracefully."""
+        """Handle PostHog upload failures: go offline and spool the failed events."""
         if self.debug:
             print(f"[Analytics Debug] PostHog error: {error}")
             print(f"[Analytics Debug] Failed items: {len(items) if items else 0}")
+        self._offline_since = time.monotonic()
+        records = [self._spool_record(item) for item in (items or []) if isinstance(item, dict)]
+        self.spool.append(records)
+        if self.debug and records:
+            print(f"[Analytics Debug] Spooled {len(records)} events to {self.spool.path}")
+
+    @staticmethod
+    def _spool_record(item: Dict[str, Any]) -> Dict[str, Any]:
+        """Reduce a PostHog message to what capture() needs to resend it"""
+        return {key: item.get(key) for key in ('event', 'distinct_id', 'properties', 'timestamp', 'uuid')}
     
     def _cleanup(self):
         """Clean up and send final events on exit."""
@@ -191,19 +325,54 @@ class MCPAnalytics:
             
             if self.enabled and self.posthog:
                 self.track_session_end()
-                # Ensure all events are sent
-                self.posthog.flush()
-                self.posthog.shutdown()
-                
-                if self.debug:
+                self._stop_worker()
+
+                if self._offline_since is not None:
+                    # Everything went to the spool; PostHog would only sit in its retries
+                    if self.debug:
+                        print(f"[Analytics Debug] Cleanup: Offline, {len(self.spool)} events left in {self.spool.path}")
+                    return
+
+                # Ensure all events are sent, but never hold up process exit for it
+                flusher = threading.Thread(target=self._flush_and_shutdown, daemon=True,
+                                           name="MCPAnalyticsExit")
+                flusher.start()
+                flusher.join(EXIT_FLUSH_TIMEOUT)
+                if flusher.is_alive():
+                    # Keep what PostHog may not have sent for the next run
+                    # (the spool drops duplicate uuids, in case _on_error got there too)
+                    unconfirmed = list(self._unconfirmed)
+                    self.spool.append(unconfirmed)
+                    if self.debug:
+                        print(f"[Analytics Debug] Cleanup: Flush did not finish in {EXIT_FLUSH_TIMEOUT}s, "
+                              f"spooled {len(unconfirmed)} events")
+                elif self.debug:
                     print("[Analytics Debug] Cleanup: Events flushed and client shutdown")
         except Exception as e:
             if self.debug:
                 print(f"[Analytics Debug] Error during analytics cleanup: {e}")
     
+    def _flush_and_shutdown(self):
+        try:
+            self.posthog.flush()
+            self.posthog.shutdown()
+        except Exception as e:
+            if self.debug:
+                print(f"[Analytics Debug] Error flushing PostHog: {e}")
+
+    def _build_default_properties(self) -> Dict[str, Any]:
+        """Properties attached to every event; they cannot change during a run, so computed once"""
+        return {
+            'session_id': self.session_id,
+            'version': self._get_version(),
+            'os': platform.system(),
+            'os_version': platform.version(),
+            'python_version': platform.python_version(),
+        }
+
     def _safe_track(self, event_name: str, properties: Optional[Dict[str, Any]] = None):
         """
-        Safely track an event with error handling.
+        Queue an event for the background worker (never blocks, never raises).
         
         Args:
             event_name: Name of the event to track
@@ -213,35 +382,115 @@ class MCPAnalytics:
             if self.debug:
                 print(f"[Analytics Debug] Skipping event '{event_name}' - Analytics disabled or not initialized")
             return
-        
+
+        queue = self._queue
+        if len(queue) == MAX_QUEUED_EVENTS:
+            self._dropped_events += 1  # the append below evicts the oldest event
+        queue.append((event_name, properties, time.time()))
+        if len(queue) >= FLUSH_BATCH_SIZE:
+            self._wakeup.set()
+
+        if self.debug:
+            print(f"[Analytics Debug] Queued event: {event_name}")
+            if properties:
+                print(f"[Analytics Debug]   Properties: {properties}")
+
+    def _flush_loop(self):
+        """Worker thread: hand queued events to PostHog on the size or time threshold"""
+        self._resend_spool()
+        while not self._stopping:
+            self._wakeup.wait(FLUSH_INTERVAL)
+            self._wakeup.clear()
+            self._confirm()
+            self._drain()
+            offline_since = self._offline_since
+            if offline_since is not None and time.monotonic() - offline_since >= SPOOL_RETRY_INTERVAL:
+                self._offline_since = None
+                self._resend_spool()
+
+    def _confirm(self):
+        """Forget the unconfirmed events once PostHog has dealt with all of them (uploaded or spooled)"""
+        posthog_queue = getattr(self.posthog, 'queue', None)
+        if posthog_queue is not None and posthog_queue.unfinished_tasks == 0:
+            self._unconfirmed.clear()
+
+    def _resend_spool(self):
+        """Try the spooled events again (a new failure spools them again via _on_error)"""
+        records = self.spool.take()
+        if not records:
+            return
+        if self.debug:
+            print(f"[Analytics Debug] Resending {len(records)} spooled events")
+        for record in records:
+            try:
+                timestamp = record.get('timestamp')
+                self.posthog.capture(
+                    distinct_id=record.get('distinct_id') or self.anonymous_id,
+                    event=record['event'],
+                    properties=record.get('properties') or {},
+                    timestamp=datetime.fromisoformat(timestamp) if timestamp else None,
+                    uuid=record.get('uuid')
+                )
+            except Exception as e:
+                if self.debug:
+                    print(f"[Analytics Debug] Dropping unreadable spooled event: {e}")
+
+    def _drain(self):
+        """Send everything currently queued"""
+        queue = self._queue
+        while True:
+            try:
+                event_name, properties, created = queue.popleft()
+            except IndexError:
+                break
+            self._send(event_name, properties, created)
+        if self._dropped_events and self.debug:
+            print(f"[Analytics Debug] Dropped {self._dropped_events} events (queue full)")
+
+    def _send(self, event_name: str, properties: Optional[Dict[str, Any]], created: float):
+        """Build the full event and pass it to PostHog, or to the spool while offline (worker thread only)"""
         try:
-            # Merge default properties with provided ones
-            default_props = {
-                'session_id': self.session_id,
-                'version': self._get_version(),
-                'os': platform.system(),
-                'os_version': platform.version(),
-                'python_version': platform.python_version(),
-                'timestamp': datetime.utcnow().isoformat(),
-            }
-            
+            timestamp = datetime.fromtimestamp(created, tz=timezone.utc)
+            event_props = dict(self._default_props)
+            event_props['timestamp'] = timestamp.replace(tzinfo=None).isoformat()
             if properties:
-                default_props.update(properties)
-            
+                event_props.update(properties)
+            record = {
+                'event': event_name,
+                'distinct_id': self.anonymous_id,
+                'properties': event_props,
+                'timestamp': timestamp.isoformat(),
+                'uuid': str(uuid.uuid4()),
+            }
+
+            if self._offline_since is not None:
+                self.spool.append([record])
+                if self.debug:
+                    print(f"[Analytics Debug] Offline, spooled event: {event_name}")
+                return
+
             self.posthog.capture(
                 distinct_id=self.anonymous_id,
                 event=event_name,
-                properties=default_props
+                properties=event_props,
+                timestamp=timestamp,
+                uuid=record['uuid']
             )
-            
+
+            self._unconfirmed.append(record)
             if self.debug:
                 print(f"[Analytics Debug] Tracked event: {event_name}")
-                if properties:
-                    print(f"[Analytics Debug]   Properties: {properties}")
-                
         except Exception as e:
             if self.debug:
                 print(f"[Analytics Debug] Failed to track event {event_name}: {e}")
+
+    def _stop_worker(self, timeout: float = 2.0):
+        """Stop the worker and hand any remaining events to PostHog"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._worker is not None and self._worker is not threading.current_thread():
+            self._worker.join(timeout)
+        self._drain()
     
     def _get_version(self) -> str:
         """Get the version of the MCP client proxy."""
@@ -317,11 +566,11 @@ class MCPAnalytics:
             @wraps(func)
             def wrapper(*args, **kwargs):
                 name = event_name or f"function_{func.__name__}"
-                start_time = datetime.utcnow()
+                start_time = time.perf_counter()
                 
                 try:
                     result = func(*args, **kwargs)
-                    duration = (datetime.utcnow() - start_time).total_seconds()
+                    duration = time.perf_counter() - start_time
                     
                     self._safe_track(f'mcp_{name}_completed', {
                         'duration_seconds': duration,
@@ -330,7 +579,7 @@ class MCPAnalytics:
                     return result
                     
                 except Exception as e:
-                    duration = (datetime.utcnow() - start_time).total_seconds()
+                    duration = time.perf_counter() - start_time
                     
                     self._safe_track(f'mcp_{name}_failed', {
                         'duration_seconds': duration,
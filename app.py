@@ -8,18 +8,19 @@ to connect to any MCP server and interact with its available tools via HTTP prox
 Brought to you by Appsecco - Product Security Experts
 """
 
+import asyncio
 import json
 import os
-import re
 import sys
 import subprocess
 import time
 import threading
 import queue
 import requests
+from requests.adapters import HTTPAdapter
 import platform
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 import argparse
 import logging
 import hashlib
@@ -27,72 +28,58 @@ import secrets
 import base64
 import webbrowser
 import httpx
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from urllib.parse import urlencode, urlparse, parse_qs
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
 from analytics import get_analytics
+from stdio_transport import StdioTransport
+import codec
+from mcp_logging import LazyJSON, configure_logging, get_logger, lazy
+from batch import BatchRunner, FanoutRunner, discover, tool_call
+from tools_cache import ToolsCache, server_fingerprint
+from oauth_store import ClientRegistrationCache, DiscoveryCache, TokenStore
+from sse import SSEEvent, SSEParser
+from session_log import SessionLogWriter, TeeStream
+from capture import TrafficCapture
+from replay import ReplayRunner, parse_rate
+from loadgen import PERCENTILES, LoadGenerator, parse_mix
 
 
-# ANSI escape sequences (colors, cursor moves) — stripped from log files
-_ANSI_ESCAPE_RE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+logger = get_logger()
 
 
-class _TeeStream:
-    """
-    File-like wrapper that writes to the original stream AND to a log file.
-    ANSI escapes are stripped from the log file copy so logs stay readable.
-    """
-
-    def __init__(self, original, log_file):
-        self._original = original
-        self._log_file = log_file
-
-    def write(self, data):
-        self._original.write(data)
-        try:
-            self._log_file.write(_ANSI_ESCAPE_RE.sub('', data))
-        except Exception:
-            pass
-        return len(data) if isinstance(data, str) else 0
+# Session log writer, set by _install_session_logger
+_session_log: Optional[SessionLogWriter] = None
 
-    def flush(self):
-        try:
-            self._original.flush()
-        finally:
-            try:
-                self._log_file.flush()
-            except Exception:
-                pass
-
-    def isatty(self):
-        try:
-            return self._original.isatty()
-        except Exception:
-            return False
 
-    def __getattr__(self, name):
-        return getattr(self._original, name)
+def _write_session_log(text: str):
+    """Write text to the session log only (not the terminal), if one is open"""
+    if _session_log is not None:
+        _session_log.write(text)
 
 
-def _install_session_logger(log_path: str):
+def _install_session_logger(log_path: str, max_bytes: int = 0, compress: bool = False):
     """
     Tee stdout and stderr into `log_path`. Creates parent dirs if needed.
-    Returns the opened log file handle (kept open for the process lifetime)
+    Returns the SessionLogWriter (kept open for the process lifetime)
     or None if logging could not be set up.
+
+    Args:
+        log_path: Session log file
+        max_bytes: Rotate the log at this size (0: never)
+        compress: gzip rotated segments
     """
+    global _session_log
     try:
-        log_dir = os.path.dirname(os.path.abspath(log_path))
-        if log_dir:
-            os.makedirs(log_dir, exist_ok=True)
-        log_file = open(log_path, 'a', encoding='utf-8', buffering=1)
-        header = (
+        log_writer = SessionLogWriter(log_path, max_bytes=max_bytes, compress=compress)
+        log_writer.write(
             f"\n===== Session started {datetime.now().isoformat(timespec='seconds')} "
             f"(pid {os.getpid()}) =====\n"
         )
-        log_file.write(header)
-        log_file.flush()
-        sys.stdout = _TeeStream(sys.stdout, log_file)
-        sys.stderr = _TeeStream(sys.stderr, log_file)
-        return log_file
+        sys.stdout = TeeStream(sys.stdout, log_writer)
+        sys.stderr = TeeStream(sys.stderr, log_writer)
+        _session_log = log_writer
+        return log_writer
     except Exception as e:
         print(f"⚠️  Could not open session log '{log_path}': {e}")
         return None
@@ -185,7 +172,17 @@ class MCPConfig:
 class MCPClient:
     """Appsecco MCP Client and Proxy - Generic MCP Client for communicating with any MCP Server via HTTP proxy"""
 
-    def __init__(self, server_config: Dict[str, Any], proxy_url: str = "http://127.0.0.1:8080", use_proxychains: bool = True, bypass_ssl: bool = True, debug: bool = False):
+    # Upper bound on how early the background refresher renews an access token
+    TOKEN_REFRESH_MARGIN = 60.0
+
+    # OAuth error codes meaning the authorization server no longer knows our client
+    INVALID_CLIENT_ERRORS = ("invalid_client", "unauthorized_client")
+
+    # Seconds initialize() keeps waiting for a readiness probe's handshake that timed out
+    # (the same budget an initialize sent over HTTP gets)
+    HANDSHAKE_TIMEOUT = 30
+
+    def __init__(self, server_config: Dict[str, Any], proxy_url: str = "http://127.0.0.1:8080", use_proxychains: bool = True, bypass_ssl: bool = True, debug: bool = False, http_pool_size: int = 10, proxy_health_ttl: float = 5.0, readiness: str = "auto", stderr_buffer_lines: int = 200, log_server_stderr: bool = False, tools_cache: Optional[ToolsCache] = None, stale_while_revalidate: bool = False, token_store: Optional[TokenStore] = None, client_registrations: Optional[ClientRegistrationCache] = None, capture: Optional[TrafficCapture] = None, server_name: Optional[str] = None, oauth_discovery: Optional[DiscoveryCache] = None):
         """
         Initialize the Appsecco MCP Client and Proxy
 
@@ -195,21 +192,51 @@ class MCPClient:
             use_proxychains: Whether to use proxychains for the MCP server process
             bypass_ssl: Whether to bypass SSL certificate verification
             debug: Whether to print debug messages
+            http_pool_size: Max keep-alive connections per HTTP session pool
+            proxy_health_ttl: Seconds an "unhealthy" local proxy state is trusted before re-probing
+            readiness: How to detect that a spawned server is ready: "initialize" (first
+                       JSON-RPC response to the initialize handshake, sent straight over
+                       stdio), "output" (scan stdout/stderr for ready/error words), or
+                       "auto" ("output" while routing through Burp, so the handshake goes
+                       through the normal request path, else "initialize")
+            stderr_buffer_lines: Recent server stderr lines kept for diagnostics
+            log_server_stderr: Also copy server stderr into the session log file
+            tools_cache: On-disk tools/list cache (None disables caching)
+            stale_while_revalidate: Serve an expired cached tool list immediately and
+                                    refresh it in the background
+            token_store: Encrypted OAuth token store (None keeps tokens in memory only)
+            client_registrations: Cache of dynamically registered OAuth clients
+                                  (None registers a new client on every auth flow)
+            capture: JSONL traffic capture that every exchange is recorded in (None: off)
+            server_name: Name of the server in mcp_config.json (for the capture)
+            oauth_discovery: OAuth discovery cache, shared between clients of one app
+                             (None: this client opens its own)
         """
         self.server_config = server_config
+        self.server_name = server_name
         self.command = server_config.get("command", "")
         self.args = server_config.get("args", [])
         self.remote_url = server_config.get("url", "")  # Direct remote MCP URL
         self.process = None
+        self.stdio_transport: Optional[StdioTransport] = None
         self.request_id = 1
+        self._request_id_lock = threading.Lock()
         self.tools = {}
         self.initialized = False
+        self.readiness = readiness
+        self.stderr_buffer_lines = stderr_buffer_lines
+        self.log_server_stderr = log_server_stderr
+        self._handshake_response: Optional[Dict[str, Any]] = None  # initialize response from the readiness probe
+        self._pending_handshake: Optional[tuple] = None  # (future, request, started) of a probe still awaiting its response
+        self.server_info: Dict[str, Any] = {}  # initialize result (protocolVersion, capabilities, serverInfo)
         self.proxy_url = proxy_url
         self.base_url = "http://localhost:3000"  # Local HTTP endpoint
         self.use_burp_proxy = True  # Whether to route through Burp proxy
         self.use_proxychains = use_proxychains
         self.bypass_ssl = bypass_ssl
         self.debug = debug
+        if debug:
+            configure_logging(debug=True)
         self.connection_mode = self._detect_connection_mode()
 
         # Authentication: static headers from config + OAuth token state
@@ -217,6 +244,60 @@ class MCPClient:
         self.oauth_access_token = None
         self.oauth_refresh_token = None
         self.mcp_session_id = None  # Set by server during initialize response
+        self.oauth_discovery = oauth_discovery or DiscoveryCache()  # OAuth metadata, persisted across runs
+
+        # OAuth token lifecycle: what is needed to renew the access token without the
+        # browser, plus a background thread that does so shortly before it expires
+        self.token_store = token_store
+        self.oauth_client_id: Optional[str] = None
+        self.oauth_client_secret: Optional[str] = None
+        self.oauth_token_endpoint: Optional[str] = None
+        self.oauth_resource: Optional[str] = None
+        self.oauth_expires_at: Optional[float] = None
+        self.client_registrations = client_registrations
+        self._oauth_last_error: Optional[str] = None  # OAuth error code of the last failed grant
+        self._oauth_lock = threading.RLock()
+        self._token_refresh_wakeup = threading.Event()
+        self._token_refresh_thread: Optional[threading.Thread] = None
+        self._token_refresh_stopped = False
+
+        # Keep-alive HTTP sessions, one per route ("burp" / "direct"), created lazily
+        # and reused for the lifetime of this client
+        self.http_pool_size = http_pool_size
+        self._http_sessions: Dict[str, requests.Session] = {}
+        self._http_sessions_lock = threading.Lock()
+        self._pool_stats: Dict[str, Dict[str, int]] = {}
+        self._pool_sockets: Dict[str, set] = {}
+
+        # Long-lived httpx clients for direct-remote mode. Concurrent calls share one
+        # HTTP/2 connection as multiplexed streams; the clients are rebuilt only when
+        # the proxy or SSL settings they were built with change.
+        self._httpx_client: Optional[httpx.Client] = None
+        self._httpx_client_settings = None
+        self._async_httpx_client: Optional[httpx.AsyncClient] = None
+        self._async_httpx_client_settings = None
+        self._async_httpx_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing_tasks = set()  # aclose() tasks of replaced async clients
+        self._httpx_lock = threading.Lock()
+
+        # Cached health of the local proxy server. Kept up to date passively from the
+        # outcome of real requests; the TCP probe only runs while the proxy is unknown
+        # or unhealthy, at most once per proxy_health_ttl.
+        self.proxy_health_ttl = proxy_health_ttl
+        self._proxy_healthy: Optional[bool] = None
+        self._proxy_health_checked_at = 0.0
+
+        # Persistent tools/list cache, keyed by the server's launch configuration
+        self.tools_cache = tools_cache
+        self.stale_while_revalidate = stale_while_revalidate
+        self.tools_fingerprint = server_fingerprint(server_config)
+        self._tools_refresh_thread: Optional[threading.Thread] = None
+
+        # Callbacks for server notifications, from stdio or SSE response streams
+        self.notification_handlers: List[Callable[[Dict[str, Any]], None]] = []
+
+        # Structured record of every JSON-RPC exchange (--capture)
+        self.capture = capture
 
     def _detect_connection_mode(self) -> str:
         """
@@ -255,10 +336,112 @@ class MCPClient:
             headers["Authorization"] = f"Bearer {self.oauth_access_token}"
         return headers
 
-    def _debug_print(self, *args, **kwargs):
-        """Print debug message if debug mode is enabled"""
+    def _debug_print(self, msg, *args):
+        """
+        Log a debug message if debug mode is enabled.
+
+        Pass expensive values as %-style args (wrapped in LazyJSON / lazy() where
+        needed) so they are only rendered when the message is actually emitted.
+        """
         if self.debug:
-            print(*args, **kwargs)
+            logger.debug(msg, *args)
+
+    def _capture(self, transport: str, request, response=None, started: Optional[float] = None,
+                 error: Optional[str] = None):
+        """Record an exchange in the traffic capture, if one is active"""
+        if self.capture is not None:
+            self.capture.record("client", transport, request, response, started, error,
+                                server=self.server_name, session_id=self.mcp_session_id)
+
+    def _next_request_id(self) -> int:
+        """Allocate the next JSON-RPC request id (safe to call from several threads)"""
+        with self._request_id_lock:
+            request_id = self.request_id
+            self.request_id += 1
+        return request_id
+
+    def _get_http_session(self, via_burp: bool) -> requests.Session:
+        """
+        Return the pooled requests.Session for the given route, creating it on first use.
+
+        Requests routed through Burp and requests sent directly to the local proxy
+        get separate sessions so their connection pools never mix. The Burp proxy is
+        passed on each request rather than set on the session: requests lets
+        HTTP(S)_PROXY/NO_PROXY from the environment override Session.proxies.
+        """
+        key = "burp" if via_burp else "direct"
+        session = self._http_sessions.get(key)
+        if session is not None:
+            return session
+
+        with self._http_sessions_lock:
+            session = self._http_sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.http_pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({"Content-Type": "application/json"})
+                session.hooks["response"].append(
+                    lambda response, *args, **kwargs: self._track_pool_usage(key, response)
+                )
+                self._pool_stats.setdefault(key, {"requests": 0, "hits": 0, "misses": 0})
+                self._pool_sockets.setdefault(key, set())
+                self._http_sessions[key] = session
+                self._debug_print(f"🔍 [DEBUG] Created '{key}' HTTP session (pool size {self.http_pool_size})")
+        return session
+
+    def _track_pool_usage(self, key: str, response: requests.Response):
+        """
+        Response hook: record whether the request reused a pooled keep-alive connection.
+
+        Each socket is identified by its local address; the first response seen on a
+        socket is a pool miss (new connection), every later one is a hit.
+        """
+        stats = self._pool_stats[key]
+        sock_name = None
+        try:
+            conn = getattr(response.raw, "_connection", None)
+            sock = getattr(conn, "sock", None)
+            if sock is not None:
+                sock_name = sock.getsockname()
+        except Exception:
+            pass
+        with self._http_sessions_lock:
+            stats["requests"] += 1
+            if sock_name is not None and sock_name in self._pool_sockets[key]:
+                stats["hits"] += 1
+            else:
+                stats["misses"] += 1
+                if sock_name is not None:
+                    self._pool_sockets[key].add(sock_name)
+
+    def get_pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Report connection pool usage for each HTTP session.
+
+        A hit is a request that reused an existing keep-alive connection,
+        a miss is a request that had to open a new one.
+
+        Returns:
+            Mapping of session name to {"requests", "hits", "misses"}
+        """
+        with self._http_sessions_lock:
+            return {key: dict(stats) for key, stats in self._pool_stats.items()}
+
+    def _close_http_sessions(self):
+        """Close all pooled HTTP sessions and their keep-alive connections"""
+        if self._http_sessions:
+            self._debug_print(f"🔍 [DEBUG] HTTP pool stats: {self.get_pool_stats()}")
+        with self._http_sessions_lock:
+            sessions = self._http_sessions
+            self._http_sessions = {}
+            self._pool_sockets = {}
+        for session in sessions.values():
+            try:
+                session.close()
+            except Exception:
+                pass
 
     def _check_proxychains_installed(self) -> bool:
         """Check if proxychains is installed on the system"""
@@ -302,6 +485,7 @@ class MCPClient:
             get_analytics().track_server_connected("target_mcp_server_direct_remote", {
                 "remote_url": self.remote_url,
             })
+            self._restore_oauth_tokens()
             return True
 
         try:
@@ -373,8 +557,6 @@ class MCPClient:
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
                 env=env
             )
 
@@ -385,14 +567,25 @@ class MCPClient:
             # mcp-remote only needs a short wait (bootstrapping npx), local stdio needs longer
             wait_timeout = 5 if self.connection_mode == "mcp-remote" else 20
             print(f"⏳ Waiting up to {wait_timeout}s for server to start ({self.connection_mode} mode)...")
-            if not self._wait_for_server_start(timeout=wait_timeout):
+            use_output_scan = self.readiness == "output" or (self.readiness == "auto" and self.use_burp_proxy)
+            if use_output_scan:
+                ready = self._wait_for_server_start(timeout=wait_timeout)
+                if ready:
+                    # Hand stdin/stdout to the transport; from here on only its reader thread reads stdout
+                    self.stdio_transport = self._create_stdio_transport()
+                    self.stdio_transport.start()
+            else:
+                # The probe starts the transport itself, once its stderr handler is attached
+                self.stdio_transport = self._create_stdio_transport()
+                ready = self._wait_for_server_ready(timeout=wait_timeout)
+
+            if not ready:
                 get_analytics().track_error("target_mcp_server_failed_to_start", {
                     "server_config": self.server_config,
                     "server_command": cmd,
                 })
                 return False
 
-
             get_analytics().track_server_connected("target_mcp_server_started", {
                 "server_command": cmd,
             })
@@ -405,13 +598,57 @@ class MCPClient:
             })
             return False
 
-    def _check_output_for_indicators(self, output: str, stream_name: str = "output") -> Optional[bool]:
+    def _create_stdio_transport(self) -> StdioTransport:
+        """Build the stdio transport for the spawned process (not started yet)"""
+        transport = StdioTransport(self.process, debug=self.debug,
+                                   stderr_buffer_lines=self.stderr_buffer_lines)
+        if self.log_server_stderr:
+            pid = self.process.pid
+            transport.add_stderr_handler(
+                lambda line: _write_session_log(f"[server stderr {pid}] {line}\n")
+            )
+        transport.add_notification_handler(self._handle_server_notification)
+        return transport
+
+    def add_notification_handler(self, handler: Callable[[Dict[str, Any]], None]):
         """
-        Check output for success or error indicators
+        Register a callback for server notifications (progress, logging, list_changed, ...)
 
-        Args:
-            output: The output string to check
-            stream_name: Name of the stream (e.g., "stderr", "stdout") for logging
+        Called from the stdio reader thread or while an SSE response is being read.
+        """
+        self.notification_handlers.append(handler)
+
+    def _handle_server_notification(self, message: Dict[str, Any]):
+        """React to notifications pushed by the server (stdio stdout or SSE streams)"""
+        self._debug_print("🔔 [DEBUG] Server notification: %s", LazyJSON(message, indent=None, limit=300))
+        for handler in list(self.notification_handlers):
+            try:
+                handler(message)
+            except Exception as e:
+                self._debug_print(f"⚠️  [DEBUG] Notification handler failed: {e}")
+        if message.get("method") == "notifications/tools/list_changed":
+            self._debug_print("🔍 [DEBUG] Server reported tools/list_changed, invalidating tools cache")
+            if self.tools_cache:
+                self.tools_cache.invalidate(self.tools_fingerprint)
+
+    def get_stderr_tail(self, lines: int = 20) -> List[str]:
+        """Return the last lines the MCP server wrote to stderr (empty for direct-remote)"""
+        if not self.stdio_transport:
+            return []
+        return self.stdio_transport.stderr_tail(lines)
+
+    def _print_stderr_tail(self, lines: int = 20):
+        """Print recent server stderr to help diagnose a failed call"""
+        tail = self.get_stderr_tail(lines)
+        if not tail:
+            return
+        print(f"📜 Last {len(tail)} line(s) of MCP server stderr:")
+        for line in tail:
+            print(f"   {line}")
+
+    def _classify_output(self, output: str) -> Optional[bool]:
+        """
+        Classify a line of server output by success or error indicators
 
         Returns:
             True if success indicator found, False if error indicator found, None if neither
@@ -426,7 +663,6 @@ class MCPClient:
                 'mcp server is ready', 'initialized', 'connected', 'installed'
             ]
         if any(indicator in output_lower for indicator in success_indicators):
-            print(f"✅ Server appears to be ready (from {stream_name})")
             return True
 
         error_indicators = [
@@ -434,10 +670,27 @@ class MCPClient:
             'command failed', 'npm error', 'error', 'failed', 'exception', 'crash', 'exit', 'not found', 'command failed', 'npm error'
         ]
         if any(error in output_lower for error in error_indicators):
-            print(f"❌ Server error detected (from {stream_name}): {output}")
             return False
         return None
 
+    def _check_output_for_indicators(self, output: str, stream_name: str = "output") -> Optional[bool]:
+        """
+        Check output for success or error indicators
+
+        Args:
+            output: The output string to check
+            stream_name: Name of the stream (e.g., "stderr", "stdout") for logging
+
+        Returns:
+            True if success indicator found, False if error indicator found, None if neither
+        """
+        result = self._classify_output(output)
+        if result is True:
+            print(f"✅ Server appears to be ready (from {stream_name})")
+        elif result is False:
+            print(f"❌ Server error detected (from {stream_name}): {output}")
+        return result
+
     def _wait_for_server_start(self, timeout: int = 20) -> bool:
         """
         Wait for the MCP server to start and detect readiness
@@ -464,9 +717,9 @@ class MCPClient:
                 stdout, stderr = self.process.communicate()
                 print(f"❌ MCP server process exited unexpectedly")
                 if stdout:
-                    print(f"STDOUT: {stdout}")
+                    print(f"STDOUT: {stdout.decode('utf-8', 'replace')}")
                 if stderr:
-                    print(f"STDERR: {stderr}")
+                    print(f"STDERR: {stderr.decode('utf-8', 'replace')}")
                 return False
 
             # Try to read any available output without blocking
@@ -477,7 +730,7 @@ class MCPClient:
                 if self.process.stderr and select.select([self.process.stderr], [], [], 0.1)[0]:
                     stderr = self.process.stderr.readline()
                     if stderr:
-                        stderr = stderr.strip()
+                        stderr = stderr.decode("utf-8", "replace").strip()
                         output_buffer.append(stderr)
 
                         # Check for indicators in stderr
@@ -489,7 +742,7 @@ class MCPClient:
                 if self.process.stdout and select.select([self.process.stdout], [], [], 0.1)[0]:
                     stdout = self.process.stdout.readline()
                     if stdout:
-                        stdout = stdout.strip()
+                        stdout = stdout.decode("utf-8", "replace").strip()
                         output_buffer.append(stdout)
                         last_output = stdout
 
@@ -521,15 +774,97 @@ class MCPClient:
             print("❌ Process has exited during startup")
             return False
 
+    def _wait_for_server_ready(self, timeout: float = 20) -> bool:
+        """
+        Detect readiness at the protocol level: send `initialize` right after spawn and
+        treat the first valid JSON-RPC response as "ready".
+
+        Stderr lines are scanned as they arrive, but only used as a fallback when the
+        server does not answer within `timeout`. The initialize response is kept and
+        reused by initialize(), so the handshake is not sent twice; if it has not
+        arrived yet, the request stays outstanding and initialize() waits for it.
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            True if server started successfully, False otherwise
+        """
+        start_time = time.monotonic()
+        stderr_verdict: Dict[str, Any] = {"result": None, "line": None}
+
+        def on_stderr(line: str):
+            result = self._classify_output(line)
+            if result is not None and stderr_verdict["result"] is None:
+                stderr_verdict["result"] = result
+                stderr_verdict["line"] = line
+
+        self.stdio_transport.add_stderr_handler(on_stderr)
+        self.stdio_transport.start()
+        init_request = {
+            "jsonrpc": "2.0",
+            "id": self._next_request_id(),
+            "method": "initialize",
+            "params": self._initialize_params()
+        }
+        started = time.perf_counter()
+        try:
+            future = self.stdio_transport.request_async(init_request)
+            response = future.result(timeout=timeout)
+            self._handshake_response = response
+            self._capture("stdio", init_request, response, started)
+            elapsed_ms = (time.monotonic() - start_time) * 1000
+            print(f"✅ Server is ready (answered initialize in {elapsed_ms:.0f} ms)")
+            return True
+        except FutureTimeoutError:
+            # The server has the request; a second initialize would be a protocol error
+            self._pending_handshake = (future, init_request, started)
+        except Exception as e:
+            # stdout closed before a response arrived — the process died during startup
+            self._debug_print(f"⚠️  [DEBUG] Readiness probe failed: {e}")
+            try:
+                self.process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                pass
+            # Let the stderr reader catch up so the diagnostics below are complete
+            self.stdio_transport.join_readers(timeout=1)
+        finally:
+            self.stdio_transport.remove_stderr_handler(on_stderr)
+
+        if self.process.poll() is not None:
+            print(f"❌ MCP server process exited unexpectedly (code {self.process.returncode})")
+            self._print_stderr_tail()
+            return False
+
+        # No JSON-RPC response in time — fall back to what stderr told us
+        print(f"⏰ No initialize response after {timeout} seconds")
+        if stderr_verdict["result"] is True:
+            print("✅ Server appears to be ready (from stderr)")
+            return True
+        if stderr_verdict["result"] is False:
+            print(f"❌ Server error detected (from stderr): {stderr_verdict['line']}")
+            return False
+        print("⚠️  Process is still running but no ready indicator detected")
+        print("   Proceeding anyway - server may be ready")
+        return True
+
     def stop_server(self):
         """Stop the MCP server process (no-op for direct remote MCPs)"""
 
         get_analytics().track_session_end()
 
+        self._stop_token_refresher()
+        self._close_http_sessions()
+        self._close_httpx_clients()
+
         if self.connection_mode == "direct-remote":
             self._debug_print("🔍 [DEBUG] Direct remote MCP — nothing to stop")
             return
 
+        if self.stdio_transport:
+            self.stdio_transport.close()
+            self.stdio_transport = None
+
         if self.process:
             self.process.terminate()
             try:
@@ -540,29 +875,61 @@ class MCPClient:
 
     def _check_proxy_server_connectivity(self) -> bool:
         """
-        Check if the local proxy server on port 3000 is accessible
+        Probe the local proxy server with a TCP connect
 
         Returns:
             True if accessible, False otherwise
         """
         import socket
+        parsed = urlparse(self.base_url)
+        host = parsed.hostname or 'localhost'
+        port = parsed.port or 3000
         try:
             # Try to connect to the proxy server directly (without Burp)
             test_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             test_socket.settimeout(2)
-            result = test_socket.connect_ex(('localhost', 3000))
+            result = test_socket.connect_ex((host, port))
             test_socket.close()
 
             if result == 0:
-                self._debug_print(f"🔍 [DEBUG] Proxy server on port 3000 is accessible (direct connection)")
+                self._debug_print(f"🔍 [DEBUG] Proxy server on port {port} is accessible (direct connection)")
                 return True
             else:
-                self._debug_print(f"⚠️  [DEBUG] Cannot connect to proxy server on port 3000 (direct connection)")
+                self._debug_print(f"⚠️  [DEBUG] Cannot connect to proxy server on port {port} (direct connection)")
                 return False
         except Exception as e:
             self._debug_print(f"⚠️  [DEBUG] Error checking proxy server connectivity: {e}")
             return False
 
+    def _record_proxy_health(self, healthy: bool):
+        """Update the cached proxy health state, logging transitions"""
+        previous = self._proxy_healthy
+        self._proxy_healthy = healthy
+        self._proxy_health_checked_at = time.monotonic()
+        if previous is not None and previous != healthy:
+            if healthy:
+                self._debug_print(f"✅ [DEBUG] Local proxy server recovered — routing requests via HTTP again")
+            else:
+                self._debug_print(f"⚠️  [DEBUG] Local proxy server marked unhealthy — using stdio for {self.proxy_health_ttl}s")
+
+    def _is_proxy_server_healthy(self) -> bool:
+        """
+        Return the cached local proxy health, probing only when needed.
+
+        A healthy proxy is trusted until a real request fails to reach it (a connection
+        error, or a 502/504 or HTML error page from Burp), so the hot path never opens
+        an extra socket. An unhealthy (or unknown) state is re-probed
+        once its TTL expires; only an unhealthy -> healthy transition switches traffic
+        back from the stdio fallback to HTTP.
+        """
+        if self._proxy_healthy:
+            return True
+        if self._proxy_healthy is False and time.monotonic() - self._proxy_health_checked_at < self.proxy_health_ttl:
+            return False
+        healthy = self._check_proxy_server_connectivity()
+        self._record_proxy_health(healthy)
+        return healthy
+
     def send_request(self, method: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Send a JSON-RPC request to the MCP server via HTTP proxy
@@ -583,12 +950,10 @@ class MCPClient:
         else:
             request = {
                 "jsonrpc": "2.0",
-                "id": self.request_id,
+                "id": self._next_request_id(),
                 "method": method
             }
 
-            self.request_id += 1
-
         if params:
             request["params"] = params
 
@@ -603,19 +968,20 @@ class MCPClient:
             self._debug_print(f"   Proxy URL: {self.proxy_url}")
             self._debug_print(f"   ⚠️  Note: Request will go through Burp proxy to reach {target_url}")
             self._debug_print(f"   💡 If Burp is intercepting, it may return HTML instead of forwarding to the proxy server")
-        self._debug_print(f"   Request Body: {json.dumps(request, indent=2)}")
+        self._debug_print("   Request Body: %s", LazyJSON(request))
 
         # For direct-remote mode, send directly to the remote URL (no local proxy needed)
         if self.connection_mode == "direct-remote":
             return self._send_direct_remote_request(request, method)
 
-        # Check proxy server connectivity
-        if not self._check_proxy_server_connectivity():
+        # Check proxy server connectivity (cached; see _is_proxy_server_healthy)
+        if not self._is_proxy_server_healthy():
             self._debug_print(f"⚠️  [DEBUG] Proxy server connectivity check failed")
-            self._debug_print(f"   The proxy server on port 3000 may not be running")
+            self._debug_print(f"   The proxy server at {self.base_url} may not be running")
             self._debug_print(f"   Falling back to stdio communication")
             return self._send_stdio_request(method, params)
 
+        started = time.perf_counter()
         try:
             if method == "notifications/initialized":
                 timeout = 5
@@ -638,11 +1004,10 @@ class MCPClient:
                     "https": self.proxy_url
                 }
                 self._debug_print(f"🔍 [DEBUG] Making POST request with proxies: {proxies}")
-                response = requests.post(
+                response = self._get_http_session(via_burp=True).post(
                     f"{self.base_url}/mcp",
-                    json=request,
+                    data=codec.dumps(request),
                     proxies=proxies,
-                    headers={"Content-Type": "application/json"},
                     timeout=timeout
                 )
             else:
@@ -651,24 +1016,25 @@ class MCPClient:
                     self._debug_print(f"🔍 [DEBUG] Skipping Burp proxy for localhost target (Burp can't forward to localhost)")
                 else:
                     self._debug_print(f"🔍 [DEBUG] Making POST request without proxy")
-                response = requests.post(
+                response = self._get_http_session(via_burp=False).post(
                     f"{self.base_url}/mcp",
-                    json=request,
-                    headers={"Content-Type": "application/json"},
+                    data=codec.dumps(request),
                     timeout=timeout
                 )
 
             # Debug: Log response details
             self._debug_print(f"\n🔍 [DEBUG] HTTP Response received:")
             self._debug_print(f"   Status Code: {response.status_code}")
-            self._debug_print(f"   Response Headers: {dict(response.headers)}")
-            self._debug_print(f"   Response Content-Length: {len(response.content)} bytes")
-            self._debug_print(f"   Response Text (first 500 chars): {response.text[:500]}")
-            self._debug_print(f"   Response Raw (first 500 bytes): {response.content[:500]}")
+            self._debug_print("   Response Headers: %s", lazy(lambda: dict(response.headers)))
+            self._debug_print("   Response Content-Length: %d bytes", len(response.content))
+            self._debug_print("   Response Text (first 500 chars): %s", lazy(lambda: response.text[:500]))
+            self._debug_print("   Response Raw (first 500 bytes): %s", lazy(lambda: response.content[:500]))
 
-            # Check if Burp is returning HTML instead of forwarding to the proxy server
+            # Check if Burp is returning HTML instead of forwarding to the proxy server.
+            # Inspect the raw bytes: response.text re-decodes the whole body on every access.
             content_type = response.headers.get('Content-Type', '').lower()
-            if 'text/html' in content_type or response.text.strip().startswith('<html'):
+            body = response.content
+            if 'text/html' in content_type or body.lstrip()[:5].lower() == b'<html':
                 self._debug_print(f"\n⚠️  [DEBUG] Detected HTML response instead of JSON!")
                 self._debug_print(f"   Content-Type: {content_type}")
                 self._debug_print(f"   This suggests Burp is intercepting/blocking the request")
@@ -683,33 +1049,41 @@ class MCPClient:
                 else:
                     self._debug_print(f"   ⚠️  HTML response received - proxy server may not be running correctly")
                     self._debug_print(f"   💡 Check if the proxy server on port 3000 is running and responding")
-                self._debug_print(f"   Response preview: {response.text[:200]}")
+                self._debug_print("   Response preview: %s", lazy(lambda: response.text[:200]))
+                # Burp answers with its error page when it cannot reach the local proxy
+                self._record_proxy_health(False)
                 raise RuntimeError(f"Received HTML response instead of JSON. Burp may be intercepting the request to {self.base_url}/mcp")
 
             if response.status_code != 200:
                 self._debug_print(f"❌ [DEBUG] Non-200 status code: {response.status_code}")
-                self._debug_print(f"   Response body: {response.text}")
+                self._debug_print("   Response body: %s", lazy(lambda: response.text))
+                if response.status_code in (502, 504):
+                    # Bad gateway / gateway timeout from Burp: the local proxy is not answering
+                    self._record_proxy_health(False)
                 raise RuntimeError(f"HTTP request failed with status {response.status_code}")
 
             # Check if response body is empty before parsing
-            if not response.text or not response.text.strip():
+            if not body or body.isspace():
                 self._debug_print(f"❌ [DEBUG] Response body is empty!")
                 self._debug_print(f"   Status code was: {response.status_code}")
-                self._debug_print(f"   Response headers: {dict(response.headers)}")
+                self._debug_print("   Response headers: %s", lazy(lambda: dict(response.headers)))
                 self._debug_print(f"   ⚠️  The proxy server on port 3000 may not be running or responding")
                 # Attempting to parse empty response will trigger JSONDecodeError below
 
             # Try to parse JSON
             try:
-                parsed_response = response.json()
+                parsed_response = codec.loads(response.content)
                 self._debug_print(f"🔍 [DEBUG] Successfully parsed JSON response")
+                # Only a JSON-RPC answer proves the local proxy itself is up
+                self._record_proxy_health(True)
+                self._capture("http", request, body, started)
                 return parsed_response
             except json.JSONDecodeError as json_err:
                 self._debug_print(f"❌ [DEBUG] JSON parsing failed:")
                 self._debug_print(f"   Error: {json_err}")
-                self._debug_print(f"   Response text: {response.text}")
-                self._debug_print(f"   Response text length: {len(response.text)}")
-                self._debug_print(f"   Response text repr: {repr(response.text)}")
+                self._debug_print("   Response text: %s", lazy(lambda: response.text))
+                self._debug_print("   Response text length: %s", lazy(lambda: len(response.text)))
+                self._debug_print("   Response text repr: %s", lazy(lambda: repr(response.text)))
                 # Check if it's HTML
                 if response.text.strip().startswith('<'):
                     self._debug_print(f"   ⚠️  Response appears to be HTML, not JSON")
@@ -717,13 +1091,16 @@ class MCPClient:
                 raise
 
         except requests.exceptions.RequestException as e:
+            # A connection failure (not a slow tool timing out) means the proxy is down
+            if isinstance(e, requests.exceptions.ConnectionError):
+                self._record_proxy_health(False)
             # Fallback to direct stdio if HTTP fails
             self._debug_print(f"\n⚠️  [DEBUG] HTTP request failed, falling back to stdio:")
             self._debug_print(f"   Exception type: {type(e).__name__}")
             self._debug_print(f"   Exception message: {e}")
             if hasattr(e, 'response') and e.response is not None:
                 self._debug_print(f"   Response status: {e.response.status_code}")
-                self._debug_print(f"   Response text: {e.response.text[:500]}")
+                self._debug_print("   Response text: %s", lazy(lambda: e.response.text[:500]))
             print(f"⚠️  HTTP request failed, falling back to stdio: {e}")
             return self._send_stdio_request(method, params)
         except json.JSONDecodeError as e:
@@ -740,19 +1117,123 @@ class MCPClient:
             self._debug_print(f"   Exception type: {type(e).__name__}")
             self._debug_print(f"   Exception message: {e}")
             import traceback
-            self._debug_print(f"   Traceback:\n{traceback.format_exc()}")
+            self._debug_print("   Traceback:\n%s", lazy(traceback.format_exc))
             print(f"❌ Unexpected error in send_request: {e}")
             return self._send_stdio_request(method, params)
 
-    def _get_httpx_client(self) -> httpx.Client:
-        """Create an httpx client with HTTP/2 support and proxy/SSL settings."""
+    def _httpx_settings(self) -> tuple:
+        """Proxy and SSL settings an httpx client is built with (its rebuild key)"""
         proxy_url = self.proxy_url if self.use_burp_proxy else None
-        return httpx.Client(
-            http2=True,
-            verify=not self.bypass_ssl,
-            proxy=proxy_url,
+        return (proxy_url, not self.bypass_ssl)
+
+    def _httpx_limits(self) -> httpx.Limits:
+        """Connection limits shared by the sync and async httpx clients"""
+        return httpx.Limits(
+            max_connections=self.http_pool_size,
+            max_keepalive_connections=self.http_pool_size,
         )
 
+    def _get_httpx_client(self) -> httpx.Client:
+        """
+        Return the shared httpx client with HTTP/2 support and proxy/SSL settings.
+
+        The client lives as long as this MCPClient so TLS and HTTP/2 negotiation
+        happen once; it is only rebuilt when proxy or SSL settings change.
+        Callers must not close it.
+        """
+        settings = self._httpx_settings()
+        with self._httpx_lock:
+            if self._httpx_client is None or self._httpx_client_settings != settings:
+                stale_client = self._httpx_client
+                proxy_url, verify = settings
+                self._httpx_client = httpx.Client(
+                    http2=True,
+                    verify=verify,
+                    proxy=proxy_url,
+                    limits=self._httpx_limits(),
+                )
+                self._httpx_client_settings = settings
+                self._debug_print(f"🔍 [DEBUG] Built httpx client (proxy: {proxy_url or 'none'}, verify: {verify})")
+                if stale_client is not None:
+                    stale_client.close()
+            return self._httpx_client
+
+    def _get_async_httpx_client(self) -> httpx.AsyncClient:
+        """
+        Return the shared httpx.AsyncClient, the asyncio counterpart of _get_httpx_client.
+
+        Must be called from a coroutine. The client is bound to the event loop it is
+        first used from; it is rebuilt when proxy or SSL settings change or when it is
+        used from another loop, and the replaced client is closed on its own loop.
+        """
+        settings = self._httpx_settings()
+        loop = asyncio.get_running_loop()
+        stale = None
+        with self._httpx_lock:
+            if (self._async_httpx_client is None or self._async_httpx_client_settings != settings
+                    or self._async_httpx_loop is not loop):
+                if self._async_httpx_client is not None:
+                    stale = (self._async_httpx_client, self._async_httpx_loop)
+                proxy_url, verify = settings
+                self._async_httpx_client = httpx.AsyncClient(
+                    http2=True,
+                    verify=verify,
+                    proxy=proxy_url,
+                    limits=self._httpx_limits(),
+                )
+                self._async_httpx_client_settings = settings
+                self._async_httpx_loop = loop
+            client = self._async_httpx_client
+        if stale is not None:
+            self._close_async_httpx_client(*stale)
+        return client
+
+    def _close_async_httpx_client(self, client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]):
+        """Close an async httpx client on the event loop that owns its connections"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        try:
+            if loop is None or loop.is_closed():
+                # Its loop is gone, and with it every connection the client could close
+                return
+            if loop is running:
+                # Called from a coroutine on that loop: close in the background
+                task = loop.create_task(client.aclose())
+                self._closing_tasks.add(task)
+                task.add_done_callback(self._closing_tasks.discard)
+            elif loop.is_running():
+                future = asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+                if running is not None:
+                    # Called from a coroutine on another loop: waiting here would stall that loop
+                    waiter = asyncio.wrap_future(future, loop=running)
+                    self._closing_tasks.add(waiter)
+                    waiter.add_done_callback(self._closing_tasks.discard)
+                else:
+                    future.result(timeout=5)
+            else:
+                loop.run_until_complete(client.aclose())
+        except Exception as e:
+            self._debug_print(f"⚠️  [DEBUG] Could not close async httpx client: {e}")
+
+    def _close_httpx_clients(self):
+        """Close the shared httpx clients (sync and async) if they were created"""
+        with self._httpx_lock:
+            client, self._httpx_client = self._httpx_client, None
+            async_client, self._async_httpx_client = self._async_httpx_client, None
+            async_loop, self._async_httpx_loop = self._async_httpx_loop, None
+            self._httpx_client_settings = None
+            self._async_httpx_client_settings = None
+
+        if client is not None:
+            try:
+                client.close()
+            except Exception as e:
+                self._debug_print(f"⚠️  [DEBUG] Error closing httpx client: {e}")
+        if async_client is not None:
+            self._close_async_httpx_client(async_client, async_loop)
+
     def _parse_response_body(self, text: str, content_type: str = "") -> Dict[str, Any]:
         """Parse a response body that may be plain JSON or SSE (Server-Sent Events).
 
@@ -766,22 +1247,17 @@ class MCPClient:
 
         # Try plain JSON first
         if stripped.startswith("{"):
-            return json.loads(stripped)
+            return codec.loads(stripped)
 
-        # SSE format: look for data: lines and concatenate their payloads
+        # SSE format: parse the events, dispatch notifications, return the response
         if "text/event-stream" in content_type.lower() or stripped.startswith("event:") or stripped.startswith("data:"):
-            self._debug_print(f"🔍 [DEBUG] Detected SSE response, extracting data lines")
-            data_parts = []
-            for line in stripped.splitlines():
-                if line.startswith("data:"):
-                    data_parts.append(line[5:].strip())
-            if data_parts:
-                combined = "".join(data_parts)
-                self._debug_print(f"🔍 [DEBUG] SSE data payload: {combined[:300]}")
-                return json.loads(combined)
+            self._debug_print(f"🔍 [DEBUG] Detected SSE response, parsing events")
+            message = self._process_sse_events(SSEParser().feed(text + "\n\n"), None)
+            if message is not None:
+                return message
 
         # Fallback: try parsing the whole thing
-        return json.loads(stripped)
+        return codec.loads(stripped)
 
     def _send_direct_remote_request(self, request: Dict[str, Any], method: str) -> Dict[str, Any]:
         """
@@ -789,6 +1265,10 @@ class MCPClient:
         Uses httpx for HTTP/2 support (required when proxying through Burp).
         Handles 401 responses by attempting MCP OAuth 2.1 flow.
 
+        SSE responses are consumed incrementally: notifications are dispatched as
+        they arrive and the call returns as soon as the response with the request's
+        id is seen (see _read_sse_response).
+
         Args:
             request: The JSON-RPC request dict
             method: The RPC method name (for timeout selection)
@@ -802,71 +1282,340 @@ class MCPClient:
         self._debug_print(f"🔍 [DEBUG] Direct remote request (HTTP/2 enabled)")
         self._debug_print(f"   Burp proxy: {self.proxy_url if self.use_burp_proxy else 'disabled'}")
 
+        started = time.perf_counter()
         try:
-            with self._get_httpx_client() as client:
-                response = client.post(
-                    self.base_url,
-                    json=request,
-                    headers=headers,
-                    timeout=timeout,
-                )
+            client = self._get_httpx_client()
+            sent_token = self.oauth_access_token
+            response = client.send(
+                client.build_request("POST", self.base_url, content=codec.dumps(request), headers=headers, timeout=timeout),
+                stream=True,
+            )
 
-                self._debug_print(f"\n🔍 [DEBUG] Remote HTTP Response:")
-                self._debug_print(f"   HTTP version: {response.http_version}")
-                self._debug_print(f"   Status Code: {response.status_code}")
-                self._debug_print(f"   Response Text (first 500 chars): {response.text[:500]}")
-
-                # Handle 401 — attempt OAuth flow, then retry once
-                if response.status_code == 401:
-                    www_auth = response.headers.get("WWW-Authenticate", "")
-                    self._debug_print(f"🔐 [DEBUG] Received 401. WWW-Authenticate: {www_auth}")
-
-                    if self._perform_oauth_flow(www_auth):
-                        # Retry with the fresh token
-                        headers = self._build_request_headers()
-                        response = client.post(
-                            self.base_url,
-                            json=request,
-                            headers=headers,
-                            timeout=timeout,
-                        )
-                        self._debug_print(f"🔍 [DEBUG] Retry after OAuth — status {response.status_code}")
-                    else:
-                        raise RuntimeError(
-                            f"Remote MCP returned 401 and OAuth flow failed or was not available. "
-                            f"Provide or verify the Authorization header in the config or ensure the server supports MCP OAuth."
-                        )
-
-                # Capture MCP session ID from response headers
-                session_id = response.headers.get("Mcp-Session-Id")
-                if session_id:
-                    self.mcp_session_id = session_id
-                    self._debug_print(f"🔍 [DEBUG] Captured Mcp-Session-Id: {session_id}")
-
-                # Check for HTML response (Burp interception)
-                content_type = response.headers.get('Content-Type', '').lower()
-                if 'text/html' in content_type or response.text.strip().startswith('<html'):
-                    self._debug_print(f"\n⚠️  [DEBUG] Detected HTML response instead of JSON from remote MCP!")
-                    raise RuntimeError(f"Received HTML response instead of JSON from {self.base_url}")
-
-                # 202 Accepted is valid for notifications (MCP Streamable HTTP spec)
-                if response.status_code == 202 and method.startswith("notifications/"):
-                    return {"result": "accepted"}
-
-                if response.status_code != 200:
-                    raise RuntimeError(f"Remote MCP returned status {response.status_code}")
-
-                if not response.text or not response.text.strip():
-                    # notifications/initialized may return empty body
-                    if method == "notifications/initialized":
-                        return {"result": "initialized"}
-                    raise RuntimeError(f"Empty response from remote MCP at {self.base_url}")
-
-                return self._parse_response_body(response.text, response.headers.get('Content-Type', ''))
+            # Handle 401 — attempt OAuth flow, then retry once
+            if response.status_code == 401:
+                response.read()
+                self._debug_print_remote_response(response)
+                www_auth = response.headers.get("WWW-Authenticate", "")
+                self._debug_print(f"🔐 [DEBUG] Received 401. WWW-Authenticate: {www_auth}")
+
+                if self._reauthenticate(www_auth, sent_token):
+                    # Retry with the fresh token
+                    headers = self._build_request_headers()
+                    response = client.send(
+                        client.build_request("POST", self.base_url, content=codec.dumps(request), headers=headers, timeout=timeout),
+                        stream=True,
+                    )
+                    self._debug_print(f"🔍 [DEBUG] Retry after OAuth — status {response.status_code}")
+                else:
+                    raise RuntimeError(
+                        f"Remote MCP returned 401 and OAuth flow failed or was not available. "
+                        f"Provide or verify the Authorization header in the config or ensure the server supports MCP OAuth."
+                    )
+
+            if self._is_sse_response(response):
+                self._debug_print_remote_response(response, body=False)
+                result = self._read_sse_response(client, response, request.get("id"), timeout)
+            else:
+                response.read()
+                self._debug_print_remote_response(response)
+                result = self._handle_direct_remote_response(response, method)
+            self._capture("direct-remote", request, result, started)
+            return result
 
         except httpx.HTTPError as e:
             print(f"❌ Direct remote request failed: {e}")
+            self._capture("direct-remote", request, started=started, error=str(e) or type(e).__name__)
             raise RuntimeError(f"Failed to reach remote MCP at {self.base_url}: {e}")
+        except Exception as e:
+            self._capture("direct-remote", request, started=started, error=str(e) or type(e).__name__)
+            raise
+
+    async def _send_direct_remote_request_async(self, request: Dict[str, Any], method: str) -> Dict[str, Any]:
+        """
+        Asyncio variant of _send_direct_remote_request using the shared httpx.AsyncClient.
+
+        Many coroutines can await this concurrently; their requests are multiplexed as
+        HTTP/2 streams over the same connection. The OAuth flow (interactive) runs in
+        a worker thread so it does not block the event loop.
+        """
+        timeout = 5 if method == "notifications/initialized" else 30
+        headers = self._build_request_headers()
+
+        started = time.perf_counter()
+        try:
+            client = self._get_async_httpx_client()
+            sent_token = self.oauth_access_token
+            response = await client.send(
+                client.build_request("POST", self.base_url, content=codec.dumps(request), headers=headers, timeout=timeout),
+                stream=True,
+            )
+
+            if response.status_code == 401:
+                await response.aread()
+                self._debug_print_remote_response(response)
+                www_auth = response.headers.get("WWW-Authenticate", "")
+                self._debug_print(f"🔐 [DEBUG] Received 401. WWW-Authenticate: {www_auth}")
+
+                if await asyncio.to_thread(self._reauthenticate, www_auth, sent_token):
+                    headers = self._build_request_headers()
+                    response = await client.send(
+                        client.build_request("POST", self.base_url, content=codec.dumps(request), headers=headers, timeout=timeout),
+                        stream=True,
+                    )
+                    self._debug_print(f"🔍 [DEBUG] Retry after OAuth — status {response.status_code}")
+                else:
+                    raise RuntimeError(
+                        f"Remote MCP returned 401 and OAuth flow failed or was not available. "
+                        f"Provide or verify the Authorization header in the config or ensure the server supports MCP OAuth."
+                    )
+
+            if self._is_sse_response(response):
+                self._debug_print_remote_response(response, body=False)
+                result = await self._read_sse_response_async(client, response, request.get("id"), timeout)
+            else:
+                await response.aread()
+                self._debug_print_remote_response(response)
+                result = self._handle_direct_remote_response(response, method)
+            self._capture("direct-remote", request, result, started)
+            return result
+
+        except httpx.HTTPError as e:
+            print(f"❌ Direct remote request failed: {e}")
+            self._capture("direct-remote", request, started=started, error=str(e) or type(e).__name__)
+            raise RuntimeError(f"Failed to reach remote MCP at {self.base_url}: {e}")
+        except Exception as e:
+            self._capture("direct-remote", request, started=started, error=str(e) or type(e).__name__)
+            raise
+
+    # ------------------------------------------------------------------
+    # Streamable HTTP: incremental SSE responses
+    # ------------------------------------------------------------------
+
+    # How often a dropped SSE stream is resumed with Last-Event-ID before giving up
+    SSE_MAX_RESUMES = 3
+
+    @staticmethod
+    def _is_sse_response(response: httpx.Response) -> bool:
+        """True for a successful text/event-stream response"""
+        return (response.status_code == 200
+                and "text/event-stream" in response.headers.get("Content-Type", "").lower())
+
+    def _sse_resume_request(self, client, last_event_id: str, timeout: float) -> httpx.Request:
+        """GET that asks the server to replay the stream after `last_event_id`"""
+        headers = self._build_request_headers()
+        headers.pop("Content-Type", None)
+        headers["Accept"] = "text/event-stream"
+        headers["Last-Event-ID"] = last_event_id
+        return client.build_request("GET", self.base_url, headers=headers, timeout=timeout)
+
+    def _sse_resume_delay(self, parser: SSEParser) -> float:
+        """Reconnection delay in seconds (server "retry:" field, capped at 5s)"""
+        return min(parser.retry_ms / 1000.0, 5.0) if parser.retry_ms is not None else 0.5
+
+    def _read_sse_response(self, client: httpx.Client, response: httpx.Response,
+                           request_id: Any, timeout: float) -> Dict[str, Any]:
+        """
+        Consume an SSE response event by event until the reply to `request_id` arrives
+
+        If the stream ends first and the server assigned event IDs, the stream is
+        resumed with a GET carrying Last-Event-ID (up to SSE_MAX_RESUMES times).
+
+        Returns:
+            The JSON-RPC response with the matching id
+        """
+        self._capture_session_id(response)
+        parser = SSEParser()
+        resumes = 0
+        while True:
+            try:
+                for chunk in response.iter_text():
+                    result = self._process_sse_events(parser.feed(chunk), request_id)
+                    if result is not None:
+                        return result
+            except httpx.TransportError as e:
+                self._debug_print(f"⚠️  [DEBUG] SSE stream interrupted: {e}")
+            finally:
+                response.close()
+
+            if not parser.last_event_id or resumes >= self.SSE_MAX_RESUMES:
+                raise RuntimeError(f"SSE stream from {self.base_url} ended before the response to request {request_id!r}")
+            resumes += 1
+            time.sleep(self._sse_resume_delay(parser))
+            self._debug_print(f"🔍 [DEBUG] Resuming SSE stream after event {parser.last_event_id!r} (attempt {resumes})")
+            response = client.send(self._sse_resume_request(client, parser.last_event_id, timeout), stream=True)
+            if not self._is_sse_response(response):
+                response.close()
+                raise RuntimeError(f"Could not resume SSE stream from {self.base_url} (HTTP {response.status_code})")
+            parser = SSEParser(last_event_id=parser.last_event_id)
+
+    async def _read_sse_response_async(self, client: httpx.AsyncClient, response: httpx.Response,
+                                       request_id: Any, timeout: float) -> Dict[str, Any]:
+        """Asyncio variant of _read_sse_response"""
+        self._capture_session_id(response)
+        parser = SSEParser()
+        resumes = 0
+        while True:
+            try:
+                async for chunk in response.aiter_text():
+                    server_requests = []
+                    result = self._process_sse_events(parser.feed(chunk), request_id, server_requests)
+                    for message in server_requests:
+                        await self._answer_remote_server_request_async(client, message)
+                    if result is not None:
+                        return result
+            except httpx.TransportError as e:
+                self._debug_print(f"⚠️  [DEBUG] SSE stream interrupted: {e}")
+            finally:
+                await response.aclose()
+
+            if not parser.last_event_id or resumes >= self.SSE_MAX_RESUMES:
+                raise RuntimeError(f"SSE stream from {self.base_url} ended before the response to request {request_id!r}")
+            resumes += 1
+            await asyncio.sleep(self._sse_resume_delay(parser))
+            self._debug_print(f"🔍 [DEBUG] Resuming SSE stream after event {parser.last_event_id!r} (attempt {resumes})")
+            response = await client.send(self._sse_resume_request(client, parser.last_event_id, timeout), stream=True)
+            if not self._is_sse_response(response):
+                await response.aclose()
+                raise RuntimeError(f"Could not resume SSE stream from {self.base_url} (HTTP {response.status_code})")
+            parser = SSEParser(last_event_id=parser.last_event_id)
+
+    def _process_sse_events(self, events: List[SSEEvent], request_id: Any,
+                            server_requests: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Route the messages carried by SSE events
+
+        Args:
+            events: Parsed SSE events
+            request_id: Id of the request being answered (None accepts any response)
+            server_requests: If given, server-initiated requests are appended here for
+                             the caller to answer (asyncio callers) instead of answered inline
+
+        Returns:
+            The response to `request_id` if one of the events carried it, else None
+        """
+        result = None
+        for event in events:
+            self._debug_print("🔍 [DEBUG] SSE event %r (id %r): %s", event.event, event.id,
+                              lazy(lambda: event.data[:300]))
+            try:
+                payload = codec.loads(event.data)
+            except json.JSONDecodeError:
+                self._debug_print("⚠️  [DEBUG] Ignoring non-JSON SSE event data")
+                continue
+            for message in payload if isinstance(payload, list) else [payload]:
+                if not isinstance(message, dict):
+                    continue
+                if "method" in message:
+                    if "id" in message:
+                        if server_requests is not None:
+                            server_requests.append(message)
+                        else:
+                            self._answer_remote_server_request(message)
+                    else:
+                        self._handle_server_notification(message)
+                elif result is None and (request_id is None or message.get("id") == request_id):
+                    result = message
+                else:
+                    self._debug_print(f"⚠️  [DEBUG] Dropping SSE response with unexpected id: {message.get('id')!r}")
+        return result
+
+    @staticmethod
+    def _server_request_reply(message: Dict[str, Any]) -> Dict[str, Any]:
+        """Reply to a server-initiated request: ping is supported, everything else is refused"""
+        if message.get("method") == "ping":
+            return {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+        return {
+            "jsonrpc": "2.0",
+            "id": message["id"],
+            "error": {"code": -32601, "message": f"Method not supported by client: {message.get('method')}"}
+        }
+
+    def _answer_remote_server_request(self, message: Dict[str, Any]):
+        """Answer a server-initiated request received over SSE (ping only, like stdio)"""
+        reply = self._server_request_reply(message)
+        try:
+            self._get_httpx_client().post(self.base_url, content=codec.dumps(reply), headers=self._build_request_headers(),
+                                         timeout=10)
+        except httpx.HTTPError as e:
+            self._debug_print(f"⚠️  [DEBUG] Could not answer server request: {e}")
+
+    async def _answer_remote_server_request_async(self, client: httpx.AsyncClient, message: Dict[str, Any]):
+        """Asyncio variant of _answer_remote_server_request, on the caller's async client"""
+        reply = self._server_request_reply(message)
+        try:
+            await client.post(self.base_url, content=codec.dumps(reply), headers=self._build_request_headers(),
+                              timeout=10)
+        except httpx.HTTPError as e:
+            self._debug_print(f"⚠️  [DEBUG] Could not answer server request: {e}")
+
+    async def send_request_async(self, method: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Send a JSON-RPC request to a direct-remote MCP server from asyncio code
+
+        Args:
+            method: The RPC method to call
+            params: Parameters for the method
+
+        Returns:
+            Response from the server
+        """
+        if self.connection_mode != "direct-remote":
+            raise RuntimeError("send_request_async is only supported in direct-remote mode")
+
+        if method.startswith("notifications/"):
+            request = {"jsonrpc": "2.0", "method": method}
+        else:
+            request = {"jsonrpc": "2.0", "id": self._next_request_id(), "method": method}
+        if params:
+            request["params"] = params
+
+        return await self._send_direct_remote_request_async(request, method)
+
+    def _debug_print_remote_response(self, response: httpx.Response, body: bool = True):
+        """Print debug details of a direct-remote HTTP response (body only once it has been read)"""
+        self._debug_print(f"\n🔍 [DEBUG] Remote HTTP Response:")
+        self._debug_print(f"   HTTP version: {response.http_version}")
+        self._debug_print(f"   Status Code: {response.status_code}")
+        if body:
+            self._debug_print("   Response Text (first 500 chars): %s", lazy(lambda: response.text[:500]))
+
+    def _capture_session_id(self, response: httpx.Response):
+        """Remember the Mcp-Session-Id the server assigned"""
+        session_id = response.headers.get("Mcp-Session-Id")
+        if session_id:
+            self.mcp_session_id = session_id
+            self._debug_print(f"🔍 [DEBUG] Captured Mcp-Session-Id: {session_id}")
+
+    def _handle_direct_remote_response(self, response: httpx.Response, method: str) -> Dict[str, Any]:
+        """
+        Validate a direct-remote HTTP response and extract the JSON-RPC message.
+
+        Captures the Mcp-Session-Id header, rejects HTML (Burp interception) and
+        non-200 statuses, and accepts empty/202 responses for notifications.
+        """
+        # Capture MCP session ID from response headers
+        self._capture_session_id(response)
+
+        # Check for HTML response (Burp interception)
+        content_type = response.headers.get('Content-Type', '').lower()
+        if 'text/html' in content_type or response.text.strip().startswith('<html'):
+            self._debug_print(f"\n⚠️  [DEBUG] Detected HTML response instead of JSON from remote MCP!")
+            raise RuntimeError(f"Received HTML response instead of JSON from {self.base_url}")
+
+        # 202 Accepted is valid for notifications (MCP Streamable HTTP spec)
+        if response.status_code == 202 and method.startswith("notifications/"):
+            return {"result": "accepted"}
+
+        if response.status_code != 200:
+            raise RuntimeError(f"Remote MCP returned status {response.status_code}")
+
+        if not response.text or not response.text.strip():
+            # notifications/initialized may return empty body
+            if method == "notifications/initialized":
+                return {"result": "initialized"}
+            raise RuntimeError(f"Empty response from remote MCP at {self.base_url}")
+
+        return self._parse_response_body(response.text, response.headers.get('Content-Type', ''))
 
     # ------------------------------------------------------------------
     # MCP OAuth 2.1 implementation (RFC 9728 discovery + PKCE flow)
@@ -885,6 +1634,7 @@ class MCPClient:
         Returns True if a token was obtained, False otherwise.
         """
         print("🔐 Remote MCP server requires authentication — starting OAuth flow...")
+        self._oauth_last_error = None
 
         # --- Step 1: Parse WWW-Authenticate for resource_metadata URL ---
         resource_metadata_url = self._parse_www_authenticate(www_authenticate)
@@ -897,14 +1647,11 @@ class MCPClient:
 
         # --- Step 2: Fetch Protected Resource Metadata ---
         try:
-            self._debug_print(f"🔍 [DEBUG] Fetching resource metadata from: {resource_metadata_url}")
-            with self._get_httpx_client() as client:
-                res = client.get(resource_metadata_url, timeout=10)
-            if res.status_code != 200:
-                print(f"⚠️  Could not fetch resource metadata (HTTP {res.status_code})")
+            status, resource_meta = self._fetch_oauth_metadata(resource_metadata_url)
+            if resource_meta is None:
+                print(f"⚠️  Could not fetch resource metadata (HTTP {status})")
                 return False
-            resource_meta = res.json()
-            self._debug_print(f"🔍 [DEBUG] Resource metadata: {json.dumps(resource_meta, indent=2)}")
+            self._debug_print("🔍 [DEBUG] Resource metadata: %s", LazyJSON(resource_meta))
         except Exception as e:
             print(f"⚠️  Failed to fetch resource metadata: {e}")
             return False
@@ -918,20 +1665,22 @@ class MCPClient:
 
         # --- Step 3: Fetch Authorization Server Metadata ---
         as_meta_url = f"{auth_server_base}/.well-known/oauth-authorization-server"
+        oidc_meta_url = f"{auth_server_base}/.well-known/openid-configuration"
         try:
-            with self._get_httpx_client() as client:
-                self._debug_print(f"🔍 [DEBUG] Fetching auth server metadata from: {as_meta_url}")
-                res = client.get(as_meta_url, timeout=10)
-                if res.status_code != 200:
+            # An issuer only served via the OIDC fallback is still a single cache hit
+            as_meta = self.oauth_discovery.get(as_meta_url) or self.oauth_discovery.get(oidc_meta_url)
+            if as_meta is not None:
+                self._debug_print(f"🔍 [DEBUG] Using cached auth server metadata for: {auth_server_base}")
+            else:
+                status, as_meta = self._fetch_oauth_metadata(as_meta_url)
+                if as_meta is None:
                     # Try OpenID Connect fallback
-                    as_meta_url = f"{auth_server_base}/.well-known/openid-configuration"
-                    self._debug_print(f"🔍 [DEBUG] Falling back to OIDC: {as_meta_url}")
-                    res = client.get(as_meta_url, timeout=10)
-            if res.status_code != 200:
-                print(f"⚠️  Could not fetch auth server metadata (HTTP {res.status_code})")
-                return False
-            as_meta = res.json()
-            self._debug_print(f"🔍 [DEBUG] Auth server metadata: {json.dumps(as_meta, indent=2)}")
+                    self._debug_print(f"🔍 [DEBUG] Falling back to OIDC: {oidc_meta_url}")
+                    status, as_meta = self._fetch_oauth_metadata(oidc_meta_url)
+                if as_meta is None:
+                    print(f"⚠️  Could not fetch auth server metadata (HTTP {status})")
+                    return False
+            self._debug_print("🔍 [DEBUG] Auth server metadata: %s", LazyJSON(as_meta))
         except Exception as e:
             print(f"⚠️  Failed to fetch auth server metadata: {e}")
             return False
@@ -944,14 +1693,34 @@ class MCPClient:
             print("⚠️  Auth server metadata missing authorization_endpoint or token_endpoint")
             return False
 
-        # --- Step 4: Dynamic Client Registration (if supported) ---
+        resource_uri = resource_meta.get("resource", self.base_url)
         client_id = self.server_config.get("oauth_client_id", "")
         client_secret = self.server_config.get("oauth_client_secret", "")
+
+        # --- Refresh token shortcut: one token request instead of a browser login ---
+        if not self.oauth_refresh_token and self.token_store:
+            record = self.token_store.find(resource=resource_uri, client_id=client_id or None)
+            if record and record.get("refresh_token"):
+                self._apply_token_record(record)
         redirect_port = 10836  # local callback port
         redirect_uri = f"http://127.0.0.1:{redirect_port}/callback"
 
+        if self.oauth_refresh_token:
+            self.oauth_token_endpoint = token_endpoint
+            self.oauth_resource = resource_uri
+            self.oauth_client_id = self.oauth_client_id or client_id
+            self.oauth_client_secret = self.oauth_client_secret or client_secret
+            if self.oauth_client_id and self._refresh_oauth_token():
+                return True
+            if self._oauth_last_error in self.INVALID_CLIENT_ERRORS and not client_id:
+                # The registered client behind the saved token is gone as well
+                self.oauth_client_id = None
+                self.oauth_client_secret = None
+
+        # --- Step 4: Dynamic Client Registration (if supported) ---
+        from_registration_cache = False
         if not client_id and registration_endpoint:
-            client_id = self._oauth_dynamic_registration(
+            client_id, client_secret, from_registration_cache = self._oauth_registered_client(
                 registration_endpoint, redirect_uri
             )
 
@@ -961,15 +1730,260 @@ class MCPClient:
             return False
 
         # --- Step 5: Authorization Code + PKCE flow ---
-        resource_uri = resource_meta.get("resource", self.base_url)
+        self.oauth_token_endpoint = token_endpoint
+        self.oauth_resource = resource_uri
         scopes = resource_meta.get("scopes_supported", [])
         scope_str = " ".join(scopes) if scopes else ""
 
-        return self._oauth_authorization_code_flow(
-            authorization_endpoint, token_endpoint,
-            client_id, client_secret, redirect_uri, redirect_port,
-            resource_uri, scope_str
-        )
+        while True:
+            self.oauth_client_id = client_id
+            self.oauth_client_secret = client_secret
+            if self._oauth_authorization_code_flow(
+                authorization_endpoint, token_endpoint,
+                client_id, client_secret, redirect_uri, redirect_port,
+                resource_uri, scope_str
+            ):
+                return True
+
+            # A cached registration the server has since dropped: register again, once
+            if not from_registration_cache or self._oauth_last_error not in self.INVALID_CLIENT_ERRORS:
+                return False
+            print(f"⚠️  Saved OAuth client {client_id} was rejected ({self._oauth_last_error}) — registering a new one")
+            self.client_registrations.forget(client_id)
+            client_id, client_secret, from_registration_cache = self._oauth_registered_client(
+                registration_endpoint, redirect_uri
+            )
+            if not client_id:
+                return False
+
+    def _oauth_registered_client(self, registration_endpoint: str,
+                                 redirect_uri: str) -> Tuple[Optional[str], str, bool]:
+        """
+        Return a dynamically registered client, reusing a cached registration if there is one
+
+        Returns:
+            (client_id or None, client_secret or "", True if it came from the cache)
+        """
+        if self.client_registrations:
+            registration = self.client_registrations.get(registration_endpoint, redirect_uri)
+            if registration:
+                self._debug_print(f"🔍 [DEBUG] Reusing registered OAuth client: {registration['client_id']}")
+                return registration["client_id"], registration.get("client_secret") or "", True
+
+        registration = self._oauth_dynamic_registration(registration_endpoint, redirect_uri)
+        if not registration:
+            return None, "", False
+        if self.client_registrations:
+            self.client_registrations.put(registration_endpoint, redirect_uri, registration)
+        return registration["client_id"], registration.get("client_secret") or "", False
+
+    @staticmethod
+    def _oauth_error_code(response: httpx.Response) -> Optional[str]:
+        """The RFC 6749 "error" code of a failed token/registration response, if any"""
+        try:
+            body = response.json()
+        except ValueError:
+            return None
+        return body.get("error") if isinstance(body, dict) else None
+
+    def _reauthenticate(self, www_authenticate: str, sent_token: Optional[str]) -> bool:
+        """
+        Obtain a new access token after a 401, once for all concurrent callers
+
+        Requests that failed with the same token queue up on the lock; whoever comes
+        after the first one sees the new token and just retries.
+
+        Args:
+            www_authenticate: WWW-Authenticate header of the 401 response
+            sent_token: Access token the failed request was sent with
+        """
+        with self._oauth_lock:
+            if self.oauth_access_token and self.oauth_access_token != sent_token:
+                return True
+            return self._perform_oauth_flow(www_authenticate)
+
+    def _apply_token_record(self, record: Dict[str, Any]):
+        """Load OAuth state from a token store record"""
+        self.oauth_access_token = record.get("access_token")
+        self.oauth_refresh_token = record.get("refresh_token")
+        self.oauth_expires_at = record.get("expires_at")
+        self.oauth_client_id = record.get("client_id")
+        self.oauth_client_secret = record.get("client_secret")
+        self.oauth_token_endpoint = record.get("token_endpoint")
+        self.oauth_resource = record.get("resource")
+
+    def _restore_oauth_tokens(self):
+        """Pick up tokens saved by an earlier run for this server, renewing them if expired"""
+        if not self.token_store or "Authorization" in self.auth_headers:
+            return
+        record = self.token_store.find(server_url=self.base_url,
+                                       client_id=self.server_config.get("oauth_client_id") or None)
+        if not record:
+            return
+
+        with self._oauth_lock:
+            self._apply_token_record(record)
+            remaining = (self.oauth_expires_at or 0) - time.time()
+            if self.oauth_expires_at is None or remaining > 0:
+                if self.oauth_expires_at is None:
+                    print(f"🔑 Restored saved OAuth token for {self.base_url}")
+                else:
+                    print(f"🔑 Restored saved OAuth token for {self.base_url} (expires in {int(remaining)}s)")
+            elif self.oauth_refresh_token and self._refresh_oauth_token():
+                pass
+            else:
+                # Expired and not renewable: let the next 401 start a fresh flow
+                self.oauth_access_token = None
+        self._schedule_token_refresh()
+
+    def _save_oauth_tokens(self, token_resp: Dict[str, Any]):
+        """
+        Apply a token endpoint response and persist it
+
+        Args:
+            token_resp: Parsed token response (access_token, refresh_token, expires_in)
+        """
+        self.oauth_access_token = token_resp.get("access_token")
+        # Servers may omit refresh_token on refresh, meaning the old one stays valid
+        self.oauth_refresh_token = token_resp.get("refresh_token") or self.oauth_refresh_token
+        try:
+            self.oauth_expires_at = time.time() + float(token_resp["expires_in"])
+        except (KeyError, TypeError, ValueError):
+            self.oauth_expires_at = None
+
+        if self.token_store and self.oauth_resource and self.oauth_client_id:
+            self.token_store.put(self.oauth_resource, self.oauth_client_id, {
+                "access_token": self.oauth_access_token,
+                "refresh_token": self.oauth_refresh_token,
+                "expires_at": self.oauth_expires_at,
+                "token_endpoint": self.oauth_token_endpoint,
+                "client_secret": self.oauth_client_secret,
+                "server_url": self.base_url,
+            })
+        self._schedule_token_refresh()
+
+    def _refresh_oauth_token(self) -> bool:
+        """
+        Renew the access token with the refresh_token grant
+
+        Returns:
+            True if a new access token was obtained
+        """
+        with self._oauth_lock:
+            if not self.oauth_refresh_token or not self.oauth_token_endpoint or not self.oauth_client_id:
+                return False
+
+            token_data = {
+                "grant_type": "refresh_token",
+                "refresh_token": self.oauth_refresh_token,
+                "client_id": self.oauth_client_id,
+            }
+            if self.oauth_resource:
+                token_data["resource"] = self.oauth_resource
+            if self.oauth_client_secret:
+                token_data["client_secret"] = self.oauth_client_secret
+
+            try:
+                self._debug_print(f"🔍 [DEBUG] Refreshing OAuth token at: {self.oauth_token_endpoint}")
+                res = self._get_httpx_client().post(self.oauth_token_endpoint, data=token_data,
+                                                    headers={"Content-Type": "application/x-www-form-urlencoded"},
+                                                    timeout=10)
+            except Exception as e:
+                print(f"⚠️  OAuth token refresh failed: {e}")
+                return False
+
+            self._oauth_last_error = None if res.status_code == 200 else self._oauth_error_code(res)
+            if res.status_code != 200:
+                print(f"⚠️  OAuth token refresh failed (HTTP {res.status_code}): {res.text[:300]}")
+                if res.status_code in (400, 401):
+                    # Refresh token revoked or expired: forget it so the next 401 starts a browser flow
+                    self.oauth_refresh_token = None
+                    if self.token_store and self.oauth_resource:
+                        self.token_store.delete(self.oauth_resource, self.oauth_client_id)
+                    if self._oauth_last_error in self.INVALID_CLIENT_ERRORS and self.client_registrations:
+                        # ...and a registered client the server no longer knows must not be reused
+                        self.client_registrations.forget(self.oauth_client_id)
+                return False
+
+            try:
+                token_resp = res.json()
+            except ValueError:
+                token_resp = {}
+            if not token_resp.get("access_token"):
+                print(f"⚠️  Refresh response did not contain access_token: {res.text[:300]}")
+                return False
+
+            self._save_oauth_tokens(token_resp)
+            print(f"🔄 OAuth token refreshed (expires in {token_resp.get('expires_in', 'unknown')}s)")
+            return True
+
+    def _schedule_token_refresh(self):
+        """Make the background refresher (re)consider the current token's expiry"""
+        if not self.oauth_refresh_token or self.oauth_expires_at is None or self._token_refresh_stopped:
+            return
+        if self._token_refresh_thread is None or not self._token_refresh_thread.is_alive():
+            self._token_refresh_thread = threading.Thread(
+                target=self._token_refresh_loop,
+                daemon=True,
+                name="MCPTokenRefresher"
+            )
+            self._token_refresh_thread.start()
+        self._token_refresh_wakeup.set()
+
+    def _token_refresh_loop(self):
+        """Background thread: renew the access token shortly before it expires"""
+        failures = 0
+        while not self._token_refresh_stopped:
+            self._token_refresh_wakeup.clear()
+            expires_at = self.oauth_expires_at
+            if not self.oauth_refresh_token or expires_at is None:
+                self._token_refresh_wakeup.wait()
+                continue
+
+            # Renew 10% of the lifetime (at most a minute) ahead of expiry
+            lifetime = max(0.0, expires_at - time.time())
+            delay = lifetime - min(self.TOKEN_REFRESH_MARGIN, lifetime / 10)
+            if failures:
+                delay = max(delay, min(self.TOKEN_REFRESH_MARGIN, 5.0 * 2 ** failures))
+            if delay > 0 and self._token_refresh_wakeup.wait(delay):
+                continue  # token changed or refresher stopped: re-evaluate
+            if self._token_refresh_stopped or self.oauth_expires_at != expires_at:
+                continue
+
+            if self._refresh_oauth_token():
+                failures = 0
+            else:
+                failures += 1
+
+    def _stop_token_refresher(self):
+        """Stop the background token refresher"""
+        self._token_refresh_stopped = True
+        self._token_refresh_wakeup.set()
+
+    def _fetch_oauth_metadata(self, url: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """
+        GET an OAuth discovery document, served from the discovery cache while fresh
+
+        Args:
+            url: Metadata URL
+
+        Returns:
+            (HTTP status, parsed document or None if it could not be fetched)
+        """
+        cached = self.oauth_discovery.get(url)
+        if cached is not None:
+            self._debug_print(f"🔍 [DEBUG] Using cached OAuth metadata: {url}")
+            return 200, cached
+
+        self._debug_print(f"🔍 [DEBUG] Fetching OAuth metadata from: {url}")
+        res = self._get_httpx_client().get(url, timeout=10)
+        if res.status_code != 200:
+            return res.status_code, None
+        metadata = res.json()
+        if not isinstance(metadata, dict):
+            return res.status_code, None
+        self.oauth_discovery.put(url, metadata, res.headers)
+        return res.status_code, metadata
 
     def _parse_www_authenticate(self, header: str) -> Optional[str]:
         """Extract resource_metadata URL from WWW-Authenticate: Bearer ... header."""
@@ -983,8 +1997,8 @@ class MCPClient:
         return None
 
     def _oauth_dynamic_registration(self, registration_endpoint: str,
-                                     redirect_uri: str) -> Optional[str]:
-        """Attempt RFC 7591 Dynamic Client Registration. Returns client_id or None."""
+                                     redirect_uri: str) -> Optional[Dict[str, Any]]:
+        """Attempt RFC 7591 Dynamic Client Registration. Returns the registration response or None."""
         reg_body = {
             "client_name": "Appsecco MCP Client",
             "redirect_uris": [redirect_uri],
@@ -994,15 +2008,17 @@ class MCPClient:
         }
         try:
             self._debug_print(f"🔍 [DEBUG] Attempting dynamic client registration at: {registration_endpoint}")
-            with self._get_httpx_client() as client:
-                res = client.post(registration_endpoint, json=reg_body,
-                                  headers={"Content-Type": "application/json"}, timeout=10)
+            res = self._get_httpx_client().post(registration_endpoint, json=reg_body,
+                                                headers={"Content-Type": "application/json"}, timeout=10)
             if res.status_code in (200, 201):
                 data = res.json()
                 cid = data.get("client_id")
+                if not cid:
+                    self._debug_print(f"⚠️  [DEBUG] Registration response has no client_id: {res.text[:300]}")
+                    return None
                 self._debug_print(f"🔍 [DEBUG] Registered client_id: {cid}")
                 print(f"✅ Dynamically registered OAuth client: {cid}")
-                return cid
+                return data
             else:
                 self._debug_print(f"⚠️  [DEBUG] Registration returned {res.status_code}: {res.text[:300]}")
         except Exception as e:
@@ -1085,6 +2101,7 @@ class MCPClient:
         callback_thread.join(timeout=120)
         callback_server.server_close()
 
+        self._oauth_last_error = auth_code_result["error"]
         if auth_code_result["error"]:
             print(f"❌ OAuth authorization failed: {auth_code_result['error']}")
             return False
@@ -1107,20 +2124,19 @@ class MCPClient:
 
         try:
             self._debug_print(f"🔍 [DEBUG] Exchanging auth code at: {token_endpoint}")
-            with self._get_httpx_client() as client:
-                res = client.post(token_endpoint, data=token_data,
-                                  headers={"Content-Type": "application/x-www-form-urlencoded"},
-                                  timeout=10)
+            res = self._get_httpx_client().post(token_endpoint, data=token_data,
+                                                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                                                timeout=10)
             if res.status_code != 200:
+                self._oauth_last_error = self._oauth_error_code(res)
                 print(f"❌ Token exchange failed (HTTP {res.status_code}): {res.text[:300]}")
                 return False
 
             token_resp = res.json()
-            self.oauth_access_token = token_resp.get("access_token")
-            self.oauth_refresh_token = token_resp.get("refresh_token")
             expires_in = token_resp.get("expires_in", "unknown")
 
-            if self.oauth_access_token:
+            if token_resp.get("access_token"):
+                self._save_oauth_tokens(token_resp)
                 print(f"✅ OAuth token obtained (expires in {expires_in}s)")
                 self._debug_print(f"🔍 [DEBUG] Access token (first 20 chars): {self.oauth_access_token[:20]}...")
                 return True
@@ -1143,61 +2159,86 @@ class MCPClient:
         Returns:
             Response from the server
         """
-        if not self.process:
+        if not self.process or not self.stdio_transport:
             raise RuntimeError("MCP server not started")
 
+        # Notifications get no response — write and return immediately
+        if method.startswith("notifications/"):
+            request = {"jsonrpc": "2.0", "method": method}
+            if params:
+                request["params"] = params
+            self.stdio_transport.send(request)
+            self._capture("stdio", request)
+            return {"result": "accepted"}
+
         request = {
             "jsonrpc": "2.0",
-            "id": self.request_id,
+            "id": self._next_request_id(),
             "method": method
         }
 
         if params:
             request["params"] = params
 
-        self.request_id += 1
-
-        # Send request
-        request_str = json.dumps(request) + "\n"
-        self.process.stdin.write(request_str)
-        self.process.stdin.flush()
-
-        # Read response
-        response_line = self.process.stdout.readline()
-        if not response_line:
-            raise RuntimeError("No response from server")
-
+        # The transport's reader thread correlates the response by id, so other
+        # requests (and server notifications) may be interleaved on stdout
+        started = time.perf_counter()
         try:
-            return json.loads(response_line)
-        except json.JSONDecodeError as e:
-            raise RuntimeError(f"Invalid JSON response: {e}")
+            response = self.stdio_transport.request(request)
+        except Exception as e:
+            self._capture("stdio", request, started=started, error=str(e) or type(e).__name__)
+            raise
+        self._capture("stdio", request, response, started)
+        return response
+
+    def _initialize_params(self) -> Dict[str, Any]:
+        """Parameters of the MCP initialize request"""
+        return {
+            "protocolVersion": "2025-06-18",
+            "clientInfo": {
+                "name": "appsecco-mcp-client",
+                "version": "1.0.0"
+            },
+            "capabilities": {}
+        }
 
     def initialize(self) -> bool:
         """Initialize the MCP connection"""
         try:
-            init_params = {
-                "protocolVersion": "2025-06-18",
-                "clientInfo": {
-                    "name": "appsecco-mcp-client",
-                    "version": "1.0.0"
-                },
-                "capabilities": {}
-            }
-
-            response = self.send_request("initialize", init_params)
+            if self._handshake_response is not None:
+                # The readiness probe already completed the handshake over stdio
+                response, self._handshake_response = self._handshake_response, None
+                self._debug_print(f"🔍 [DEBUG] Reusing initialize response from readiness probe")
+            elif self._pending_handshake is not None:
+                # The probe's initialize is still outstanding: wait for its response
+                future, init_request, started = self._pending_handshake
+                self._pending_handshake = None
+                self._debug_print(f"🔍 [DEBUG] Waiting for the readiness probe's initialize response")
+                try:
+                    response = future.result(timeout=self.HANDSHAKE_TIMEOUT)
+                except FutureTimeoutError:
+                    self.stdio_transport.cancel(future)
+                    self._capture("stdio", init_request, started=started, error="timeout")
+                    raise RuntimeError(f"No response to initialize after {self.HANDSHAKE_TIMEOUT}s")
+                self._capture("stdio", init_request, response, started)
+            else:
+                response = self.send_request("initialize", self._initialize_params())
 
 
             if "result" in response:
                 self.initialized = True
+                self.server_info = response["result"] if isinstance(response["result"], dict) else {}
                 print(f"✅ MCP Initialize done")
 
                 return True
             else:
                 print(f"❌ Initialization failed: {response}")
+                self._print_stderr_tail()
                 return False
 
         except Exception as e:
             print(f"❌ Error during initialization: {e}")
+            self._print_stderr_tail()
             return False
 
     def initialized_notification(self) -> bool:
@@ -1213,17 +2254,64 @@ class MCPClient:
             return False
 
     def list_tools(self) -> List[Dict[str, Any]]:
-        """List available tools from the MCP server"""
+        """
+        List available tools, from the tools cache when it has a usable entry
+
+        A fresh cache entry is returned as is. An expired one is returned right away
+        with a background refresh in stale-while-revalidate mode; otherwise the server
+        is asked again and the cache updated.
+        """
+        if self.tools_cache:
+            cached = self.tools_cache.get(self.tools_fingerprint)
+            if cached is not None:
+                tools, fresh = cached
+                if fresh:
+                    self._debug_print("🔍 [DEBUG] Using cached tool list (%d tools)", len(tools))
+                    self.tools = {tool["name"]: tool for tool in tools}
+                    return tools
+                if self.stale_while_revalidate and tools:
+                    self._debug_print("🔍 [DEBUG] Using stale cached tool list, refreshing in background")
+                    self.tools = {tool["name"]: tool for tool in tools}
+                    self._refresh_tools_in_background()
+                    return tools
+
+        return self._fetch_tools()
+
+    def _refresh_tools_in_background(self):
+        """Re-fetch tools/list on a daemon thread (at most one refresh at a time)"""
+        if self._tools_refresh_thread and self._tools_refresh_thread.is_alive():
+            return
+        self._tools_refresh_thread = threading.Thread(
+            target=self._fetch_tools,
+            kwargs={"quiet": True},
+            daemon=True,
+            name="MCPToolsRefresh"
+        )
+        self._tools_refresh_thread.start()
+
+    def _fetch_tools(self, quiet: bool = False) -> List[Dict[str, Any]]:
+        """
+        Ask the server for its tools and update self.tools and the tools cache
+
+        Args:
+            quiet: Only report failures in debug mode (background refresh)
+        """
         try:
             response = self.send_request("tools/list", {})
 
             if "result" in response and "tools" in response["result"]:
                 tools = response["result"]["tools"]
                 self.tools = {tool["name"]: tool for tool in tools}
+                if self.tools_cache:
+                    self.tools_cache.put(self.tools_fingerprint, tools)
 
                 return tools
+            elif quiet:
+                self._debug_print("⚠️  [DEBUG] Background tools refresh failed: %s", response)
+                return []
             else:
                 print(f"❌ Failed to get tools: {response}")
+                self._print_stderr_tail()
                 get_analytics().track_error("target_mcp_tools_failed_to_list", {
                     "response": response
                 })
@@ -1232,7 +2320,11 @@ class MCPClient:
 
 
         except Exception as e:
+            if quiet:
+                self._debug_print("⚠️  [DEBUG] Background tools refresh failed: %s", e)
+                return []
             print(f"❌ Error listing tools: {e}")
+            self._print_stderr_tail()
             return []
 
     def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
@@ -1258,17 +2350,37 @@ class MCPClient:
                 return response["result"]
             else:
                 print(f"❌ Tool call failed: {response}")
+                self._print_stderr_tail()
                 return {}
 
         except Exception as e:
             print(f"❌ Error calling tool: {e}")
+            self._print_stderr_tail()
             return {}
 
 
+class MCPProxyServer(ThreadingHTTPServer):
+    """
+    Thread-per-connection HTTP server for the local MCP proxy.
+
+    Connections are served concurrently (HTTP/1.1 keep-alive), while the number of
+    requests forwarded to the stdio server at the same time is capped by
+    `request_slots`. The stdio transport multiplexes those requests safely.
+    """
+
+    daemon_threads = True
+    block_on_close = False
+
+    def __init__(self, server_address, handler_class, max_concurrency: int = 32):
+        self.max_concurrency = max_concurrency
+        self.request_slots = threading.BoundedSemaphore(max_concurrency)
+        super().__init__(server_address, handler_class)
+
+
 class GenericMCPApp:
     """Appsecco MCP Client PST - Professional Security Testing Application with interactive interface"""
 
-    def __init__(self, config_file: str = "mcp_config.json", proxy_url: str = "http://127.0.0.1:8080", use_burp_proxy: bool = True, use_proxychains: bool = True, bypass_ssl: bool = True, debug: bool = False):
+    def __init__(self, config_file: str = "mcp_config.json", proxy_url: str = "http://127.0.0.1:8080", use_burp_proxy: bool = True, use_proxychains: bool = True, bypass_ssl: bool = True, debug: bool = False, proxy_health_ttl: float = 5.0, proxy_max_concurrency: int = 32, proxy_request_timeout: Optional[float] = None, readiness: str = "auto", stderr_buffer_lines: int = 200, log_server_stderr: bool = False, tools_cache_ttl: float = 0.0, stale_while_revalidate: bool = False, persist_tokens: bool = True, capture_path: Optional[str] = None):
         """
         Initialize the Appsecco MCP Client PST application
 
@@ -1279,6 +2391,16 @@ class GenericMCPApp:
             use_proxychains: Whether to use proxychains for MCP server processes
             bypass_ssl: Whether to bypass SSL certificate verification
             debug: Whether to print debug messages
+            proxy_health_ttl: Seconds before an unhealthy local proxy is re-probed
+            proxy_max_concurrency: Max requests the local proxy forwards to the MCP server at once
+            proxy_request_timeout: Seconds a proxied request waits for the MCP server's response (None: no limit)
+            readiness: Server readiness detection mode ("initialize" or "output")
+            stderr_buffer_lines: Recent MCP server stderr lines kept for diagnostics
+            log_server_stderr: Copy MCP server stderr into the session log
+            tools_cache_ttl: Seconds a cached tools/list result stays fresh (0 disables the cache)
+            stale_while_revalidate: Show an expired cached tool list at once and refresh it in the background
+            persist_tokens: Keep OAuth tokens and dynamically registered clients in the encrypted on-disk stores
+            capture_path: Append every JSON-RPC exchange to this JSONL file (None: no capture)
         """
         self.config = MCPConfig(config_file)
         self.client = None
@@ -1288,6 +2410,26 @@ class GenericMCPApp:
         self.use_proxychains = use_proxychains
         self.bypass_ssl = bypass_ssl
         self.debug = debug
+        self.proxy_health_ttl = proxy_health_ttl
+        self.proxy_max_concurrency = proxy_max_concurrency
+        self.proxy_request_timeout = proxy_request_timeout
+        self.readiness = readiness
+        self.stderr_buffer_lines = stderr_buffer_lines
+        self.log_server_stderr = log_server_stderr
+        self.tools_cache = ToolsCache(ttl=tools_cache_ttl) if tools_cache_ttl > 0 else None
+        self.stale_while_revalidate = stale_while_revalidate
+        self.token_store = TokenStore() if persist_tokens else None
+        # One instance for every client: they share its file, and separate instances
+        # rewriting it would drop each other's entries (e.g. during fan-out)
+        self.oauth_discovery = DiscoveryCache()
+        self.client_registrations = ClientRegistrationCache() if persist_tokens else None
+        self.capture = None
+        if capture_path:
+            try:
+                self.capture = TrafficCapture(capture_path)
+                print(f"📼 Capturing JSON-RPC traffic to: {capture_path}")
+            except OSError as e:
+                print(f"⚠️  Could not open capture file '{capture_path}': {e}")
         self.proxy_server = None
         self.proxy_thread = None
 
@@ -1299,6 +2441,28 @@ class GenericMCPApp:
             "proxy_url": proxy_url
         })
 
+    def _create_client(self, server_name: str) -> Optional[MCPClient]:
+        """Build an MCPClient for a configured server using the app-wide settings"""
+        server_config = self.config.get_server_config(server_name)
+        if not server_config:
+            print(f"❌ Invalid configuration for server: {server_name}")
+            return None
+
+        client = MCPClient(server_config, self.proxy_url, self.use_proxychains, self.bypass_ssl, self.debug,
+                           proxy_health_ttl=self.proxy_health_ttl, readiness=self.readiness,
+                           stderr_buffer_lines=self.stderr_buffer_lines,
+                           log_server_stderr=self.log_server_stderr,
+                           tools_cache=self.tools_cache,
+                           stale_while_revalidate=self.stale_while_revalidate,
+                           token_store=self.token_store,
+                           client_registrations=self.client_registrations,
+                           capture=self.capture,
+                           server_name=server_name,
+                           oauth_discovery=self.oauth_discovery)
+        # Set Burp proxy setting
+        client.use_burp_proxy = self.use_burp_proxy
+        return client
+
     def select_server(self) -> bool:
         """Let user select an MCP server"""
         servers = self.config.list_servers()
@@ -1318,17 +2482,14 @@ class GenericMCPApp:
 
                 if 0 <= server_index < len(servers):
                     server_name = servers[server_index]
-                    server_config = self.config.get_server_config(server_name)
+                    client = self._create_client(server_name)
 
-                    if server_config:
+                    if client:
                         self.current_server = server_name
-                        self.client = MCPClient(server_config, self.proxy_url, self.use_proxychains, self.bypass_ssl, self.debug)
-                        # Set Burp proxy setting
-                        self.client.use_burp_proxy = self.use_burp_proxy
+                        self.client = client
                         print(f"✅ Appsecco MCP Client PST - Selected server: {server_name}")
                         return True
                     else:
-                        print(f"❌ Invalid configuration for server: {server_name}")
                         return False
                 else:
                     print(f"❌ Please enter a number between 1 and {len(servers)}")
@@ -1352,12 +2513,8 @@ class GenericMCPApp:
         # Start proxy server if requested (not needed for direct-remote mode)
         if self.client.connection_mode == "direct-remote":
             print(f"🌐 Direct remote MCP — skipping local proxy server")
-        elif start_proxy and self.client.process:
+        elif start_proxy and self.client.stdio_transport:
             self._start_proxy_server(proxy_port)
-
-            # Give proxy server a moment to start
-            import time
-            time.sleep(1)
         else:
             print(f"⚠️  Proxy server not enabled")
 
@@ -1370,9 +2527,19 @@ class GenericMCPApp:
         return True
 
 
-    def _start_proxy_server(self, port: int = 3000):
-        """Start the HTTP proxy server in a separate thread"""
-        from http.server import HTTPServer, BaseHTTPRequestHandler
+    def _start_proxy_server(self, port: int = 3000, client: Optional[MCPClient] = None) -> Optional[MCPProxyServer]:
+        """
+        Start the HTTP proxy server in a separate thread
+
+        Args:
+            port: Local port to listen on
+            client: Client whose stdio server is proxied (defaults to the selected client,
+                    which also records the server in self.proxy_server)
+
+        Returns:
+            The running proxy server, or None if it could not be started
+        """
+        from http.server import BaseHTTPRequestHandler
         import threading
         import socket
 
@@ -1395,17 +2562,28 @@ class GenericMCPApp:
         except Exception as e:
             print(f"⚠️  Could not check port availability: {e}")
 
-        # Store the MCP process reference and debug flag
-        mcp_process = self.client.process
+        client = client or self.client
+        # Point the client at this proxy instance
+        client.base_url = f"http://localhost:{port}"
+
+        # Store the MCP stdio transport reference and debug flag
+        stdio_transport = client.stdio_transport
         debug_flag = self.debug
 
-        # Create a closure to capture mcp_process and debug_flag
-        def create_handler_class(mcp_process_ref, debug):
+        proxy_logger = get_logger("proxy")
+
+        # Create a closure to capture stdio_transport and debug_flag
+        def create_handler_class(transport_ref, debug, passthrough, capture_ref, server_name, request_timeout):
             class MCPProxyHandler(BaseHTTPRequestHandler):
-                def _debug_print(self, *args, **kwargs):
-                    """Print debug message if debug mode is enabled"""
+                # HTTP/1.1 keeps client connections (and Burp's) alive between requests;
+                # idle connections are dropped after `timeout` seconds
+                protocol_version = "HTTP/1.1"
+                timeout = 120
+
+                def _debug_print(self, msg, *args):
+                    """Log debug message (lazily formatted) if debug mode is enabled"""
                     if debug:
-                        print(*args, **kwargs)
+                        proxy_logger.debug(msg, *args)
                 def do_POST(self):
                     self._debug_print(f"\n🔍 [PROXY DEBUG] Received POST request to: {self.path}")
                     if self.path == '/mcp':
@@ -1415,45 +2593,74 @@ class GenericMCPApp:
                             post_data = self.rfile.read(content_length)
                             self._debug_print(f"🔍 [PROXY DEBUG] Read {len(post_data)} bytes of POST data")
 
-                            request = json.loads(post_data.decode('utf-8'))
-                            self._debug_print(f"🔍 [PROXY DEBUG] Parsed request: {json.dumps(request, indent=2)}")
-
-                            self._debug_print(f"🔍 [PROXY DEBUG] Forwarding request to MCP server via stdio...")
-                            response = self.forward_to_mcp(request)
-                            self._debug_print(f"🔍 [PROXY DEBUG] Received response from MCP: {json.dumps(response, indent=2)}")
+                            # Passthrough: route on id/method only and forward the raw bytes.
+                            # A second "id" anywhere (e.g. a duplicate key after params) could
+                            # override the spliced one, so such bodies take the parsed path.
+                            envelope = codec.scan_envelope(post_data) if passthrough else None
+                            if envelope is not None and not envelope.is_response and (
+                                    envelope.id_raw is None or post_data.count(b'"id"') == 1):
+                                # Still reject malformed JSON here: the server's parse error
+                                # would carry a null id and never reach this request
+                                codec.loads(post_data)
+                                started = time.perf_counter()
+                                with self.server.request_slots:
+                                    response_json = self.forward_raw_to_mcp(post_data, envelope)
+                                if capture_ref is not None:
+                                    capture_ref.record("proxy", "stdio", post_data, response_json, started,
+                                                       server=server_name)
+                            else:
+                                request = codec.loads(post_data)
+                                self._debug_print("🔍 [PROXY DEBUG] Parsed request: %s", LazyJSON(request))
+
+                                self._debug_print(f"🔍 [PROXY DEBUG] Forwarding request to MCP server via stdio...")
+                                started = time.perf_counter()
+                                with self.server.request_slots:
+                                    response = self.forward_to_mcp(request)
+                                self._debug_print("🔍 [PROXY DEBUG] Received response from MCP: %s", LazyJSON(response))
+
+                                response_json = codec.dumps(response)
+                                if capture_ref is not None:
+                                    capture_ref.record("proxy", "stdio", post_data, response_json, started,
+                                                       server=server_name)
 
                             self._debug_print(f"🔍 [PROXY DEBUG] Sending HTTP 200 response...")
                             self.send_response(200)
                             self.send_header('Content-type', 'application/json')
+                            self.send_header('Content-Length', str(len(response_json)))
                             self.send_header('Access-Control-Allow-Origin', '*')
                             self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
                             self.send_header('Access-Control-Allow-Headers', 'Content-Type')
                             self.end_headers()
 
-                            response_json = json.dumps(response)
                             self._debug_print(f"🔍 [PROXY DEBUG] Writing response JSON ({len(response_json)} bytes)...")
-                            self.wfile.write(response_json.encode('utf-8'))
+                            self.wfile.write(response_json)
                             self.wfile.flush()
                             self._debug_print(f"🔍 [PROXY DEBUG] Response sent successfully")
 
                         except Exception as e:
                             self._debug_print(f"❌ [PROXY DEBUG] Proxy error: {e}")
                             import traceback
-                            self._debug_print(traceback.format_exc())
+                            self._debug_print("%s", lazy(traceback.format_exc))
                             try:
+                                error_response = codec.dumps({"error": str(e), "type": "proxy_error"})
                                 self.send_response(500)
                                 self.send_header('Content-type', 'application/json')
+                                self.send_header('Content-Length', str(len(error_response)))
                                 self.end_headers()
-                                error_response = {"error": str(e), "type": "proxy_error"}
-                                self.wfile.write(json.dumps(error_response).encode('utf-8'))
+                                self.wfile.write(error_response)
                                 self.wfile.flush()
                             except Exception as send_err:
                                 self._debug_print(f"❌ [PROXY DEBUG] Failed to send error response: {send_err}")
                     else:
                         self._debug_print(f"❌ Proxy received request to unknown path: {self.path}")
+                        # Drain any body so the keep-alive connection stays in sync
+                        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                        not_found = codec.dumps({"error": f"Path {self.path} not found"})
                         self.send_response(404)
+                        self.send_header('Content-type', 'application/json')
+                        self.send_header('Content-Length', str(len(not_found)))
                         self.end_headers()
-                        self.wfile.write(json.dumps({"error": f"Path {self.path} not found"}).encode('utf-8'))
+                        self.wfile.write(not_found)
 
                 def do_OPTIONS(self):
                     """Handle CORS preflight requests"""
@@ -1461,68 +2668,66 @@ class GenericMCPApp:
                     self.send_header('Access-Control-Allow-Origin', '*')
                     self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
                     self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+                    self.send_header('Content-Length', '0')
                     self.end_headers()
 
-                def forward_to_mcp(self, request):
-                    """Forward request to MCP stdio server"""
-                    self._debug_print(f"🔍 [PROXY DEBUG] forward_to_mcp called with method: {request.get('method', 'unknown')}")
-
-                    if not mcp_process_ref:
-                        self._debug_print(f"❌ [PROXY DEBUG] MCP server process reference is None")
+                def _transport_error(self):
+                    """Error response if the stdio server cannot take requests, else None"""
+                    if not transport_ref:
+                        self._debug_print(f"❌ [PROXY DEBUG] MCP stdio transport is not available")
                         return {"error": "MCP server not available"}
 
-                    process_status = mcp_process_ref.poll()
+                    process_status = transport_ref.process.poll()
                     self._debug_print(f"🔍 [PROXY DEBUG] MCP process poll() result: {process_status} (None = running)")
                     if process_status is not None:
                         self._debug_print(f"❌ [PROXY DEBUG] MCP server process has exited with code: {process_status}")
                         return {"error": "MCP server process has exited"}
+                    return None
 
-                    try:
-                        # Send request to MCP server via stdio
-                        request_str = json.dumps(request) + "\n"
-                        self._debug_print(f"🔍 [PROXY DEBUG] Sending request to MCP server via stdio:")
-                        self._debug_print(f"   Request string: {repr(request_str)}")
-                        self._debug_print(f"   Request length: {len(request_str)} bytes")
-
-                        mcp_process_ref.stdin.write(request_str)
-                        mcp_process_ref.stdin.flush()
-                        self._debug_print(f"🔍 [PROXY DEBUG] Request written and flushed to MCP server stdin")
+                def forward_raw_to_mcp(self, post_data, envelope):
+                    """Forward an encoded request to the MCP stdio server and return the encoded response"""
+                    error = self._transport_error()
+                    if error is not None:
+                        return codec.dumps(error)
 
-                        if request["method"] == "notifications/initialized":
-                            self._debug_print(f"🔍 [PROXY DEBUG] This is a notification, returning immediate response")
-                            response = {"result": "initialized"}
-                        else:
-                            # Read response
-                            self._debug_print(f"🔍 [PROXY DEBUG] Waiting for response from MCP server stdout...")
-                            self._debug_print(f"🔍 [PROXY DEBUG] stdout readable: {mcp_process_ref.stdout.readable()}")
-
-                            # Note: readline() will block until a line is available or EOF
-                            # This is expected behavior for MCP stdio communication
-                            self._debug_print(f"🔍 [PROXY DEBUG] Calling readline() (this may block until response is available)...")
-                            response_line = mcp_process_ref.stdout.readline()
-                            self._debug_print(f"🔍 [PROXY DEBUG] Read line from stdout: {repr(response_line)}")
-                            self._debug_print(f"🔍 [PROXY DEBUG] Response line length: {len(response_line) if response_line else 0}")
+                    try:
+                        if envelope.id_raw is None:
+                            transport_ref.send_raw(post_data)
+                            if envelope.method == "notifications/initialized":
+                                return codec.dumps({"result": "initialized"})
+                            return codec.dumps({"result": "accepted"})
+                        return transport_ref.request_raw(post_data, envelope, timeout=request_timeout)
+                    except Exception as e:
+                        return codec.dumps({"error": f"Communication error: {str(e)}"})
 
-                            if not response_line:
-                                self._debug_print(f"❌ [PROXY DEBUG] No response line received from MCP server")
-                                return {"error": "No response from MCP server"}
+                def forward_to_mcp(self, request):
+                    """Forward request to MCP stdio server"""
+                    self._debug_print(f"🔍 [PROXY DEBUG] forward_to_mcp called with method: {request.get('method', 'unknown')}")
 
-                            self._debug_print(f"🔍 [PROXY DEBUG] Attempting to parse JSON from response line...")
-                            response = json.loads(response_line.strip())
-                            self._debug_print(f"🔍 [PROXY DEBUG] Successfully parsed JSON response")
+                    error = self._transport_error()
+                    if error is not None:
+                        return error
 
+                    try:
+                        if "id" not in request:
+                            # Notifications get no response from the server
+                            transport_ref.send(request)
+                            self._debug_print(f"🔍 [PROXY DEBUG] This is a notification, returning immediate response")
+                            if request.get("method") == "notifications/initialized":
+                                return {"result": "initialized"}
+                            return {"result": "accepted"}
+
+                        # The transport multiplexes concurrent requests over the single
+                        # stdio pipe and correlates the response by JSON-RPC id
+                        self._debug_print(f"🔍 [PROXY DEBUG] Sending request to MCP server via stdio transport (id {request.get('id')!r})...")
+                        response = transport_ref.request(request, timeout=request_timeout)
+                        self._debug_print(f"🔍 [PROXY DEBUG] Received correlated response for id {response.get('id')!r}")
                         return response
 
-                    except json.JSONDecodeError as json_err:
-                        self._debug_print(f"❌ [PROXY DEBUG] JSON decode error: {json_err}")
-                        self._debug_print(f"   Response line was: {repr(response_line) if 'response_line' in locals() else 'N/A'}")
-                        import traceback
-                        self._debug_print(traceback.format_exc())
-                        return {"error": f"JSON decode error: {str(json_err)}"}
                     except Exception as e:
                         self._debug_print(f"❌ [PROXY DEBUG] MCP communication error: {e}")
                         import traceback
-                        self._debug_print(traceback.format_exc())
+                        self._debug_print("%s", lazy(traceback.format_exc))
                         return {"error": f"Communication error: {str(e)}"}
 
                 def log_message(self, format, *args):
@@ -1531,31 +2736,34 @@ class GenericMCPApp:
 
             return MCPProxyHandler
 
-        MCPProxyHandler = create_handler_class(mcp_process, debug_flag)
+        # Full parsing is only needed to pretty-print traffic in debug mode
+        MCPProxyHandler = create_handler_class(stdio_transport, debug_flag, passthrough=not debug_flag,
+                                               capture_ref=client.capture, server_name=client.server_name,
+                                               request_timeout=self.proxy_request_timeout)
 
         try:
             if self.debug:
-                print(f"🔍 [PROXY DEBUG] Creating HTTPServer on localhost:{port}")
-            self.proxy_server = HTTPServer(('localhost', port), MCPProxyHandler)
+                print(f"🔍 [PROXY DEBUG] Creating threaded HTTP server on localhost:{port} (max concurrency {self.proxy_max_concurrency})")
+            proxy_server = MCPProxyServer(('localhost', port), MCPProxyHandler,
+                                          max_concurrency=self.proxy_max_concurrency)
             if self.debug:
-                print(f"🔍 [PROXY DEBUG] HTTPServer created, starting in thread...")
+                print(f"🔍 [PROXY DEBUG] HTTP server created, starting in thread...")
 
             # Start proxy server in a separate thread
-            self.proxy_thread = threading.Thread(
-                target=self.proxy_server.serve_forever,
+            proxy_thread = threading.Thread(
+                target=proxy_server.serve_forever,
                 daemon=True,
-                name="MCPProxyThread"
+                name=f"MCPProxyThread-{port}"
             )
-            self.proxy_thread.start()
-            if self.debug:
-                print(f"🔍 [PROXY DEBUG] Proxy server thread started: {self.proxy_thread.name}")
-
-            # Give it a moment to bind
-            import time
-            time.sleep(1)
+            proxy_thread.start()
+            if client is self.client:
+                self.proxy_server = proxy_server
+                self.proxy_thread = proxy_thread
             if self.debug:
-                print(f"🔍 [PROXY DEBUG] Waiting for proxy server to bind to port {port}...")
+                print(f"🔍 [PROXY DEBUG] Proxy server thread started: {proxy_thread.name}")
 
+            # The listening socket is bound in the server constructor, so it is
+            # accepting connections already — no need to sleep before verifying
             # Verify the server is actually listening
             try:
                 test_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -1573,20 +2781,306 @@ class GenericMCPApp:
                 if self.debug:
                     print(f"⚠️  [PROXY DEBUG] Error testing proxy server connectivity: {e}")
 
+            return proxy_server
+
         except Exception as e:
             print(f"❌ Failed to start HTTP proxy server: {e}")
             if self.debug:
                 import traceback
                 traceback.print_exc()
+            return None
 
-    def stop_proxy_server(self):
-        """Stop the HTTP proxy server"""
+    def stop_proxy_server(self, proxy_server: Optional[MCPProxyServer] = None):
+        """Stop the HTTP proxy server (the selected client's one unless another is given)"""
+        if proxy_server is not None and proxy_server is not self.proxy_server:
+            proxy_server.shutdown()
+            proxy_server.server_close()
+            print(f"🛑 HTTP proxy server on port {proxy_server.server_address[1]} stopped")
+            return
         if self.proxy_server:
             self.proxy_server.shutdown()
+            self.proxy_server.server_close()
             self.proxy_server = None
             self.proxy_thread = None
             print("🛑 HTTP proxy server stopped")
 
+    def open_session(self, server_name: str, start_proxy: bool = False,
+                     proxy_port: int = 3000) -> Optional[Tuple[MCPClient, Optional[MCPProxyServer]]]:
+        """
+        Start and initialize a configured server without prompting (batch/headless use).
+
+        Independent of the interactively selected client, so several sessions can be
+        open at once as long as each gets its own proxy port.
+
+        Args:
+            server_name: Name of the server in mcp_config.json
+            start_proxy: Whether to put a local HTTP proxy in front of a stdio server
+            proxy_port: Port for that proxy
+
+        Returns:
+            (client, proxy_server or None), or None if the server could not be started
+        """
+        client = self._create_client(server_name)
+        if not client:
+            return None
+
+        print(f"🚀 Starting server: {server_name} ({client.connection_mode} mode)")
+        if not client.start_server():
+            return None
+
+        proxy_server = None
+        if start_proxy and client.stdio_transport:
+            proxy_server = self._start_proxy_server(proxy_port, client)
+
+        if not client.initialize():
+            if proxy_server:
+                self.stop_proxy_server(proxy_server)
+            client.stop_server()
+            return None
+
+        client.initialized_notification()
+        return client, proxy_server
+
+    def close_session(self, client: MCPClient, proxy_server: Optional[MCPProxyServer] = None):
+        """Stop a session opened with open_session"""
+        if proxy_server:
+            self.stop_proxy_server(proxy_server)
+        client.stop_server()
+
+    def batch_mode(self, calls_path: str, workers: int = 4, output_path: Optional[str] = None,
+                   start_proxy: bool = False, proxy_port: int = 3000, results_stream=None) -> bool:
+        """
+        Run tool calls from a JSONL file without prompting
+
+        Args:
+            calls_path: JSONL file, one {"server", "tool", "arguments"} object per line
+            workers: Number of calls executed concurrently
+            output_path: JSONL results file (stdout when None)
+            start_proxy: Put a local HTTP proxy in front of each stdio server
+            proxy_port: First proxy port; each further server uses the next port
+            results_stream: Stream used instead of stdout when no output_path is given
+
+        Returns:
+            True if every call succeeded
+        """
+        get_analytics().track_feature_used("batch_mode", {"workers": workers})
+
+        opened = {}
+        next_port = [proxy_port]
+
+        def open_server(server_name: str) -> Optional[MCPClient]:
+            session = self.open_session(server_name, start_proxy, next_port[0])
+            next_port[0] += 1
+            if not session:
+                return None
+            opened[server_name] = session
+            return session[0]
+
+        output = open(output_path, 'a', encoding='utf-8') if output_path else (results_stream or sys.stdout)
+        try:
+            runner = BatchRunner(open_server, workers=workers, output=output)
+            summary = runner.run(calls_path)
+        finally:
+            if output_path:
+                output.close()
+            for client, proxy_server in opened.values():
+                self.close_session(client, proxy_server)
+
+        print(f"\n📊 Batch finished: {summary['ok']}/{summary['total']} calls succeeded, "
+              f"{summary['failed']} failed in {summary['elapsed_s']:.2f}s "
+              f"({summary['calls_per_s']:.1f} calls/s)")
+        return summary['failed'] == 0
+
+    def fanout_mode(self, server_names: List[str], tool: Optional[str] = None,
+                    arguments: Optional[Dict[str, Any]] = None, workers: int = 8,
+                    output_path: Optional[str] = None, start_proxy: bool = False,
+                    proxy_port: int = 3000, results_stream=None) -> bool:
+        """
+        Start many servers in parallel and run the same workload against each
+
+        Args:
+            server_names: Servers to run against (empty for every configured server)
+            tool: Tool to call on every server; None runs discovery (tools/resources/prompts)
+            arguments: Arguments for that tool
+            workers: Number of servers handled at the same time
+            output_path: JSONL results file (stdout when None)
+            start_proxy: Put a local HTTP proxy in front of each stdio server
+            proxy_port: First proxy port; server i uses proxy_port + i
+            results_stream: Stream used instead of stdout when no output_path is given
+
+        Returns:
+            True if the workload succeeded on every server
+        """
+        server_names = server_names or self.config.list_servers()
+        get_analytics().track_feature_used("fanout_mode", {
+            "servers": len(server_names),
+            "workers": workers,
+            "workload": "tool_call" if tool else "discovery"
+        })
+
+        workload = tool_call(tool, arguments) if tool else discover
+        output = open(output_path, 'a', encoding='utf-8') if output_path else (results_stream or sys.stdout)
+        try:
+            runner = FanoutRunner(
+                lambda server_name, port: self.open_session(server_name, start_proxy, port),
+                self.close_session,
+                workers=workers,
+                output=output,
+                proxy_port=proxy_port
+            )
+            summary = runner.run(server_names, workload)
+        finally:
+            if output_path:
+                output.close()
+
+        print(f"\n📊 Fan-out finished: {summary['ok']}/{summary['total']} servers succeeded, "
+              f"{summary['failed']} failed in {summary['elapsed_s']:.2f}s")
+        return summary['failed'] == 0
+
+    def replay_mode(self, capture_path: str, target: Optional[str] = None, rate: Optional[float] = None,
+                    workers: int = 4, filters: Optional[Dict[str, Any]] = None, ignore: Optional[List[str]] = None,
+                    output_path: Optional[str] = None, start_proxy: bool = False, proxy_port: int = 3000,
+                    results_stream=None) -> bool:
+        """
+        Replay the requests in a capture file and diff the responses against the recorded ones
+
+        Args:
+            capture_path: Capture file written with --capture
+            target: Server every request is sent to (None: the server it was recorded against)
+            rate: Speed-up over the recorded timing (1.0 as recorded), None for flat out
+            workers: Maximum requests in flight
+            filters: CaptureReader.find() filters narrowing what is replayed
+            ignore: Response member names left out of the diff
+            output_path: JSONL results file (stdout when None)
+            start_proxy: Put a local HTTP proxy in front of each stdio server
+            proxy_port: First proxy port; each further session uses the next port
+            results_stream: Stream used instead of stdout when no output_path is given
+
+        Returns:
+            True if every request succeeded and matched its recorded response
+        """
+        get_analytics().track_feature_used("replay_mode", {
+            "workers": workers,
+            "rate": "max" if rate is None else rate,
+            "retarget": target is not None
+        })
+
+        opened = []
+        next_port = [proxy_port]
+
+        def open_server(server_name: str) -> Optional[MCPClient]:
+            session = self.open_session(server_name, start_proxy, next_port[0])
+            next_port[0] += 1
+            if not session:
+                return None
+            opened.append(session)
+            return session[0]
+
+        output = open(output_path, 'a', encoding='utf-8') if output_path else (results_stream or sys.stdout)
+        try:
+            runner = ReplayRunner(open_server, concurrency=workers, rate=rate, output=output,
+                                  target=target, ignore=ignore or ())
+            summary = runner.run(capture_path, **(filters or {}))
+        finally:
+            if output_path:
+                output.close()
+            for client, proxy_server in opened:
+                self.close_session(client, proxy_server)
+
+        latency = summary['latency_ms']
+        print(f"\n📊 Replay finished: {summary['ok']}/{summary['total']} requests succeeded, "
+              f"{summary['matched']} matched the capture, {summary['mismatched']} differed "
+              f"({summary['skipped']} notifications/initialize skipped) in {summary['elapsed_s']:.2f}s "
+              f"({summary['requests_per_s']:.1f} requests/s)")
+        print(f"   Latency p50 {latency['p50']:.1f} ms, p99 {latency['p99']:.1f} ms, max {latency['max']:.1f} ms")
+        if summary['max_lag_ms'] > 100:
+            print(f"⚠️  Fell up to {summary['max_lag_ms'] / 1000:.1f}s behind the recorded timing; "
+                  f"raise --workers or lower --replay-rate")
+        return summary['failed'] == 0 and summary['mismatched'] == 0
+
+    def bench_mode(self, server_name: str, tool: Optional[str] = None, mix: Optional[Dict[str, float]] = None,
+                   arguments: Optional[Dict[str, Any]] = None, workers: int = 4, rate: Optional[float] = None,
+                   duration: float = 10.0, requests: Optional[int] = None, warmup: float = 0.0,
+                   output_path: Optional[str] = None, start_proxy: bool = False, proxy_port: int = 3000,
+                   results_stream=None) -> bool:
+        """
+        Load-test one server and report latency percentiles, throughput and errors
+
+        Args:
+            server_name: Server to start and drive
+            tool: Tool to call; None uses mix
+            mix: {tool: weight} to call a weighted mix of tools; None (with no tool) for every listed tool
+            arguments: Arguments for tool, or {tool: arguments} for a mix
+            workers: Concurrent calls (closed loop), or maximum calls in flight at a target rate
+            rate: Target calls per second; None sends the next call as soon as a worker is free
+            duration: Seconds to measure for
+            requests: Stop after this many measured calls instead
+            warmup: Seconds of calls before measuring starts
+            output_path: JSON report file (stdout when None)
+            start_proxy: Put a local HTTP proxy in front of a stdio server
+            proxy_port: Port for that proxy
+            results_stream: Stream used instead of stdout when no output_path is given
+
+        Returns:
+            True if calls were made and none of them failed
+        """
+        get_analytics().track_feature_used("bench_mode", {
+            "workers": workers,
+            "open_loop": rate is not None,
+            "tools": 1 if tool else len(mix or {})
+        })
+
+        session = self.open_session(server_name, start_proxy, proxy_port)
+        if not session:
+            print(f"❌ Could not start server '{server_name}'")
+            return False
+        client, proxy_server = session
+        try:
+            available = {listed["name"] for listed in client.list_tools()}
+            if tool:
+                mix, arguments = {tool: 1.0}, {tool: arguments or {}}
+            elif mix is None:
+                mix = {name: 1.0 for name in sorted(available)}
+            unknown = [name for name in mix if name not in available]
+            if unknown:
+                print(f"❌ Not in tools/list of '{server_name}': {', '.join(unknown)}")
+                return False
+
+            loop = "closed loop" if rate is None else f"{rate:g} calls/s"
+            print(f"🏋️  Benchmarking {server_name} ({client.connection_mode}): {', '.join(mix)} "
+                  f"for {duration:g}s, {workers} workers, {loop}")
+            generator = LoadGenerator(client, mix, arguments, concurrency=workers, rate=rate,
+                                      duration=duration, requests=requests, warmup=warmup)
+            report = generator.run()
+        finally:
+            self.close_session(client, proxy_server)
+
+        report = dict({"server": server_name, "connection_mode": client.connection_mode,
+                       "started_at": datetime.now().isoformat(timespec="seconds")}, **report)
+        if output_path:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(report, indent=2) + "\n")
+        else:
+            output = results_stream or sys.stdout
+            output.write(json.dumps(report, indent=2) + "\n")
+            output.flush()
+
+        errors = report["errors"]["total"]
+        print(f"\n📊 Bench finished: {report['requests']} calls in {report['elapsed_s']:.2f}s "
+              f"({report['throughput_rps']:.1f} calls/s), {errors} errors ({report['error_rate']:.2%})")
+        columns = [f"p{percent:g}" for percent in PERCENTILES] + ["max"]
+        print(f"   {'latency ms':<20}" + "".join(f"{column:>10}" for column in columns))
+        rows = [("all", report["latency_ms"])]
+        if "service_time_ms" in report:
+            rows.append(("service time", report["service_time_ms"]))
+        if len(mix) > 1:
+            rows.extend((name, stats["latency_ms"]) for name, stats in report["per_tool"].items())
+        for label, latency in rows:
+            print(f"   {label[:20]:<20}" + "".join(f"{latency[column]:>10.2f}" for column in columns))
+        for sample in report.get("error_samples", []):
+            print(f"   ❌ {sample}")
+        return report["requests"] > 0 and errors == 0
+
     def interactive_mode(self, start_proxy: bool = False, proxy_port: int = 3000):
         """Run interactive mode"""
         # Display Appsecco banner
@@ -1845,6 +3339,10 @@ class GenericMCPApp:
             print(f"\n❌ Error calling tool: {e}")
 
 
+# `--fanout` without a value; an object rather than a name, so no configured server can collide with it
+_ALL_SERVERS = object()
+
+
 def main():
     """Main entry point for Appsecco MCP Client PST"""
 
@@ -1879,17 +3377,108 @@ Brought to you by Appsecco - Your Trusted Security Partner""",
                         help="Disable anonymous usage analytics")
     parser.add_argument("--debug", action="store_true",
                         help="Enable debug output for troubleshooting")
+    parser.add_argument("--proxy-health-ttl", type=float, default=5.0,
+                        help="Seconds to trust an unhealthy local proxy state before re-probing it (default: 5)")
+    parser.add_argument("--proxy-max-concurrency", type=int, default=32,
+                        help="Max concurrent requests the local proxy forwards to the MCP server (default: 32)")
+    parser.add_argument("--proxy-request-timeout", type=float, default=0,
+                        help="Seconds a proxied request waits for the MCP server's response; 0 waits "
+                             "as long as the server runs (default: 0)")
+    parser.add_argument("--readiness", choices=["auto", "initialize", "output"], default="auto",
+                        help="How to detect that a spawned MCP server is ready: 'initialize' sends the handshake "
+                             "straight over stdio and waits for the response, 'output' scans stdout/stderr for "
+                             "ready words, 'auto' uses 'output' while routing through Burp and 'initialize' "
+                             "otherwise (default: auto)")
+    parser.add_argument("--server-stderr-lines", type=int, default=200,
+                        help="Recent MCP server stderr lines kept for failure diagnostics (default: 200)")
+    parser.add_argument("--log-server-stderr", action="store_true",
+                        help="Copy MCP server stderr into the session log file")
+    parser.add_argument("--tools-cache-ttl", type=float, default=0.0,
+                        help="Cache tools/list results on disk for this many seconds; 0 sends every "
+                             "tools/list to the server (default: 0, cache off)")
+    parser.add_argument("--tools-cache-swr", action="store_true",
+                        help="Stale-while-revalidate: show an expired cached tool list immediately "
+                             "and refresh it in the background")
+    parser.add_argument("--no-token-store", action="store_true",
+                        help="Keep OAuth tokens and registered OAuth clients in memory only instead of "
+                             "the encrypted on-disk stores")
+    parser.add_argument("--capture", metavar="CAPTURE_JSONL",
+                        help="Append every JSON-RPC exchange (client calls and proxied calls) to this JSONL file")
+    parser.add_argument("--batch", metavar="CALLS_JSONL",
+                        help="Run the tool calls in a JSONL file without prompting and exit "
+                             "(one {\"server\", \"tool\", \"arguments\"} object per line)")
+    parser.add_argument("--fanout", nargs="?", const=_ALL_SERVERS, metavar="SERVERS",
+                        help="Start the given comma-separated servers (default: all configured) in parallel, "
+                             "run discovery or --fanout-tool on each, and exit")
+    parser.add_argument("--fanout-tool", metavar="TOOL",
+                        help="Tool to call on every server in fan-out mode (default: discovery only)")
+    parser.add_argument("--fanout-args", metavar="JSON", default="{}",
+                        help="JSON object of arguments for --fanout-tool (default: {})")
+    parser.add_argument("--replay", metavar="CAPTURE_JSONL",
+                        help="Replay the requests in a --capture file, diff the responses against the "
+                             "recorded ones, and exit")
+    parser.add_argument("--replay-server", metavar="SERVER",
+                        help="Send every replayed request to this server instead of the recorded one")
+    parser.add_argument("--replay-rate", metavar="RATE", default="max",
+                        help="Replay speed: 'max' (flat out), 'recorded' (recorded timing) "
+                             "or a factor such as '10x' (default: max)")
+    parser.add_argument("--replay-source", choices=["client", "proxy"],
+                        help="Replay only requests this client sent, or only requests the local proxy "
+                             "forwarded (default: both)")
+    parser.add_argument("--replay-tool", metavar="TOOL",
+                        help="Replay only tools/call requests for this tool")
+    parser.add_argument("--replay-ignore", metavar="KEYS", default="",
+                        help="Comma-separated response member names to leave out of the diff (e.g. timestamp)")
+    parser.add_argument("--bench", metavar="SERVER",
+                        help="Load-test a server with --bench-tool or --bench-mix, report latency "
+                             "percentiles, throughput and errors as JSON, and exit")
+    parser.add_argument("--bench-tool", metavar="TOOL",
+                        help="Tool to call in bench mode")
+    parser.add_argument("--bench-mix", metavar="MIX",
+                        help="Weighted mix of tools to call in bench mode: 'tool:weight,...' "
+                             "or 'all' for every tool in tools/list")
+    parser.add_argument("--bench-args", metavar="JSON", default="{}",
+                        help="JSON arguments for --bench-tool, or a JSON object of arguments per tool "
+                             "for --bench-mix (default: {})")
+    parser.add_argument("--bench-rate", type=float, default=0,
+                        help="Target calls per second in bench mode; 0 calls as fast as --workers allow (default: 0)")
+    parser.add_argument("--bench-duration", type=float, default=10.0,
+                        help="Seconds to measure in bench mode (default: 10)")
+    parser.add_argument("--bench-requests", type=int,
+                        help="Stop bench mode after this many calls instead")
+    parser.add_argument("--bench-warmup", type=float, default=0.0,
+                        help="Seconds of calls before bench mode starts measuring (default: 0)")
+    parser.add_argument("--bench-output", metavar="REPORT_JSON",
+                        help="Write the bench report to this file instead of stdout")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Concurrent tool calls in batch/bench mode, servers in fan-out mode, "
+                             "or requests in flight in replay mode (default: 4)")
+    parser.add_argument("--batch-output", metavar="RESULTS_JSONL",
+                        help="Append batch/fan-out/replay results to this file instead of stdout")
     default_log_path = os.path.join(
         "logs", f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
     )
     parser.add_argument("--log-file", "-l", default=default_log_path,
                         help=f"Path to session log file (default: {os.path.join('logs', 'session_<timestamp>.log')})")
+    parser.add_argument("--log-max-mb", type=float, default=0,
+                        help="Rotate the session log when it reaches this many MB; 0 never rotates (default: 0)")
+    parser.add_argument("--log-compress", action="store_true",
+                        help="gzip rotated session log segments")
 
 
     args = parser.parse_args()
 
     # Install the session logger first so all subsequent output is captured
-    session_log = _install_session_logger(args.log_file)
+    session_log = _install_session_logger(args.log_file, max_bytes=int(args.log_max_mb * 1024 * 1024),
+                                         compress=args.log_compress)
+    configure_logging(debug=args.debug)
+
+    # In batch mode stdout carries the JSONL results; status output goes to stderr
+    results_stream = None
+    if args.batch or args.fanout is not None or args.replay or args.bench:
+        results_stream = sys.stdout
+        sys.stdout = sys.stderr
+
     if session_log is not None:
         print(f"📝 Session log: {args.log_file}")
 
@@ -1906,6 +3495,13 @@ Brought to you by Appsecco - Your Trusted Security Partner""",
         print("Please create a mcp_config.json file with your MCP server configuration")
         sys.exit(1)
 
+    if args.proxy_request_timeout < 0:
+        print("❌ --proxy-request-timeout must not be negative")
+        sys.exit(1)
+    if args.server_stderr_lines < 0:
+        print("❌ --server-stderr-lines must not be negative")
+        sys.exit(1)
+
     # Determine if we should use Burp proxy and proxychains
     use_burp_proxy = not args.no_burp
     use_proxychains = not args.no_proxychains
@@ -1920,7 +3516,88 @@ Brought to you by Appsecco - Your Trusted Security Partner""",
         "no_analytics": args.no_analytics
     })
 
-    app = GenericMCPApp(args.config, args.proxy, use_burp_proxy, use_proxychains, bypass_ssl, args.debug)
+    app = GenericMCPApp(args.config, args.proxy, use_burp_proxy, use_proxychains, bypass_ssl, args.debug,
+                        proxy_health_ttl=args.proxy_health_ttl,
+                        proxy_max_concurrency=args.proxy_max_concurrency,
+                        proxy_request_timeout=args.proxy_request_timeout or None,
+                        readiness=args.readiness,
+                        stderr_buffer_lines=args.server_stderr_lines,
+                        log_server_stderr=args.log_server_stderr,
+                        tools_cache_ttl=args.tools_cache_ttl,
+                        stale_while_revalidate=args.tools_cache_swr,
+                        persist_tokens=not args.no_token_store,
+                        capture_path=args.capture)
+
+    if args.batch:
+        if not os.path.exists(args.batch):
+            print(f"❌ Batch file '{args.batch}' not found")
+            sys.exit(1)
+        succeeded = app.batch_mode(args.batch, args.workers, args.batch_output,
+                                   args.start_proxy, args.proxy_port, results_stream)
+        sys.exit(0 if succeeded else 1)
+
+    if args.fanout is not None:
+        try:
+            fanout_args = json.loads(args.fanout_args)
+        except json.JSONDecodeError as e:
+            print(f"❌ --fanout-args is not valid JSON: {e}")
+            sys.exit(1)
+        if not isinstance(fanout_args, dict):
+            print("❌ --fanout-args must be a JSON object")
+            sys.exit(1)
+        if args.fanout is _ALL_SERVERS:
+            server_names = []
+        else:
+            server_names = [name.strip() for name in args.fanout.split(",") if name.strip()]
+            if not server_names:
+                print("❌ --fanout needs comma-separated server names, or no value for every configured server")
+                sys.exit(1)
+        succeeded = app.fanout_mode(server_names, args.fanout_tool, fanout_args, args.workers,
+                                    args.batch_output, args.start_proxy, args.proxy_port, results_stream)
+        sys.exit(0 if succeeded else 1)
+
+    if args.replay:
+        if not os.path.exists(args.replay):
+            print(f"❌ Capture file '{args.replay}' not found")
+            sys.exit(1)
+        try:
+            rate = parse_rate(args.replay_rate)
+        except ValueError:
+            print("❌ --replay-rate must be 'max', 'recorded' or a positive factor such as '10x'")
+            sys.exit(1)
+        filters = {"source": args.replay_source, "tool": args.replay_tool}
+        ignore = [key.strip() for key in args.replay_ignore.split(",") if key.strip()]
+        succeeded = app.replay_mode(args.replay, args.replay_server, rate, args.workers,
+                                    {key: value for key, value in filters.items() if value is not None},
+                                    ignore, args.batch_output, args.start_proxy, args.proxy_port,
+                                    results_stream)
+        sys.exit(0 if succeeded else 1)
+
+    if args.bench:
+        if not args.bench_tool and not args.bench_mix:
+            print("❌ --bench needs --bench-tool or --bench-mix")
+            sys.exit(1)
+        try:
+            mix = parse_mix(args.bench_mix) if args.bench_mix and not args.bench_tool else None
+        except ValueError as e:
+            print(f"❌ --bench-mix: {e}")
+            sys.exit(1)
+        try:
+            bench_args = json.loads(args.bench_args)
+        except json.JSONDecodeError as e:
+            print(f"❌ --bench-args is not valid JSON: {e}")
+            sys.exit(1)
+        if not isinstance(bench_args, dict):
+            print("❌ --bench-args must be a JSON object")
+            sys.exit(1)
+        if args.bench_rate < 0:
+            print("❌ --bench-rate must be positive (or 0 to call as fast as --workers allow)")
+            sys.exit(1)
+        succeeded = app.bench_mode(args.bench, args.bench_tool, mix, bench_args, args.workers,
+                                   args.bench_rate or None, args.bench_duration, args.bench_requests,
+                                   args.bench_warmup, args.bench_output, args.start_proxy, args.proxy_port,
+                                   results_stream)
+        sys.exit(0 if succeeded else 1)
 
     # Run interactive mode
     app.interactive_mode(args.start_proxy, args.proxy_port)
@@ -0,0 +1,315 @@
+"""
+Headless batch mode for the MCP Client and Proxy
+
+Runs tool calls from a JSONL file without any prompts:
+
+    {"server": "filesystem", "tool": "read_file", "arguments": {"path": "/tmp/a"}}
+    {"server": "filesystem", "tool": "list_directory", "arguments": {"path": "/tmp"}, "id": "ls-tmp"}
+
+Each distinct server is started and initialized once, then calls are executed
+concurrently by a worker pool. One JSONL result record is streamed per call as
+soon as it completes (so output order follows completion order; use "line" or
+"id" to correlate):
+
+    {"line": 2, "id": "ls-tmp", "server": "filesystem", "tool": "list_directory",
+     "ok": true, "latency_ms": 12.4, "result": {...}}
+
+FanoutRunner covers the other headless shape: many configured servers started
+at the same time (each with its own process and proxy port), all running the
+same workload -- discovery or one tool call -- with one record per server.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Tuple
+
+import codec
+
+
+class BatchRunner:
+    """Executes a JSONL file of tool calls concurrently and streams results"""
+
+    def __init__(self, open_server: Callable[[str], Any], workers: int = 4, output: Optional[IO[str]] = None):
+        """
+        Initialize the runner
+
+        Args:
+            open_server: Callable taking a server name and returning a started,
+                         initialized client (or None if the server is unusable)
+            workers: Number of calls executed concurrently
+            output: Text stream results are written to, one JSON object per line
+        """
+        self.open_server = open_server
+        self.workers = max(1, workers)
+        self.output = output
+        self._write_lock = threading.Lock()
+        self._clients: Dict[str, Any] = {}
+        self._failed_servers: Dict[str, str] = {}
+
+    @staticmethod
+    def read_calls(path: str) -> Iterator[Tuple[int, Any]]:
+        """
+        Yield (line number, parsed call or error message) for each non-empty line
+
+        Args:
+            path: JSONL file with one call object per line
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                try:
+                    call = codec.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, f"Invalid JSON: {e}"
+                    continue
+                if not isinstance(call, dict) or not call.get("server") or not call.get("tool"):
+                    yield line_number, "Each line needs \"server\" and \"tool\" fields"
+                    continue
+                if not isinstance(call.get("arguments", {}), dict):
+                    yield line_number, "\"arguments\" must be an object"
+                    continue
+                yield line_number, call
+
+    def run(self, path: str) -> Dict[str, Any]:
+        """
+        Execute every call in the file
+
+        Args:
+            path: JSONL file with one call object per line
+
+        Returns:
+            Summary with total/ok/failed counts, elapsed seconds and calls per second
+        """
+        calls: List[Tuple[int, Any]] = list(self.read_calls(path))
+
+        # Start every server up front (sequentially, so start-up output stays readable)
+        for _, call in calls:
+            if isinstance(call, dict):
+                self._client_for(call["server"])
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="MCPBatchWorker") as executor:
+            outcomes = list(executor.map(lambda item: self._execute(*item), calls))
+        elapsed = time.perf_counter() - started
+
+        ok = sum(1 for outcome in outcomes if outcome)
+        return {
+            "total": len(outcomes),
+            "ok": ok,
+            "failed": len(outcomes) - ok,
+            "elapsed_s": elapsed,
+            "calls_per_s": len(outcomes) / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def _client_for(self, server_name: str) -> Any:
+        """Return the client for a server, starting it on first use"""
+        if server_name in self._clients:
+            return self._clients[server_name]
+        if server_name in self._failed_servers:
+            return None
+        try:
+            client = self.open_server(server_name)
+        except Exception as e:
+            client = None
+            self._failed_servers[server_name] = str(e)
+        if client is None:
+            self._failed_servers.setdefault(server_name, f"Could not start server '{server_name}'")
+        else:
+            self._clients[server_name] = client
+        return client
+
+    def _execute(self, line_number: int, call: Any) -> bool:
+        """Run one call and emit its result record; returns True on success"""
+        if not isinstance(call, dict):
+            self._emit({"line": line_number, "ok": False, "latency_ms": 0.0, "error": call})
+            return False
+
+        record: Dict[str, Any] = {
+            "line": line_number,
+            "id": call.get("id"),
+            "server": call["server"],
+            "tool": call["tool"],
+        }
+
+        client = self._clients.get(call["server"])
+        if client is None:
+            record.update(ok=False, latency_ms=0.0, error=self._failed_servers.get(call["server"]))
+            self._emit(record)
+            return False
+
+        params = {"name": call["tool"], "arguments": call.get("arguments", {})}
+        started = time.perf_counter()
+        try:
+            response = client.send_request("tools/call", params)
+        except Exception as e:
+            response = {"error": {"message": str(e)}}
+        record["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+        if isinstance(response, dict) and "result" in response:
+            # A tool can report its own failure inside a successful JSON-RPC result
+            record["ok"] = not (isinstance(response["result"], dict) and response["result"].get("isError"))
+            record["result"] = response["result"]
+        else:
+            record["ok"] = False
+            record["error"] = response.get("error", response) if isinstance(response, dict) else response
+        self._emit(record)
+        return record["ok"]
+
+    def _emit(self, record: Dict[str, Any]):
+        """Write one result line (whole lines only, even with many workers)"""
+        line = codec.dumps_str(record)
+        with self._write_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+
+def _list_all(client: Any, method: str, key: str) -> List[Dict[str, Any]]:
+    """Collect every page of a */list method, following nextCursor"""
+    items: List[Dict[str, Any]] = []
+    params: Dict[str, Any] = {}
+    while True:
+        response = client.send_request(method, params)
+        if not isinstance(response, dict) or "result" not in response:
+            error = response.get("error", response) if isinstance(response, dict) else response
+            raise RuntimeError(f"{method} failed: {error}")
+        result = response["result"] or {}
+        items.extend(result.get(key, []))
+        cursor = result.get("nextCursor")
+        if not cursor or cursor == params.get("cursor"):
+            return items
+        params = {"cursor": cursor}
+
+
+def discover(client: Any) -> Dict[str, Any]:
+    """
+    Fan-out workload: enumerate what a server exposes
+
+    Tools are always listed; resources and prompts only when the server
+    advertised those capabilities during initialize.
+    """
+    info = getattr(client, "server_info", {}) or {}
+    capabilities = info.get("capabilities") or {}
+    tools = _list_all(client, "tools/list", "tools")
+    result: Dict[str, Any] = {
+        "server_info": info.get("serverInfo"),
+        "protocol_version": info.get("protocolVersion"),
+        "tools": [tool.get("name") for tool in tools],
+    }
+    if "resources" in capabilities:
+        result["resources"] = [resource.get("uri") for resource in _list_all(client, "resources/list", "resources")]
+    if "prompts" in capabilities:
+        result["prompts"] = [prompt.get("name") for prompt in _list_all(client, "prompts/list", "prompts")]
+    return result
+
+
+def tool_call(tool: str, arguments: Optional[Dict[str, Any]] = None) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Fan-out workload factory: call the same tool with the same arguments on every server
+
+    Args:
+        tool: Tool name
+        arguments: Tool arguments
+    """
+    params = {"name": tool, "arguments": arguments or {}}
+
+    def workload(client: Any) -> Dict[str, Any]:
+        response = client.send_request("tools/call", params)
+        if not isinstance(response, dict) or "result" not in response:
+            error = response.get("error", response) if isinstance(response, dict) else response
+            raise RuntimeError(f"tools/call failed: {error}")
+        return {"result": response["result"]}
+
+    return workload
+
+
+class FanoutRunner:
+    """Starts many servers at once and runs the same workload against each of them"""
+
+    def __init__(self, open_session: Callable[[str, int], Optional[Tuple[Any, Any]]],
+                 close_session: Callable[[Any, Any], None], workers: int = 8,
+                 output: Optional[IO[str]] = None, proxy_port: int = 3000):
+        """
+        Initialize the runner
+
+        Args:
+            open_session: Callable taking (server name, proxy port) and returning
+                          (client, session handle) for a started, initialized server,
+                          or None if it could not be started
+            close_session: Callable taking (client, session handle) that stops the server
+            workers: Number of servers handled at the same time
+            output: Text stream results are written to, one JSON object per server
+            proxy_port: Proxy port of the first server; server i gets proxy_port + i
+        """
+        self.open_session = open_session
+        self.close_session = close_session
+        self.workers = max(1, workers)
+        self.output = output
+        self.proxy_port = proxy_port
+        self._write_lock = threading.Lock()
+
+    def run(self, server_names: List[str], workload: Callable[[Any], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run the workload against every server in parallel
+
+        Args:
+            server_names: Configured server names
+            workload: Callable taking an initialized client and returning a JSON-able dict
+
+        Returns:
+            Summary with total/ok/failed counts and elapsed seconds
+        """
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="MCPFanoutWorker") as executor:
+            outcomes = list(executor.map(
+                lambda item: self._run_one(item[1], self.proxy_port + item[0], workload),
+                enumerate(server_names)
+            ))
+        elapsed = time.perf_counter() - started
+
+        ok = sum(1 for outcome in outcomes if outcome)
+        return {"total": len(outcomes), "ok": ok, "failed": len(outcomes) - ok, "elapsed_s": elapsed}
+
+    def _run_one(self, server_name: str, proxy_port: int, workload: Callable[[Any], Dict[str, Any]]) -> bool:
+        """Start one server, run the workload, stop it and emit its result record"""
+        record: Dict[str, Any] = {"server": server_name}
+        started = time.perf_counter()
+        try:
+            session = self.open_session(server_name, proxy_port)
+        except Exception as e:
+            session = None
+            record["error"] = str(e)
+        record["startup_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+        if session is None:
+            record["ok"] = False
+            record.setdefault("error", f"Could not start server '{server_name}'")
+            self._emit(record)
+            return False
+
+        client, handle = session
+        started = time.perf_counter()
+        try:
+            record.update(workload(client))
+            record["ok"] = True
+        except Exception as e:
+            record["ok"] = False
+            record["error"] = str(e)
+        finally:
+            record["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            try:
+                self.close_session(client, handle)
+            except Exception as e:
+                record["close_error"] = str(e)
+        self._emit(record)
+        return record["ok"]
+
+    def _emit(self, record: Dict[str, Any]):
+        """Write one result line (whole lines only, even with many workers)"""
+        line = codec.dumps_str(record)
+        with self._write_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of an analytics call on the caller's thread
+
+Times MCPAnalytics.track_feature_used() (the same path as every other
+track_* call) one call at a time, for:
+
+    disabled     - analytics off (--no-analytics / MCP_ANALYTICS_DISABLED)
+    reachable    - PostHog client pointed at a local HTTP server that accepts everything
+    unreachable  - PostHog client pointed at a closed port (air-gapped network)
+
+plus "inline (old)" - the per-event work the caller used to do itself: the
+platform lookups, property dict and posthog.capture() call, against the
+reachable server.
+
+Target: p99 under 5 µs in every mode. Calls are fired back-to-back, so the
+worker and PostHog's uploader thread are busy the whole time; the mean and
+p99.9 include the GIL hand-offs to them (up to sys.getswitchinterval() each),
+which normal use, with a handful of events per session, does not hit.
+
+The clients spool into a temporary MCP_CLIENT_CACHE_DIR, so the run neither
+sends the user's spooled events to the dummy collector nor leaves "bench"
+events behind for the next real run to upload.
+
+Usage:
+    python benchmarks/bench_analytics.py
+"""
+
+import logging
+import os
+import platform
+import socket
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import MCPAnalytics  # noqa: E402
+
+CALLS = 20000
+
+
+class AcceptAllHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        body = b'{"status": 1}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_collector() -> str:
+    server = HTTPServer(("127.0.0.1", 0), AcceptAllHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def closed_port_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def make_analytics(host: str, enabled: bool = True) -> MCPAnalytics:
+    analytics = MCPAnalytics(api_key="phc_benchmark", host=host, enabled=enabled, debug=False, silent=True)
+    logging.getLogger("posthog").setLevel(logging.CRITICAL)  # the client resets it
+    return analytics
+
+
+def inline_track(analytics: MCPAnalytics, event_name: str, properties: dict):
+    """The pre-queue _safe_track body"""
+    props = {
+        'session_id': analytics.session_id,
+        'version': analytics._get_version(),
+        'os': platform.system(),
+        'os_version': platform.version(),
+        'python_version': platform.python_version(),
+        'timestamp': datetime.utcnow().isoformat(),
+    }
+    props.update(properties)
+    analytics.posthog.capture(distinct_id=analytics.anonymous_id, event=event_name, properties=props)
+
+
+def measure(call) -> list:
+    """Per-call durations in seconds"""
+    for _ in range(100):
+        call()  # warm-up
+    durations = []
+    clock = time.perf_counter
+    for _ in range(CALLS):
+        start = clock()
+        call()
+        durations.append(clock() - start)
+    return durations
+
+
+def report(name: str, durations: list):
+    durations.sort()
+    mean = sum(durations) / len(durations)
+    p50 = durations[len(durations) // 2]
+    p99 = durations[int(len(durations) * 0.99)]
+    p999 = durations[int(len(durations) * 0.999)]
+    verdict = "ok" if p99 < 5e-6 else "OVER 5 µs"
+    print(f"{name:>14} | {mean * 1e6:8.2f} | {p50 * 1e6:8.2f} | {p99 * 1e6:8.2f} | {p999 * 1e6:8.2f} | {verdict}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["MCP_CLIENT_CACHE_DIR"] = tmp
+        run(start_collector())
+
+
+def run(collector: str):
+    properties = {"feature": "bench", "workers": 4}
+
+    print(f"{CALLS} calls per mode, times in µs\n")
+    print(f"{'mode':>14} | {'mean':>8} | {'p50':>8} | {'p99':>8} | {'p99.9':>8} |")
+    print("-" * 63)
+
+    disabled = make_analytics(collector, enabled=False)
+    report("disabled", measure(lambda: disabled.track_feature_used("bench", {"workers": 4})))
+
+    reachable = make_analytics(collector)
+    report("reachable", measure(lambda: reachable.track_feature_used("bench", {"workers": 4})))
+
+    unreachable = make_analytics(closed_port_url())
+    report("unreachable", measure(lambda: unreachable.track_feature_used("bench", {"workers": 4})))
+
+    report("inline (old)", measure(lambda: inline_track(reachable, "mcp_feature_used", properties)))
+
+    # Skip the exit-time flush: the unreachable client would sit in its upload retries
+    for analytics in (reachable, unreachable):
+        analytics.enabled = False
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: caller-side cost of capturing an exchange
+
+Times TrafficCapture.record() for a tools/call exchange, one call at a time,
+against what an inline capture would cost the caller (encode the record and
+append it to the file before returning). Responses arrive either as a decoded
+dict (client calls) or as the raw bytes the proxy forwards.
+
+Usage:
+    python benchmarks/bench_capture.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codec  # noqa: E402
+from capture import TrafficCapture, encode_record  # noqa: E402
+
+CALLS = 2000
+
+
+def make_exchange(size: int) -> tuple:
+    request = {"jsonrpc": "2.0", "id": 7, "method": "tools/call",
+               "params": {"name": "read_file", "arguments": {"path": "/etc/hosts"}}}
+    response = {"jsonrpc": "2.0", "id": 7,
+                "result": {"content": [{"type": "text", "text": "x" * size}]}}
+    return request, response
+
+
+def percentiles(durations: list) -> tuple:
+    durations.sort()
+    return durations[len(durations) // 2], durations[int(len(durations) * 0.99)]
+
+
+def measure(call) -> list:
+    durations = []
+    clock = time.perf_counter
+    for _ in range(CALLS):
+        start = clock()
+        call()
+        durations.append(clock() - start)
+        time.sleep(0.0002)  # calls arrive one at a time, as from a client
+    return durations
+
+
+def main():
+    print(f"{CALLS} records per row, caller-side time in µs\n")
+    print(f"{'response':>16} | {'inline p50':>10} | {'inline p99':>10} | {'queued p50':>10} | {'queued p99':>10}")
+    print("-" * 70)
+    with tempfile.TemporaryDirectory() as tmp:
+        inline_file = open(os.path.join(tmp, "inline.jsonl"), "ab", buffering=0)
+        capture = TrafficCapture(os.path.join(tmp, "queued.jsonl"))
+        for label, size in (("1 KB", 1024), ("64 KB", 64 * 1024), ("1 MB", 1024 ** 2)):
+            request, response = make_exchange(size)
+            for kind, payload in (("dict", response), ("bytes", codec.dumps(response))):
+                def inline():
+                    inline_file.write(b"".join(encode_record(time.time(), "client", "stdio", "fs", None,
+                                                            request, payload, 0.001, None)))
+
+                def queued():
+                    capture.record("client", "stdio", request, payload, time.perf_counter(), server="fs")
+
+                inline_p50, inline_p99 = percentiles(measure(inline))
+                queued_p50, queued_p99 = percentiles(measure(queued))
+                capture.flush()
+                print(f"{label + ' ' + kind:>16} | {inline_p50 * 1e6:10.1f} | {inline_p99 * 1e6:10.1f} | "
+                      f"{queued_p50 * 1e6:10.1f} | {queued_p99 * 1e6:10.1f}")
+        capture.close()
+        inline_file.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: finding records in a large capture file
+
+Writes a capture of RECORDS tools/call exchanges (about SIZE_MB of JSONL,
+mostly large tool results) with TrafficCapture, then finds the calls of one
+rare tool three ways:
+
+    full parse     - read every line and decode it (what grep + jq amounts to)
+    index          - CaptureReader with the sidecar index: load the index, look
+                     the tool up, decode only the matching records
+    scan (no idx)  - CaptureReader on a capture without an index: decode only
+                     each line's metadata, then the matching records
+
+Usage:
+    python benchmarks/bench_capture_reader.py [SIZE_MB]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codec  # noqa: E402
+from capture import CaptureReader, TrafficCapture, index_path  # noqa: E402
+
+RECORD_KB = 16
+
+
+def write_capture(path: str, records: int):
+    capture = TrafficCapture(path)
+    rng = random.Random(1)
+    text = "lorem ipsum dolor sit amet " * (RECORD_KB * 1024 // 27)
+    for i in range(records):
+        tool = "rare_tool" if i % 1000 == 0 else f"tool_{rng.randrange(20)}"
+        request = {"jsonrpc": "2.0", "id": i, "method": "tools/call",
+                   "params": {"name": tool, "arguments": {"path": f"/srv/{i}"}}}
+        response = codec.dumps({"jsonrpc": "2.0", "id": i, "result": {"content": [{"type": "text", "text": text}]}})
+        capture.record("proxy", "stdio", codec.dumps(request), response, time.perf_counter(), server="fs")
+    capture.close()
+
+
+def full_parse(path: str) -> int:
+    found = 0
+    with open(path, "rb") as f:
+        for line in f:
+            record = codec.loads(line)
+            if record["tool"] == "rare_tool":
+                found += 1
+    return found
+
+
+def with_reader(path: str) -> int:
+    with CaptureReader(path) as reader:
+        return sum(1 for _ in reader.records(tool="rare_tool"))
+
+
+def timed(function, *args) -> tuple:
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    records = size_mb * 1024 // RECORD_KB
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "capture.jsonl")
+        elapsed, _ = timed(write_capture, path, records)
+        print(f"{records} records, {os.path.getsize(path) / 1024 ** 2:.0f} MB capture, "
+              f"{os.path.getsize(index_path(path)) / 1024 ** 2:.1f} MB index (written in {elapsed:.1f}s)\n")
+
+        unindexed = os.path.join(tmp, "unindexed.jsonl")
+        shutil.copyfile(path, unindexed)
+
+        print(f"{'method':>14} | {'time':>9} | found")
+        print("-" * 34)
+        for name, function, target in (("full parse", full_parse, path),
+                                       ("index", with_reader, path),
+                                       ("scan (no idx)", with_reader, unindexed)):
+            elapsed, found = timed(function, target)
+            print(f"{name:>14} | {elapsed * 1000:7.0f} ms | {found}")
+
+
+if __name__ == "__main__":
+    main()
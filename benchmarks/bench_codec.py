@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JSON encode/decode cost per backend on representative MCP payloads
+
+Payloads:
+    initialize   - small handshake response
+    tools/list   - 300 tools with input schemas (~140 KB)
+    text 1 MB    - tools/call result with one large text block
+    rows 10 MB   - tools/call result with many small structured items
+
+Each backend does what one proxy hop does: decode the bytes from the wire and
+encode the response back to bytes. The stdlib row uses the same calls the
+proxy made before codec.py (json.loads(data.decode()) / json.dumps().encode()).
+
+Usage:
+    python benchmarks/bench_codec.py
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codec  # noqa: E402
+
+
+def make_payloads() -> dict:
+    """Build the benchmark payloads as wire bytes"""
+    tool = {
+        "name": "search_files",
+        "description": "Search files under a directory for a pattern and return matching lines with context",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "path": {"type": "string", "description": "Directory to search"},
+                "pattern": {"type": "string", "description": "Regular expression"},
+                "max_results": {"type": "integer", "minimum": 1, "maximum": 1000},
+                "include": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": ["path", "pattern"],
+        },
+    }
+    row = {"path": "/srv/data/file.txt", "line": 1, "text": "lorem ipsum dolor sit amet", "score": 0.93}
+    payloads = {
+        "initialize": {"jsonrpc": "2.0", "id": 1, "result": {
+            "protocolVersion": "2025-06-18",
+            "capabilities": {"tools": {"listChanged": True}, "resources": {}},
+            "serverInfo": {"name": "bench", "version": "1.0.0"},
+        }},
+        "tools/list": {"jsonrpc": "2.0", "id": 2, "result": {
+            "tools": [dict(tool, name=f"tool_{i}") for i in range(300)]
+        }},
+        "text 1 MB": {"jsonrpc": "2.0", "id": 3, "result": {
+            "content": [{"type": "text", "text": ("line of tool output with \"quotes\" and unicode é\n" * 21000)[:1024 ** 2]}]
+        }},
+        "rows 10 MB": {"jsonrpc": "2.0", "id": 4, "result": {
+            "content": [{"type": "text", "rows": [dict(row, line=i) for i in range(10 * 1024 ** 2 // 90)]}]
+        }},
+    }
+    return {name: json.dumps(payload).encode("utf-8") for name, payload in payloads.items()}
+
+
+def backends() -> dict:
+    """(decode, encode) pairs for every installed backend"""
+    result = {
+        "stdlib": (lambda data: json.loads(data.decode("utf-8")), lambda obj: json.dumps(obj).encode("utf-8")),
+    }
+    if codec.ORJSON_AVAILABLE:
+        import orjson
+        result["orjson"] = (orjson.loads, orjson.dumps)
+    if codec.MSGSPEC_AVAILABLE:
+        import msgspec
+        result["msgspec"] = (msgspec.json.decode, msgspec.json.encode)
+    return result
+
+
+def bench(decode, encode, data: bytes, min_time: float = 0.5) -> float:
+    """Mean seconds for one decode + encode round trip"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        encode(decode(data))
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time and calls >= 3:
+            return elapsed / calls
+
+
+def fmt(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:9.1f} µs"
+    return f"{seconds * 1e3:9.2f} ms"
+
+
+def main():
+    payloads = make_payloads()
+    available = backends()
+    print(f"codec.BACKEND = {codec.BACKEND}\n")
+    header = f"{'payload':>11} | {'size':>9} | " + " | ".join(f"{name:>12}" for name in available)
+    print(header + " | speedup")
+    print("-" * (len(header) + 10))
+    for name, data in payloads.items():
+        times = {backend: bench(decode, encode, data) for backend, (decode, encode) in available.items()}
+        best = min(times.values())
+        if len(data) < 1024:
+            size = f"{len(data)} B"
+        elif len(data) < 1024 ** 2:
+            size = f"{len(data) / 1024:.0f} KB"
+        else:
+            size = f"{len(data) / 1024 ** 2:.1f} MB"
+        print(f"{name:>11} | {size:>9} | " + " | ".join(f"{fmt(t):>12}" for t in times.values())
+              + f" | {times['stdlib'] / best:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
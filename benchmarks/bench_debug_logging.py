@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-call cost of debug logging with --debug off vs on
+
+Compares the old eager style (f-string with json.dumps(indent=2), built even
+when debug is off) against the lazy logging calls used by MCPClient now, for
+1 KB, 1 MB and 10 MB JSON-RPC payloads.
+
+Usage:
+    python benchmarks/bench_debug_logging.py
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MCP_ANALYTICS_DISABLED", "true")
+
+from app import MCPClient  # noqa: E402
+from mcp_logging import LazyJSON, configure_logging  # noqa: E402
+
+
+def make_payload(size: int) -> dict:
+    """Build a tools/call-style response of roughly `size` bytes of JSON"""
+    row = {"path": "/srv/data/file.txt", "line": 1, "text": "lorem ipsum dolor sit amet"}
+    row_size = len(json.dumps(row)) + 2
+    return {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "result": {"content": [{"type": "text", "rows": [dict(row, line=i) for i in range(max(size // row_size, 1))]}]},
+    }
+
+
+def eager_call(client: MCPClient, payload: dict):
+    """Old style: the f-string (and the pretty-printed JSON) is always built"""
+    client._debug_print(f"   Request Body: {json.dumps(payload, indent=2)}")
+
+
+def lazy_call(client: MCPClient, payload: dict):
+    """New style: the JSON is only rendered if the record is emitted"""
+    client._debug_print("   Request Body: %s", LazyJSON(payload))
+
+
+def bench(func, client: MCPClient, payload: dict, min_time: float = 0.5) -> float:
+    """Return mean seconds per call"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        func(client, payload)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time and calls >= 3:
+            return elapsed / calls
+
+
+def fmt(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:10.2f} µs"
+    return f"{seconds * 1e3:10.2f} ms"
+
+
+def main():
+    configure_logging(debug=True)
+    client_off = MCPClient({"command": "true"}, debug=False)
+    client_on = MCPClient({"command": "true"}, debug=True)
+
+    print(f"{'payload':>8} | {'debug':>5} | {'eager f-string':>14} | {'lazy logging':>14}")
+    print("-" * 52)
+    real_stdout = sys.stdout
+    for label, size in (("1 KB", 1024), ("1 MB", 1024 ** 2), ("10 MB", 10 * 1024 ** 2)):
+        payload = make_payload(size)
+        for debug_label, client in (("off", client_off), ("on", client_on)):
+            with open(os.devnull, "w") as devnull:
+                sys.stdout = devnull
+                try:
+                    eager = bench(eager_call, client, payload)
+                    lazy_time = bench(lazy_call, client, payload)
+                finally:
+                    sys.stdout = real_stdout
+            print(f"{label:>8} | {debug_label:>5} | {fmt(eager):>14} | {fmt(lazy_time):>14}")
+
+
+if __name__ == "__main__":
+    main()
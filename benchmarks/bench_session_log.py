@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of printing through the session log tee
+
+Prints tool results the way the interactive client does
+(print(json.dumps(result, indent=2)), the dumps itself not timed) to a terminal
+stand-in (/dev/null), for:
+
+    no log       - plain stdout, the floor
+    inline (old) - the previous tee: ANSI regex + line-buffered file write per write() call
+    queued       - session_log.TeeStream: queue the text, writer thread strips and writes
+
+Two measurements:
+
+    latency     - median time print() takes when results arrive with gaps between
+                  them (SPACING), as in interactive use: the queued writer does
+                  its work in the gaps
+    throughput  - back-to-back prints, including waiting for the log to reach
+                  the file at the end (flush() for the queued writer), so the
+                  queued writer is not flattered by work left behind. On a
+                  single CPU the total work is the same either way.
+
+Usage:
+    python benchmarks/bench_session_log.py
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_log import SessionLogWriter, TeeStream  # noqa: E402
+
+SPACING = 0.02
+_ANSI_ESCAPE_RE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+
+
+class InlineTeeStream:
+    """The pre-writer-thread tee"""
+
+    def __init__(self, original, log_file):
+        self._original = original
+        self._log_file = log_file
+
+    def write(self, data):
+        self._original.write(data)
+        self._log_file.write(_ANSI_ESCAPE_RE.sub('', data))
+        return len(data)
+
+    def flush(self):
+        self._original.flush()
+        self._log_file.flush()
+
+
+def make_results() -> dict:
+    """Tool results of roughly 1 KB, 64 KB and 1 MB"""
+    row = {"path": "/srv/data/file.txt", "line": 1, "text": "lorem ipsum dolor sit amet", "score": 0.93}
+    results = {}
+    for label, rows in (("1 KB", 8), ("64 KB", 560), ("1 MB", 9000)):
+        results[label] = {"content": [{"type": "text", "rows": [dict(row, line=i) for i in range(rows)]}]}
+    return results
+
+
+def print_result(stream, text: str):
+    print("\x1b[32m✅ Tool result:\x1b[0m", file=stream)
+    print(text, file=stream)
+
+
+def latency(stream, text: str, done, calls: int = 25) -> float:
+    """Median seconds print_result() takes with SPACING between results"""
+    durations = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        print_result(stream, text)
+        durations.append(time.perf_counter() - start)
+        time.sleep(SPACING)
+    done()
+    return sorted(durations)[calls // 2]
+
+
+def throughput(stream, text: str, done, min_time: float = 0.5) -> float:
+    """Mean seconds per result printed back-to-back, until the log is on disk"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        print_result(stream, text)
+        calls += 1
+        if time.perf_counter() - start >= min_time and calls >= 3:
+            done()
+            return (time.perf_counter() - start) / calls
+
+
+def fmt(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:9.1f} µs"
+    return f"{seconds * 1e3:9.2f} ms"
+
+
+def main():
+    terminal = open(os.devnull, "w")
+    with tempfile.TemporaryDirectory() as tmp:
+        inline_log = open(os.path.join(tmp, "inline.log"), "a", encoding="utf-8", buffering=1)
+        writer = SessionLogWriter(os.path.join(tmp, "queued.log"))
+        streams = {
+            "no log": (terminal, terminal.flush),
+            "inline (old)": (InlineTeeStream(terminal, inline_log), inline_log.flush),
+            "queued": (TeeStream(terminal, writer), writer.flush),
+        }
+
+        texts = {label: json.dumps(result, indent=2) for label, result in make_results().items()}
+        for title, measure in (("latency", latency), ("throughput", throughput)):
+            header = f"{title:>10} | " + " | ".join(f"{name:>12}" for name in streams)
+            print(header)
+            print("-" * len(header))
+            for label, text in texts.items():
+                times = [measure(stream, text, done) for stream, done in streams.values()]
+                print(f"{label:>10} | " + " | ".join(f"{fmt(t):>12}" for t in times))
+            print()
+
+        writer.close()
+        inline_log.close()
+
+
+if __name__ == "__main__":
+    main()
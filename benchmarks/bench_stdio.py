@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark: stdio throughput, text-mode pipes vs StdioTransport on binary pipes
+
+A child process echoes every request line back as a response with the same
+id and payload, so each message goes through stdin and back out of stdout.
+Requests are pipelined (IN_FLIGHT at a time), as when several proxy clients
+share one server. Modes:
+
+    text pipes   - StdioTransport.request_async() with the I/O it had on
+                   text=True, bufsize=1 pipes (TextIOWrapper readline, str writes)
+    binary       - StdioTransport.request_async() on binary pipes
+    passthrough  - StdioTransport.request_raw_async() (the proxy's path: no decode)
+
+Message sizes: 200 B (typical request/notification), 64 KB, 1 MB, 10 MB.
+
+Usage:
+    python benchmarks/bench_stdio.py
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codec  # noqa: E402
+from stdio_transport import StdioTransport  # noqa: E402
+
+# Turns {"jsonrpc":"2.0","id":N,"method":"echo","params":P} into
+# {"jsonrpc":"2.0","id":N,"result":P} without parsing, so the child costs
+# (nearly) nothing compared with the side being measured
+ECHO_SERVER = r'''
+import os, sys
+stdin = sys.stdin.buffer.raw
+chunk = memoryview(bytearray(1 << 20))
+pending = bytearray()
+while True:
+    received = stdin.readinto(chunk)
+    if not received:
+        break
+    search_from = len(pending)
+    pending += chunk[:received]
+    start = 0
+    while True:
+        end = pending.find(b"\n", search_from)
+        if end < 0:
+            break
+        out = bytes(pending[start:end + 1]).replace(b'"method":"echo","params"', b'"result"', 1)
+        out = memoryview(out)
+        while out:
+            out = out[os.write(1, out):]
+        start = search_from = end + 1
+    del pending[:start]
+'''
+
+SIZES = [("200 B", 200), ("64 KB", 64 * 1024), ("1 MB", 1024 ** 2), ("10 MB", 10 * 1024 ** 2)]
+IN_FLIGHT = 16
+
+
+class TextPipeTransport(StdioTransport):
+    """StdioTransport with its pre-binary-pipe write and read loop"""
+
+    def _write_line(self, line: bytes):
+        with self._write_lock:
+            self.process.stdin.write(line.decode("utf-8") + "\n")
+            self.process.stdin.flush()
+
+    def _read_loop(self):
+        try:
+            for line in iter(self.process.stdout.readline, ''):
+                line = line.strip()
+                if line:
+                    self._dispatch(codec.loads(line))
+        finally:
+            self._stdout_closed = True
+            self._fail_pending(RuntimeError("No response from server (stdout closed)"))
+
+
+def make_request(size: int) -> dict:
+    """An echo request whose encoded form is roughly `size` bytes"""
+    return {"jsonrpc": "2.0", "id": 1, "method": "echo", "params": {"data": "x" * max(size - 70, 0)}}
+
+
+def spawn(text: bool) -> subprocess.Popen:
+    if text:
+        return subprocess.Popen([sys.executable, "-c", ECHO_SERVER], stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, text=True, bufsize=1)
+    return subprocess.Popen([sys.executable, "-c", ECHO_SERVER], stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE)
+
+
+def bench(send_batch, repeat: int = 5, min_time: float = 0.3) -> float:
+    """Seconds per message, best of `repeat` timed runs (two processes and two threads make runs noisy)"""
+    send_batch()  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        batches = 0
+        start = time.perf_counter()
+        while True:
+            send_batch()
+            batches += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time and batches >= 3:
+                break
+        best = min(best, elapsed / (batches * IN_FLIGHT))
+    return best
+
+
+def run_transport(request: dict, text: bool = False, raw: bool = False) -> float:
+    process = spawn(text=text)
+    transport = (TextPipeTransport if text else StdioTransport)(process)
+    transport.start()
+    try:
+        if raw:
+            data = codec.dumps(request)
+            envelope = codec.scan_envelope(data)
+
+            def send_batch():
+                futures = [transport.request_raw_async(data, envelope) for _ in range(IN_FLIGHT)]
+                for future in futures:
+                    future.result()
+        else:
+            def send_batch():
+                futures = [transport.request_async(request) for _ in range(IN_FLIGHT)]
+                for future in futures:
+                    future.result()
+        return bench(send_batch)
+    finally:
+        transport.close()
+        process.kill()
+
+
+def fmt_rate(size: int, seconds: float) -> str:
+    return f"{1 / seconds:8.0f}/s {size / seconds / 1024 ** 2:7.1f} MB/s"
+
+
+def main():
+    print(f"codec.BACKEND = {codec.BACKEND}, {IN_FLIGHT} requests in flight\n")
+    modes = ("text pipes", "binary", "passthrough")
+    header = f"{'size':>6} | " + " | ".join(f"{name:>24}" for name in modes)
+    print(header)
+    print("-" * len(header))
+    for label, size in SIZES:
+        request = make_request(size)
+        times = [run_transport(request, text=True), run_transport(request), run_transport(request, raw=True)]
+        print(f"{label:>6} | " + " | ".join(f"{fmt_rate(size, t):>24}" for t in times))
+
+
+if __name__ == "__main__":
+    main()
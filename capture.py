@@ -0,0 +1,584 @@
+"""
+JSONL traffic capture for the MCP Client and Proxy
+
+With --capture FILE, every JSON-RPC exchange the client sends and every one the
+local proxy forwards is appended to FILE as one JSON object per line:
+
+    {"ts": 1760608800.123, "source": "client", "transport": "stdio",
+     "server": "fs", "session_id": null, "method": "tools/call", "id": 7,
+     "tool": "read_file", "status": "ok", "latency_ms": 12.4,
+     "request_bytes": 96, "response_bytes": 5120,
+     "request": {...}, "response": {...}}
+
+    source      "client" (this tool's own calls) or "proxy" (calls forwarded by
+                the local proxy for Burp or another client)
+    transport   "stdio", "http" (client -> local proxy), "direct-remote"
+    ts          wall-clock time the request was sent
+    status      "ok", or "error" for a JSON-RPC error / failed call; failed
+                calls have "response": null and the reason in "error"
+
+Notifications have "id": null and "response": null. "request" and "response"
+are always the last two members, so a reader can find the routing fields
+without parsing a multi-MB payload.
+
+record() only queues references; a writer thread serializes the records
+(payloads that arrived as bytes are embedded as they are, not re-encoded)
+and appends them with one gathered write per batch, so calls do not wait for
+JSON encoding or the disk. Queued records must therefore not be modified by
+the caller afterwards. The queue is bounded (MAX_PENDING_RECORDS): if the
+disk cannot keep up, callers wait rather than records being dropped.
+
+Alongside FILE the writer keeps a sidecar index, FILE.idx: one short JSON
+row per record with its byte offset and length and the fields it is looked
+up by ([offset, length, ts, source, server, method, tool, id, status]).
+CaptureReader loads the index and reads matching records straight out of a
+memory map of the capture, so finding one tools/call in a multi-GB capture
+does not parse the rest. A capture without an index (or with a stale one)
+is caught up by update_index(), which only decodes each line's metadata.
+"""
+
+import atexit
+import mmap
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import codec
+from session_log import write_parts
+
+MAX_PENDING_RECORDS = 4096
+# The writer wakes when this many records are queued, or every FLUSH_INTERVAL seconds
+WAKE_RECORDS = 256
+FLUSH_INTERVAL = 0.2
+# Byte payloads up to this size are decoded to find the status; larger ones are sniffed
+_DECODE_LIMIT = 64 * 1024
+_SNIFF_BYTES = 512
+
+Payload = Union[Dict[str, Any], bytes, None]
+
+
+class TrafficCapture:
+    """Append JSON-RPC exchanges to a JSONL file from a background thread"""
+
+    def __init__(self, path: str, max_pending: int = MAX_PENDING_RECORDS, index: bool = True):
+        """
+        Open the capture file (appending) and start the writer thread
+
+        Args:
+            path: Capture file; parent directories are created
+            max_pending: Queued records at which record() waits for the writer
+            index: Maintain the sidecar index (<path>.idx) alongside the capture
+
+        Raises:
+            OSError: If the file cannot be opened
+        """
+        self.path = path
+        self.max_pending = max_pending
+        capture_dir = os.path.dirname(os.path.abspath(path))
+        if capture_dir:
+            os.makedirs(capture_dir, exist_ok=True)
+        self._file = open(path, 'ab', buffering=0)
+        self._offset = self._file.seek(0, os.SEEK_END)
+        if self._offset and not _ends_with_newline(path):
+            # A record torn by a killed process: end it so the next one starts on its own line
+            self._offset += self._file.write(b"\n")
+        self._index_file = None
+        if index:
+            update_index(path)
+            self._index_file = open(index_path(path), 'ab', buffering=0)
+        self.records_written = 0
+
+        self._records = deque()
+        self._queued = 0
+        self._written = 0
+        self._flush_requested = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self._has_data = threading.Condition(self._lock)
+        self._has_room = threading.Condition(self._lock)
+        self._progress = threading.Condition(self._lock)
+
+        self._thread = threading.Thread(target=self._run, daemon=True, name="TrafficCapture")
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, source: str, transport: str, request: Payload, response: Payload = None,
+               started: Optional[float] = None, error: Optional[str] = None,
+               server: Optional[str] = None, session_id: Optional[str] = None):
+        """
+        Queue one exchange
+
+        Args:
+            source: "client" or "proxy"
+            transport: "stdio", "http" or "direct-remote"
+            request: The request, as a dict or as the encoded JSON bytes sent
+            response: The response (dict or encoded JSON bytes); None for
+                      notifications and failed calls
+            started: time.perf_counter() when the request was sent (for latency)
+            error: Why the call failed, if it raised instead of returning a response
+            server: Server name from mcp_config.json
+            session_id: Mcp-Session-Id of a Streamable HTTP session
+        """
+        now = time.perf_counter()
+        latency = now - started if started is not None else 0.0
+        entry = (time.time() - latency, source, transport, server, session_id,
+                 request, response, latency, error)
+        with self._lock:
+            if self._closed:
+                return
+            while len(self._records) >= self.max_pending and not self._closed:
+                self._has_room.wait()
+            self._records.append(entry)
+            self._queued += 1
+            if len(self._records) >= WAKE_RECORDS:
+                self._has_data.notify()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until everything recorded so far is on disk
+
+        Returns:
+            False if the timeout expired first
+        """
+        with self._lock:
+            target = self._queued
+            self._flush_requested = True
+            self._has_data.notify()
+            return self._progress.wait_for(lambda: self._written >= target or self._closed, timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Write out what is queued and close the file (registered with atexit)"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._has_data.notify()
+            self._has_room.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._has_data.wait_for(
+                    lambda: len(self._records) >= WAKE_RECORDS or self._flush_requested or self._closed,
+                    FLUSH_INTERVAL
+                )
+                self._flush_requested = False
+                entries = list(self._records)
+                self._records.clear()
+                queued = self._queued
+                closing = self._closed
+                self._has_room.notify_all()
+
+            if entries:
+                parts = []
+                index_rows = []
+                offset = self._offset
+                for entry in entries:
+                    try:
+                        line, meta = _encode_record(*entry)
+                    except Exception:
+                        continue  # a record that cannot be encoded is skipped, not fatal
+                    length = sum(map(len, line))
+                    parts.extend(line)
+                    index_rows.append(_index_row(offset, length, meta))
+                    offset += length
+                try:
+                    self._offset += write_parts(self._file, parts)
+                    self.records_written += len(index_rows)
+                    # After the records, so the index never points past the end of the capture
+                    if self._index_file is not None:
+                        write_parts(self._index_file, index_rows)
+                except OSError:
+                    pass
+            with self._lock:
+                self._written = queued
+                self._progress.notify_all()
+            if closing:
+                break
+
+        for file in (self._file, self._index_file):
+            try:
+                if file is not None:
+                    file.close()
+            except OSError:
+                pass
+
+
+def _as_json(payload: Payload) -> bytes:
+    """Encoded JSON of a payload, on one line"""
+    if payload is None:
+        return b"null"
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        data = bytes(payload).strip()
+        # Newlines can only be whitespace between tokens (they are escaped in strings)
+        if b"\n" in data or b"\r" in data:
+            data = data.replace(b"\r", b" ").replace(b"\n", b" ")
+        return data
+    return codec.dumps(payload)
+
+
+def _routing(request: Payload, request_json: bytes) -> tuple:
+    """(method, id, tool name) of a request"""
+    if isinstance(request, dict):
+        message = request
+    else:
+        envelope = codec.scan_envelope(request_json)
+        if envelope is not None and envelope.method != "tools/call":
+            return envelope.method, envelope.id, None
+        try:
+            message = codec.loads(request_json)
+        except ValueError:
+            return None, None, None
+        if not isinstance(message, dict):
+            return None, None, None  # batch
+    params = message.get("params")
+    tool = params.get("name") if message.get("method") == "tools/call" and isinstance(params, dict) else None
+    return message.get("method"), message.get("id"), tool
+
+
+def _status(response: Payload, response_json: bytes, error: Optional[str]) -> str:
+    """Status of an exchange: "error" for a failed call or an error response, else "ok"."""
+    if error is not None:
+        return "error"
+    if response is None:
+        return "ok"
+    if isinstance(response, dict):
+        return "error" if "error" in response else "ok"
+    if len(response_json) <= _DECODE_LIMIT:
+        try:
+            message = codec.loads(response_json)
+            return "error" if isinstance(message, dict) and "error" in message else "ok"
+        except ValueError:
+            return "error"
+    # Large responses are results: an error object is small, and a top-level
+    # "error" member comes before any "result" in the first bytes
+    head = response_json[:_SNIFF_BYTES]
+    error_at = head.find(b'"error"')
+    result_at = head.find(b'"result"')
+    return "error" if error_at >= 0 and (result_at < 0 or error_at < result_at) else "ok"
+
+
+def encode_record(ts: float, source: str, transport: str, server: Optional[str],
+                  session_id: Optional[str], request: Payload, response: Payload,
+                  latency: float, error: Optional[str]) -> list:
+    """
+    Encode one exchange as a capture line
+
+    Returns:
+        The line as a list of byte strings (payloads are not copied into one buffer)
+    """
+    return _encode_record(ts, source, transport, server, session_id, request, response, latency, error)[0]
+
+
+def _encode_record(ts, source, transport, server, session_id, request, response, latency, error) -> tuple:
+    """encode_record(), plus the record's metadata for the index"""
+    request_json = _as_json(request)
+    response_json = _as_json(response)
+    method, request_id, tool = _routing(request, request_json)
+    meta = {
+        "ts": round(ts, 6),
+        "source": source,
+        "transport": transport,
+        "server": server,
+        "session_id": session_id,
+        "method": method,
+        "id": request_id,
+        "tool": tool,
+        "status": _status(response, response_json, error),
+        "latency_ms": round(latency * 1000, 3),
+        "request_bytes": len(request_json),
+        "response_bytes": len(response_json) if response is not None else 0,
+    }
+    if error is not None:
+        meta["error"] = error
+    return [codec.dumps(meta)[:-1], b',"request":', request_json, b',"response":', response_json, b"}\n"], meta
+
+
+# ----------------------------------------------------------------------
+# Sidecar index and random-access reader
+# ----------------------------------------------------------------------
+
+_REQUEST_MEMBER = b',"request":'
+
+
+@dataclass
+class IndexEntry:
+    """Where one record is in a capture file, and the fields it can be looked up by"""
+    offset: int
+    length: int
+    ts: float
+    source: Optional[str]
+    server: Optional[str]
+    method: Optional[str]
+    tool: Optional[str]
+    id: Any
+    status: Optional[str]
+
+
+def index_path(path: str) -> str:
+    """Sidecar index of a capture file"""
+    return path + ".idx"
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _index_row(offset: int, length: int, meta: Dict[str, Any]) -> bytes:
+    return codec.dumps([offset, length, meta.get("ts"), meta.get("source"), meta.get("server"),
+                        meta.get("method"), meta.get("tool"), meta.get("id"), meta.get("status")]) + b"\n"
+
+
+def _record_meta(line) -> Optional[Dict[str, Any]]:
+    """
+    Decode only the metadata of a capture line (everything before "request")
+
+    The first ',"request":' in a line is always the member separator: inside a
+    JSON string the quote would be escaped.
+    """
+    end = line.find(_REQUEST_MEMBER)
+    if end < 0:
+        return None
+    try:
+        meta = codec.loads(bytes(line[:end]) + b"}")
+    except ValueError:
+        return None
+    return meta if isinstance(meta, dict) else None
+
+
+def scan_records(data, start: int = 0) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+    """
+    Find the records of a capture from `start` on, decoding only their metadata
+
+    Args:
+        data: The capture's bytes (e.g. an mmap)
+        start: Offset of a line start
+
+    Yields:
+        (offset, length, metadata) per complete record; lines that are not
+        records (torn writes) are skipped
+    """
+    end = len(data)
+    offset = start
+    while offset < end:
+        newline = data.find(b"\n", offset)
+        if newline < 0:
+            return  # still being written
+        # Only the metadata is copied and decoded, however long it is (a long
+        # error or fuzzed tool name); the payloads after it never are
+        member = data.find(_REQUEST_MEMBER, offset, newline)
+        meta = _record_meta(data[offset:member + len(_REQUEST_MEMBER)]) if member >= 0 else None
+        if meta is not None:
+            yield offset, newline + 1 - offset, meta
+        offset = newline + 1
+
+
+def _read_index_rows(idx, start: int = 0) -> Tuple[List[IndexEntry], int]:
+    """Complete rows of an open index file from `start`, and the offset after the last one"""
+    idx.seek(start)
+    data = idx.read()
+    complete = data.rfind(b"\n") + 1
+    entries = []
+    for line in data[:complete].splitlines():
+        try:
+            entries.append(IndexEntry(*codec.loads(line)))
+        except (ValueError, TypeError):
+            continue
+    return entries, start + complete
+
+
+def update_index(path: str) -> int:
+    """
+    Bring the sidecar index of a capture up to date
+
+    Indexes whatever the capture has beyond the index's last row (records from
+    before indexing existed, or a run that was killed), rebuilding it if it
+    no longer matches the capture. Must not run while another process is
+    appending to the capture.
+
+    Args:
+        path: Capture file
+
+    Returns:
+        Number of records added to the index
+    """
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    with open(index_path(path), 'a+b') as idx:
+        entries, complete = _read_index_rows(idx)
+        covered = entries[-1].offset + entries[-1].length if entries else 0
+        if covered > size:
+            complete = covered = 0  # the capture was truncated or replaced
+        idx.truncate(complete)  # drop a torn last row
+        if covered >= size:
+            return 0
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            rows = [_index_row(offset, length, meta) for offset, length, meta in scan_records(data, covered)]
+        idx.seek(0, os.SEEK_END)
+        idx.write(b"".join(rows))
+        return len(rows)
+
+
+class CaptureReader:
+    """
+    Random access to a capture file through its sidecar index
+
+    Lookups by method, tool, id and server go through in-memory maps built
+    from the index; records are read from a memory map of the capture, so
+    only matching records are ever decoded. Works on a capture that is still
+    being written: refresh() picks up new records.
+
+        with CaptureReader("traffic.jsonl") as reader:
+            for record in reader.records(method="tools/call", tool="read_file", status="error"):
+                ...
+    """
+
+    _KEYS = ("method", "tool", "id", "server")
+
+    def __init__(self, path: str):
+        """
+        Open a capture for reading
+
+        Args:
+            path: Capture file (its index is used if present, else the file is scanned)
+
+        Raises:
+            OSError: If the capture cannot be opened
+        """
+        self.path = path
+        self.entries: List[IndexEntry] = []
+        self._file = open(path, 'rb')
+        self._map: Optional[mmap.mmap] = None
+        self._index_pos = 0  # bytes of the index file consumed
+        self._indexed = 0  # entries that came from the index file, the rest were scanned
+        self._by_key: Dict[Tuple[str, Any], List[int]] = {}
+        self.refresh()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def close(self):
+        """Release the memory map and file"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def refresh(self) -> int:
+        """
+        Pick up records appended since the reader was opened (or last refreshed)
+
+        Returns:
+            Number of records now available
+        """
+        size = os.fstat(self._file.fileno()).st_size
+        if size and (self._map is None or len(self._map) != size):
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Records scanned without the index last time are superseded by new index rows
+        self._truncate(self._indexed)
+        try:
+            with open(index_path(self.path), 'rb') as idx:
+                rows, self._index_pos = _read_index_rows(idx, self._index_pos)
+            for entry in rows:
+                if entry.offset + entry.length > size:
+                    break  # the index is ahead of our view of the capture
+                self._add(entry)
+            self._indexed = len(self.entries)
+        except OSError:
+            pass
+
+        covered = self.entries[-1].offset + self.entries[-1].length if self.entries else 0
+        if self._map is not None and covered < size:
+            for offset, length, meta in scan_records(self._map, covered):
+                self._add(IndexEntry(offset, length, meta.get("ts"), meta.get("source"), meta.get("server"),
+                                     meta.get("method"), meta.get("tool"), meta.get("id"), meta.get("status")))
+        return len(self.entries)
+
+    def _add(self, entry: IndexEntry):
+        position = len(self.entries)
+        self.entries.append(entry)
+        for key in self._KEYS:
+            value = getattr(entry, key)
+            if value is not None:
+                try:
+                    self._by_key.setdefault((key, value), []).append(position)
+                except TypeError:
+                    pass  # unhashable id
+
+    def _truncate(self, count: int):
+        if count == len(self.entries):
+            return
+        del self.entries[count:]
+        for positions in self._by_key.values():
+            while positions and positions[-1] >= count:
+                positions.pop()
+
+    def find(self, method: Optional[str] = None, tool: Optional[str] = None, request_id: Any = None,
+             server: Optional[str] = None, status: Optional[str] = None, source: Optional[str] = None,
+             since: Optional[float] = None, until: Optional[float] = None) -> List[IndexEntry]:
+        """
+        Index entries matching every given filter, in capture order
+
+        Args:
+            method: JSON-RPC method, e.g. "tools/call"
+            tool: Tool name of tools/call requests
+            request_id: JSON-RPC id of the request
+            server: Server name
+            status: "ok" or "error"
+            source: "client" or "proxy"
+            since: Earliest request time (epoch seconds)
+            until: Latest request time (epoch seconds)
+        """
+        keyed = [(key, value) for key, value in
+                 (("method", method), ("tool", tool), ("id", request_id), ("server", server)) if value is not None]
+        if keyed:
+            candidates = min((self._by_key.get(key, []) for key in keyed), key=len)
+            entries = (self.entries[position] for position in candidates)
+        else:
+            entries = iter(self.entries)
+
+        matches = []
+        for entry in entries:
+            if any(getattr(entry, key) != value for key, value in keyed):
+                continue
+            if status is not None and entry.status != status:
+                continue
+            if source is not None and entry.source != source:
+                continue
+            if since is not None and (entry.ts is None or entry.ts < since):
+                continue
+            if until is not None and (entry.ts is None or entry.ts > until):
+                continue
+            matches.append(entry)
+        return matches
+
+    def raw(self, entry: IndexEntry) -> bytes:
+        """The encoded record, without its newline"""
+        return self._map[entry.offset:entry.offset + entry.length - 1]
+
+    def read(self, entry: IndexEntry) -> Dict[str, Any]:
+        """Decode one record"""
+        return codec.loads(self.raw(entry))
+
+    def meta(self, entry: IndexEntry) -> Dict[str, Any]:
+        """Decode one record's metadata (session_id, latency_ms, ...) without its payloads"""
+        return _record_meta(self._map[entry.offset:entry.offset + entry.length]) or {}
+
+    def records(self, **filters) -> Iterator[Dict[str, Any]]:
+        """Decoded records matching find(**filters), in capture order"""
+        for entry in self.find(**filters):
+            yield self.read(entry)
@@ -0,0 +1,230 @@
+"""
+JSON codec for the MCP Client and Proxy
+
+Every hop (HTTP body, stdio line, proxy response) encodes or decodes JSON, and
+for multi-MB tool results that is where the proxy spends its CPU. This module
+is the single place that does it, using the fastest backend available:
+
+    orjson  ->  msgspec  ->  stdlib json
+
+Set MCP_JSON_CODEC=json|orjson|msgspec to force a backend (e.g. to compare
+them, see benchmarks/bench_codec.py). Wire output is always compact UTF-8
+bytes; values a fast backend cannot encode (e.g. integers beyond 64 bits)
+fall back to the stdlib transparently. Decode errors are always raised as
+json.JSONDecodeError, whichever backend is active.
+
+The proxy does not need the whole message to route it, only the top-level
+"id" and "method". scan_envelope() finds those with a handful of regex
+matches over the raw bytes (stopping at the first nested value), and
+splice_id() swaps the id in place, so request and response bodies can be
+forwarded without being decoded and re-encoded.
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+
+def _select_backend() -> str:
+    """Pick the backend: MCP_JSON_CODEC if set and installed, else the fastest installed"""
+    available = {"orjson": ORJSON_AVAILABLE, "msgspec": MSGSPEC_AVAILABLE, "json": True}
+    requested = os.environ.get("MCP_JSON_CODEC", "").strip().lower()
+    if requested in available and available[requested]:
+        return requested
+    for name in ("orjson", "msgspec"):
+        if available[name]:
+            return name
+    return "json"
+
+
+BACKEND = _select_backend()
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _stdlib_loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+if BACKEND == "orjson":
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        """Encode to compact JSON bytes"""
+        try:
+            return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+        except TypeError:
+            return _stdlib_dumps(obj)
+
+    def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        """Decode JSON from bytes, bytearray, memoryview or str"""
+        return orjson.loads(data)
+
+elif BACKEND == "msgspec":
+    _msgspec_encoder = msgspec.json.Encoder()
+    _msgspec_decoder = msgspec.json.Decoder()
+
+    def dumps(obj: Any) -> bytes:
+        """Encode to compact JSON bytes"""
+        try:
+            return _msgspec_encoder.encode(obj)
+        except (TypeError, OverflowError):
+            return _stdlib_dumps(obj)
+
+    def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        """Decode JSON from bytes, bytearray, memoryview or str"""
+        try:
+            return _msgspec_decoder.decode(data)
+        except msgspec.DecodeError as e:
+            doc = data if isinstance(data, str) else bytes(data).decode("utf-8", "replace")
+            raise json.JSONDecodeError(str(e), doc, 0) from None
+
+else:
+    dumps = _stdlib_dumps
+    loads = _stdlib_loads
+
+
+def dumps_str(obj: Any) -> str:
+    """Encode to compact JSON text (for text-mode sinks)"""
+    return dumps(obj).decode("utf-8")
+
+
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_SCALAR = rb"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null"
+_OPEN = re.compile(rb"[ \t\r\n]*\{")
+# One object member: key, then either a scalar value (group 2) followed by the
+# separator after it (group 3), or the opening bracket of a nested value
+_MEMBER = re.compile(
+    rb"[ \t\r\n]*(" + _STRING + rb")[ \t\r\n]*:[ \t\r\n]*"
+    rb"(?:(" + _STRING + rb"|" + _SCALAR + rb")[ \t\r\n]*([,}]?)|[{\[])"
+)
+_RESPONSE_KEYS = (b'"result"', b'"error"')
+_WS = rb"[ \t\r\n]*"
+_VALUE = rb"(" + _STRING + rb"|" + _SCALAR + rb")"
+# Fast paths for the member orders real clients and servers produce:
+#   {"jsonrpc":"2.0","id":1,"method":"x",...}   {"jsonrpc":"2.0","id":1,"result":...}
+_CANONICAL = re.compile(
+    _WS + rb'\{' + _WS + rb'"jsonrpc"' + _WS + rb":" + _WS + rb'"2\.0"' + _WS + rb"," + _WS
+    + rb'"id"' + _WS + rb":" + _WS + _VALUE + _WS + rb"," + _WS
+    + rb'(?:"method"' + _WS + rb":" + _WS + rb"(" + _STRING + rb")" + _WS + rb"[,}]|(\"(?:result|error)\")" + _WS + rb":)"
+)
+#   {"result":...,"jsonrpc":"2.0","id":1}   (e.g. the TypeScript SDK)
+# The id is found from the end: a member right before the final "}" is top-level
+_RESULT_FIRST = re.compile(_WS + rb'\{' + _WS + rb'"(?:result|error)"' + _WS + rb":")
+_TRAILING_ID = re.compile(
+    rb"[,{]" + _WS + rb'"id"' + _WS + rb":" + _WS + _VALUE + _WS
+    + rb'(?:,' + _WS + rb'"jsonrpc"' + _WS + rb":" + _WS + rb'"2\.0"' + _WS + rb")?\}" + _WS + rb"$"
+)
+_TAIL_BYTES = 256
+
+
+@dataclass
+class Envelope:
+    """Routing fields of a JSON-RPC message, located without decoding the rest"""
+    method: Optional[str]
+    id_raw: Optional[bytes]  # the id exactly as it appears on the wire, e.g. b'7' or b'"abc"'
+    id_span: Optional[Tuple[int, int]]  # byte offsets of id_raw in the message
+    is_response: bool
+
+    @property
+    def id(self) -> Any:
+        """The decoded id (None for notifications)"""
+        return loads(self.id_raw) if self.id_raw is not None else None
+
+
+def scan_envelope(data: Union[bytes, bytearray, memoryview]) -> Optional[Envelope]:
+    """
+    Locate the top-level "id" and "method" of a single JSON-RPC message
+
+    Only top-level scalars are looked at. Scanning stops at the first nested
+    value, which is where the payload (params/result/error) normally starts.
+    Nothing after that point is validated.
+
+    Args:
+        data: One encoded JSON-RPC message
+
+    Returns:
+        Envelope, or None when the message cannot be routed from a scan alone
+        (batches, escaped keys, "params" before "id"/"method", malformed input);
+        callers then fall back to a full decode
+    """
+    match = _CANONICAL.match(data)
+    if match is not None:
+        id_raw, method_raw, response_key = match.group(1, 2, 3)
+        return Envelope(method=loads(method_raw) if method_raw is not None else None,
+                        id_raw=id_raw, id_span=match.span(1), is_response=response_key is not None)
+
+    if _RESULT_FIRST.match(data):
+        offset = max(len(data) - _TAIL_BYTES, 0)
+        match = _TRAILING_ID.search(bytes(data[offset:]))
+        if match is not None:
+            start, end = match.span(1)
+            return Envelope(method=None, id_raw=match.group(1),
+                            id_span=(offset + start, offset + end), is_response=True)
+        return None
+
+    match = _OPEN.match(data)
+    if match is None:
+        return None
+    pos = match.end()
+    method = id_raw = id_span = None
+    is_response = False
+    while True:
+        match = _MEMBER.match(data, pos)
+        if match is None:
+            return None
+        key, value, separator = match.group(1, 2, 3)
+
+        if value is None:
+            # Nested value: the payload starts here
+            if key in _RESPONSE_KEYS and id_raw is not None:
+                is_response = True
+                break
+            if key == b'"params"' and method is not None and id_raw is not None:
+                break
+            return None
+
+        if key == b'"id"':
+            id_raw, id_span = value, match.span(2)
+        elif key == b'"method"':
+            if not value.startswith(b'"'):
+                return None
+            method = loads(value)
+        elif key in _RESPONSE_KEYS:
+            is_response = True
+        elif b"\\" in key:
+            return None
+
+        if separator == b"}":
+            break
+        if separator != b",":
+            return None
+        pos = match.end()
+
+    if method is None and not is_response:
+        return None
+    return Envelope(method=method, id_raw=id_raw, id_span=id_span, is_response=is_response)
+
+
+def splice_id(data: Union[bytes, bytearray, memoryview], span: Tuple[int, int], id_raw: bytes) -> bytes:
+    """Return `data` with the bytes at `span` (an Envelope.id_span) replaced by `id_raw`"""
+    start, end = span
+    return b"".join((data[:start], id_raw, data[end:]))
@@ -0,0 +1,349 @@
+"""
+Load generator for MCP servers
+
+Drives tools/call against one started, initialized client (any connection
+mode: stdio, mcp-remote or direct-remote) and reports latency percentiles,
+throughput and error rates:
+
+    closed loop   `concurrency` workers each send the next call as soon as
+                  the previous one returns (rate=None): measures capacity
+    open loop     calls start at a fixed target rate, at most `concurrency`
+                  in flight (rate=RPS): measures latency at a given load
+
+In open-loop mode latency is measured from the time a call was *scheduled*,
+not the time a worker got round to sending it. When the server falls behind,
+the wait for a free worker is part of what a real client would see; timing
+from the actual send would hide exactly the slow periods ("coordinated
+omission"). The time from send to response is reported separately as
+service_time_ms.
+
+Latencies go into LatencyHistogram, a log-linear histogram in the style of
+HdrHistogram: exact below 256 µs, then 128 sub-buckets per power of two,
+so any recorded value is within 1% of its bucket's value, in fixed memory
+regardless of how many calls are made. Each worker records into its own
+histogram; they are merged when the run ends.
+"""
+
+import bisect
+import itertools
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Values below 2**SUB_BUCKET_BITS µs are exact; above, 2**(SUB_BUCKET_BITS-1) buckets per power of two
+SUB_BUCKET_BITS = 8
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_HALF = _SUB_BUCKETS >> 1
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+class LatencyHistogram:
+    """Log-linear histogram of latencies in microseconds"""
+
+    def __init__(self):
+        self.counts: List[int] = []
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+        if value < _SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        return _SUB_BUCKETS + (shift - 1) * _HALF + (value >> shift) - _HALF
+
+    @staticmethod
+    def _highest_value(index: int) -> int:
+        """Largest value that falls into a bucket"""
+        if index < _SUB_BUCKETS:
+            return index
+        shift, sub = divmod(index - _SUB_BUCKETS, _HALF)
+        shift += 1
+        return ((sub + _HALF + 1) << shift) - 1
+
+    def record(self, seconds: float):
+        """Add one latency"""
+        value = max(0, int(seconds * 1e6))
+        index = self._index(value)
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] += 1
+        self.count += 1
+        self.total_us += value
+        if self.min_us is None or value < self.min_us:
+            self.min_us = value
+        if value > self.max_us:
+            self.max_us = value
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add another histogram's values to this one"""
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None and (self.min_us is None or other.min_us < self.min_us):
+            self.min_us = other.min_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, percent: float) -> int:
+        """Value (µs) at or below which `percent` of the recorded values fall"""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(self.count * percent / 100.0))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._highest_value(index), self.max_us)
+        return self.max_us
+
+    def summary(self) -> Dict[str, float]:
+        """min/mean/p50/p90/p99/p99.9/max in milliseconds"""
+        result = {"min": (self.min_us or 0) / 1000.0,
+                  "mean": self.total_us / self.count / 1000.0 if self.count else 0.0}
+        for percent in PERCENTILES:
+            result[f"p{percent:g}"] = self.percentile(percent) / 1000.0
+        result["max"] = self.max_us / 1000.0
+        return result
+
+    def buckets(self) -> List[Tuple[int, int]]:
+        """Non-empty buckets as (highest value in µs, count), for storing a run and merging it later"""
+        return [(self._highest_value(index), count) for index, count in enumerate(self.counts) if count]
+
+
+def parse_mix(spec: str) -> Optional[Dict[str, float]]:
+    """
+    Parse a --bench-mix value
+
+    Args:
+        spec: "all" (every tool from tools/list, equal weights) or "tool:weight,..."
+              (a tool without a weight gets 1)
+
+    Returns:
+        {tool: weight}, or None for "all"
+
+    Raises:
+        ValueError: If a weight is not a positive number
+    """
+    if spec.strip().lower() == "all":
+        return None
+    mix: Dict[str, float] = {}
+    for item in spec.split(","):
+        name, separator, weight = item.rpartition(":")
+        if not separator:
+            name, weight = weight, "1"
+        name = name.strip()
+        if not name:
+            continue
+        value = float(weight)
+        if value <= 0:
+            raise ValueError(f"weight of '{name}' must be positive")
+        mix[name] = value
+    if not mix:
+        raise ValueError("no tools given")
+    return mix
+
+
+class _Stats:
+    """One worker's measurements"""
+
+    def __init__(self, tools: Iterable[str]):
+        self.latency = LatencyHistogram()
+        self.service = LatencyHistogram()
+        self.per_tool = {tool: LatencyHistogram() for tool in tools}
+        self.errors: Dict[str, int] = {}
+        self.tool_errors: Dict[str, int] = {}
+        self.error_samples: List[str] = []
+
+    def merge(self, other: "_Stats"):
+        self.latency.merge(other.latency)
+        self.service.merge(other.service)
+        for tool, histogram in other.per_tool.items():
+            self.per_tool[tool].merge(histogram)
+        for kind, count in other.errors.items():
+            self.errors[kind] = self.errors.get(kind, 0) + count
+        for tool, count in other.tool_errors.items():
+            self.tool_errors[tool] = self.tool_errors.get(tool, 0) + count
+        self.error_samples.extend(other.error_samples[:5 - len(self.error_samples)])
+
+
+class LoadGenerator:
+    """Drives a weighted mix of tool calls against one client and measures latency"""
+
+    def __init__(self, client: Any, mix: Dict[str, float], arguments: Optional[Dict[str, Dict[str, Any]]] = None,
+                 concurrency: int = 4, rate: Optional[float] = None, duration: float = 10.0,
+                 requests: Optional[int] = None, warmup: float = 0.0, seed: Optional[int] = None):
+        """
+        Initialize the generator
+
+        Args:
+            client: Started, initialized client (anything with send_request)
+            mix: {tool: weight}; each call picks a tool with probability weight / sum of weights
+            arguments: {tool: arguments}; tools not listed are called with {}
+            concurrency: Workers (closed loop) or maximum calls in flight (open loop)
+            rate: Target calls per second (open loop), None for closed loop
+            duration: Seconds to measure for, after the warm-up
+            requests: Stop after this many measured calls instead (whichever comes first)
+            warmup: Seconds of calls made before measuring starts
+            seed: Seed for the tool choice, for a reproducible sequence
+
+        Raises:
+            ValueError: If the mix is empty or the rate is not positive
+        """
+        if not mix:
+            raise ValueError("mix needs at least one tool")
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive (None for closed loop)")
+        self.client = client
+        self.mix = dict(mix)
+        self.arguments = arguments or {}
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.duration = duration
+        self.requests = requests
+        self.warmup = warmup
+        self.seed = seed
+        self._tools = list(self.mix)
+        self._cumulative = list(itertools.accumulate(self.mix[tool] for tool in self._tools))
+        self._params = {tool: {"name": tool, "arguments": self.arguments.get(tool, {})} for tool in self._tools}
+        self._local = threading.local()
+        self._all_stats: List[_Stats] = []
+        self._stats_lock = threading.Lock()
+
+    def _stats(self) -> _Stats:
+        stats = getattr(self._local, "stats", None)
+        if stats is None:
+            stats = self._local.stats = _Stats(self._tools)
+            with self._stats_lock:
+                self._all_stats.append(stats)
+        return stats
+
+    def _pick(self, rng: random.Random) -> str:
+        if len(self._tools) == 1:
+            return self._tools[0]
+        return self._tools[bisect.bisect(self._cumulative, rng.random() * self._cumulative[-1])]
+
+    def _call(self, tool: str, scheduled: float, measure_from: float):
+        """Make one call and record it if it was scheduled after the warm-up"""
+        sent = time.perf_counter()
+        error_kind = None
+        try:
+            response = self.client.send_request("tools/call", self._params[tool])
+            if not isinstance(response, dict) or "result" not in response:
+                error_kind = "rpc"
+                detail = response.get("error", response) if isinstance(response, dict) else response
+            elif isinstance(response["result"], dict) and response["result"].get("isError"):
+                error_kind = "tool"
+                detail = response["result"].get("content")
+        except Exception as e:
+            error_kind = "transport"
+            detail = str(e) or type(e).__name__
+        finished = time.perf_counter()
+        if scheduled < measure_from:
+            return
+
+        stats = self._stats()
+        stats.latency.record(finished - scheduled)
+        stats.service.record(finished - sent)
+        stats.per_tool[tool].record(finished - scheduled)
+        if error_kind:
+            stats.errors[error_kind] = stats.errors.get(error_kind, 0) + 1
+            stats.tool_errors[tool] = stats.tool_errors.get(tool, 0) + 1
+            if len(stats.error_samples) < 5:
+                stats.error_samples.append(f"{tool}: {str(detail)[:200]}")
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Generate load until the duration (or request count) is reached
+
+        Returns:
+            Report: configuration, requests, errors by kind, error rate, throughput,
+            latency percentiles (ms), per-tool breakdown and the latency histogram
+        """
+        started = time.perf_counter()
+        measure_from = started + self.warmup
+        deadline = measure_from + self.duration
+        measured = itertools.count()  # next() is atomic, so workers can share it
+        limit = self.requests
+
+        if self.rate is None:
+            def worker(number: int):
+                rng = random.Random(None if self.seed is None else self.seed + number)
+                while True:
+                    now = time.perf_counter()
+                    if now >= deadline:
+                        return
+                    if now >= measure_from and limit is not None and next(measured) >= limit:
+                        return
+                    self._call(self._pick(rng), now, measure_from)
+
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="MCPBenchWorker") as executor:
+                list(executor.map(worker, range(self.concurrency)))
+        else:
+            rng = random.Random(self.seed)
+            interval = 1.0 / self.rate
+            in_flight = threading.BoundedSemaphore(self.concurrency)
+
+            def call(tool: str, scheduled: float):
+                try:
+                    self._call(tool, scheduled, measure_from)
+                finally:
+                    in_flight.release()
+
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="MCPBenchWorker") as executor:
+                for sequence in itertools.count():
+                    scheduled = started + sequence * interval
+                    if scheduled >= deadline:
+                        break
+                    if scheduled >= measure_from and limit is not None and next(measured) >= limit:
+                        break
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    # Waits here when every slot is busy; the wait counts towards latency
+                    in_flight.acquire()
+                    executor.submit(call, self._pick(rng), scheduled)
+        elapsed = time.perf_counter() - measure_from
+
+        return self._report(elapsed)
+
+    def _report(self, elapsed: float) -> Dict[str, Any]:
+        total = _Stats(self._tools)
+        for stats in self._all_stats:
+            total.merge(stats)
+
+        requests = total.latency.count
+        errors = sum(total.errors.values())
+        report: Dict[str, Any] = {
+            "mode": "closed-loop" if self.rate is None else "open-loop",
+            "concurrency": self.concurrency,
+            "target_rate": self.rate,
+            "mix": self.mix,
+            "warmup_s": self.warmup,
+            "elapsed_s": round(elapsed, 3),
+            "requests": requests,
+            "ok": requests - errors,
+            "errors": dict(total.errors, total=errors),
+            "error_rate": errors / requests if requests else 0.0,
+            "throughput_rps": requests / elapsed if elapsed > 0 else 0.0,
+            "latency_ms": total.latency.summary(),
+        }
+        if self.rate is not None:
+            report["service_time_ms"] = total.service.summary()
+        report["per_tool"] = {
+            tool: {"requests": histogram.count,
+                   "errors": total.tool_errors.get(tool, 0),
+                   "latency_ms": histogram.summary()}
+            for tool, histogram in total.per_tool.items()
+        }
+        if total.error_samples:
+            report["error_samples"] = total.error_samples
+        report["histogram_us"] = total.latency.buckets()
+        return report
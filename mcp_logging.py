@@ -0,0 +1,101 @@
+"""
+Leveled logging for the MCP Client and Proxy
+
+Debug output goes through the standard logging module under the "mcp_client"
+logger. Messages take %-style arguments, which logging only formats when the
+record is actually emitted, so nothing is rendered while --debug is off.
+
+Expensive renderings (pretty-printed JSON, response bodies) are wrapped in
+LazyJSON / lazy() so they are computed at emit time, never at the call site:
+
+    logger.debug("Request Body: %s", LazyJSON(request))
+    logger.debug("Response Text (first 500 chars): %s", lazy(lambda: response.text[:500]))
+"""
+
+import json
+import logging
+import sys
+from typing import Any, Callable, Optional
+
+LOGGER_NAME = "mcp_client"
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """
+    StreamHandler bound to whatever sys.stdout is at emit time, so output keeps
+    flowing through the session log tee installed after the handler was created.
+    """
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class LazyJSON:
+    """Defers json.dumps(obj) until the log record is formatted"""
+
+    __slots__ = ("obj", "indent", "limit")
+
+    def __init__(self, obj: Any, indent: Optional[int] = 2, limit: Optional[int] = None):
+        self.obj = obj
+        self.indent = indent
+        self.limit = limit
+
+    def __str__(self) -> str:
+        try:
+            text = json.dumps(self.obj, indent=self.indent, default=str)
+        except Exception:
+            text = repr(self.obj)
+        return text[:self.limit] if self.limit is not None else text
+
+
+class _LazyCall:
+    """Defers an arbitrary callable until the log record is formatted"""
+
+    __slots__ = ("func",)
+
+    def __init__(self, func: Callable[[], Any]):
+        self.func = func
+
+    def __str__(self) -> str:
+        try:
+            return str(self.func())
+        except Exception as e:
+            return f"<unavailable: {e}>"
+
+
+def lazy(func: Callable[[], Any]) -> _LazyCall:
+    """Wrap a zero-argument callable so it only runs if the message is emitted"""
+    return _LazyCall(func)
+
+
+def get_logger(name: Optional[str] = None) -> logging.Logger:
+    """Return the package logger, or a named child of it"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
+
+
+def configure_logging(debug: bool = False) -> logging.Logger:
+    """
+    Attach the stdout handler (once) and set the package log level.
+
+    Args:
+        debug: DEBUG level when True, INFO otherwise
+
+    Returns:
+        The package logger
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    if not any(isinstance(handler, _StdoutHandler) for handler in logger.handlers):
+        handler = _StdoutHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(logging.DEBUG if debug else logging.INFO)
+    return logger
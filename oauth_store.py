@@ -0,0 +1,418 @@
+"""
+Persistent OAuth state for the MCP Client and Proxy
+
+DiscoveryCache keeps Protected Resource Metadata (RFC 9728) and Authorization
+Server Metadata (RFC 8414 / OpenID discovery) between runs, so a re-auth does
+not have to walk the whole discovery chain through Burp again. Entries expire
+according to the HTTP caching headers the metadata was served with.
+
+TokenStore keeps access and refresh tokens, keyed by resource URI and
+client_id, encrypted with Fernet from the optional `cryptography` package.
+The key comes from MCP_CLIENT_TOKEN_KEY or a 0600 key file created next to
+the store. The key file sits beside the ciphertext, so by default the
+encryption only keeps tokens from being read at a glance; it protects them
+from anyone who can read the cache directory only when MCP_CLIENT_TOKEN_KEY
+is set. Without `cryptography`, tokens are simply not persisted.
+
+ClientRegistrationCache keeps clients created through Dynamic Client
+Registration (RFC 7591), keyed by registration endpoint and redirect URI, so
+each run reuses one client instead of registering a new one. It is encrypted
+the same way (registrations can carry client secrets); without `cryptography`
+it only lasts for the current process.
+
+Everything lives under <cache root>/oauth (see tools_cache.cache_root).
+"""
+
+import json
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+from tools_cache import atomic_write_json, cache_root
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+    CRYPTOGRAPHY_AVAILABLE = True
+except ImportError:
+    CRYPTOGRAPHY_AVAILABLE = False
+
+
+# Lifetime of metadata served without any caching headers
+DEFAULT_METADATA_TTL = 3600.0
+
+
+def cache_lifetime(headers: Mapping[str, str], default: float = DEFAULT_METADATA_TTL) -> float:
+    """
+    Seconds a response may be reused, from its Cache-Control / Expires / Age headers
+
+    Args:
+        headers: Response headers (case-insensitive mapping, e.g. httpx.Headers)
+        default: Lifetime when the response carries no freshness information
+
+    Returns:
+        Lifetime in seconds (0 means do not reuse)
+    """
+    cache_control = (headers.get("cache-control") or "").lower()
+    directives = {}
+    for part in cache_control.split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name] = value.strip('"')
+
+    if "no-store" in directives or "no-cache" in directives:
+        return 0.0
+
+    try:
+        age = max(0.0, float(headers.get("age") or 0))
+    except ValueError:
+        age = 0.0
+
+    if "max-age" in directives:
+        try:
+            return max(0.0, float(directives["max-age"]) - age)
+        except ValueError:
+            return 0.0
+
+    expires = headers.get("expires")
+    if expires:
+        try:
+            expires_at = parsedate_to_datetime(expires).timestamp()
+            date = headers.get("date")
+            now = parsedate_to_datetime(date).timestamp() if date else time.time()
+            return max(0.0, expires_at - now)
+        except (TypeError, ValueError, OverflowError):
+            # Invalid Expires (e.g. "0") means already expired
+            return 0.0
+
+    return default
+
+
+class DiscoveryCache:
+    """Header-aware, on-disk cache of OAuth discovery documents"""
+
+    def __init__(self, cache_dir: Optional[str] = None, default_ttl: float = DEFAULT_METADATA_TTL):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory for the cache file (default: <cache root>/oauth)
+            default_ttl: Lifetime of metadata served without caching headers
+        """
+        self.path = os.path.join(cache_dir or os.path.join(cache_root(), "oauth"), "discovery.json")
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Read the cache file once per process"""
+        if self._entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+                self._entries = entries if isinstance(entries, dict) else {}
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached document fetched from `url`, if still fresh
+
+        Args:
+            url: Metadata URL (resource metadata or well-known AS metadata URL)
+        """
+        with self._lock:
+            entry = self._load().get(url)
+        if not entry or entry.get("expires_at", 0) <= time.time():
+            return None
+        return entry.get("metadata")
+
+    def put(self, url: str, metadata: Dict[str, Any], headers: Mapping[str, str]):
+        """
+        Remember a document fetched from `url` for as long as its headers allow
+
+        Args:
+            url: Metadata URL it was fetched from
+            metadata: Parsed JSON document
+            headers: Response headers, used to compute expiry
+        """
+        lifetime = cache_lifetime(headers, self.default_ttl)
+        with self._lock:
+            entries = self._load()
+            now = time.time()
+            # Drop expired entries while we are rewriting the file anyway
+            for key in [key for key, entry in entries.items() if entry.get("expires_at", 0) <= now]:
+                del entries[key]
+            if lifetime <= 0:
+                entries.pop(url, None)
+            else:
+                entries[url] = {"expires_at": now + lifetime, "metadata": metadata}
+            try:
+                atomic_write_json(self.path, entries, mode=0o600)
+            except OSError:
+                pass
+
+    def invalidate(self, url: str):
+        """Forget a cached document (e.g. when its endpoints stopped working)"""
+        with self._lock:
+            entries = self._load()
+            if entries.pop(url, None) is not None:
+                try:
+                    atomic_write_json(self.path, entries, mode=0o600)
+                except OSError:
+                    pass
+
+
+class _EncryptedJSONFile:
+    """A JSON object stored Fernet-encrypted on disk"""
+
+    def __init__(self, path: str, key_path: str, label: str):
+        self.path = path
+        self.key_path = key_path
+        self.label = label
+        self._fernet = None
+        self._usable: Optional[bool] = None
+
+    def _get_fernet(self):
+        """Load the key (env var, then key file), creating the key file on first use"""
+        if self._fernet is None:
+            key = os.environ.get("MCP_CLIENT_TOKEN_KEY")
+            if key:
+                key = key.encode()
+            else:
+                try:
+                    with open(self.key_path, 'rb') as f:
+                        key = f.read().strip()
+                except FileNotFoundError:
+                    key = Fernet.generate_key()
+                    os.makedirs(os.path.dirname(self.key_path), exist_ok=True)
+                    try:
+                        fd = os.open(self.key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                    except FileExistsError:
+                        # Another store created it first
+                        with open(self.key_path, 'rb') as f:
+                            key = f.read().strip()
+                    else:
+                        with os.fdopen(fd, 'wb') as f:
+                            f.write(key)
+            self._fernet = Fernet(key)
+        return self._fernet
+
+    def usable(self) -> bool:
+        """Load the key once; False (after one warning) if it is malformed or unreadable"""
+        if self._usable is None:
+            try:
+                self._get_fernet()
+                self._usable = True
+            except (OSError, ValueError) as e:
+                source = "MCP_CLIENT_TOKEN_KEY" if os.environ.get("MCP_CLIENT_TOKEN_KEY") else self.key_path
+                print(f"⚠️  Cannot use the encryption key from {source} ({e}); "
+                      f"{self.label} will not be saved to disk")
+                self._usable = False
+        return self._usable
+
+    def load(self) -> Dict[str, Any]:
+        """Decrypt the file; a missing, foreign-key or corrupt file reads as empty"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = json.loads(self._get_fernet().decrypt(f.read()))
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError, InvalidToken):
+            return {}
+
+    def save(self, data: Dict[str, Any]):
+        """Encrypt and atomically replace the file"""
+        token = self._get_fernet().encrypt(json.dumps(data).encode("utf-8"))
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(token)
+        os.replace(tmp_path, self.path)
+
+
+class TokenStore:
+    """Encrypted on-disk OAuth tokens, keyed by resource URI and client_id"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize the store
+
+        Args:
+            cache_dir: Directory for the store and its key (default: <cache root>/oauth)
+        """
+        cache_dir = cache_dir or os.path.join(cache_root(), "oauth")
+        self.available = CRYPTOGRAPHY_AVAILABLE
+        self._file = _EncryptedJSONFile(os.path.join(cache_dir, "tokens.enc"),
+                                        os.path.join(cache_dir, "token.key"),
+                                        "OAuth tokens") if self.available else None
+        self._lock = threading.Lock()
+        self._warned = False
+
+    @staticmethod
+    def _key(resource: str, client_id: str) -> str:
+        return f"{resource} {client_id}"
+
+    def find(self, resource: Optional[str] = None, server_url: Optional[str] = None,
+             client_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the most recently saved record matching every given field
+
+        Args:
+            resource: Resource URI the token was issued for
+            server_url: MCP endpoint the token was obtained for
+            client_id: OAuth client the token was issued to
+        """
+        if not self.available or not self._file.usable():
+            return None
+        with self._lock:
+            try:
+                records = list(self._file.load().values())
+            except OSError:
+                return None
+        matches = [
+            record for record in records
+            if (resource is None or record.get("resource") == resource)
+            and (server_url is None or record.get("server_url") == server_url)
+            and (client_id is None or record.get("client_id") == client_id)
+        ]
+        if not matches:
+            return None
+        return max(matches, key=lambda record: record.get("updated_at", 0))
+
+    def put(self, resource: str, client_id: str, record: Dict[str, Any]):
+        """
+        Save (replace) the tokens for a resource/client pair
+
+        Args:
+            resource: Resource URI the token was issued for
+            client_id: OAuth client the token was issued to
+            record: access_token, refresh_token, expires_at, token_endpoint, ...
+        """
+        if not self.available:
+            if not self._warned:
+                self._warned = True
+                print("⚠️  OAuth tokens will not be saved between runs. Run: pip install cryptography")
+            return
+        if not self._file.usable():
+            return
+        with self._lock:
+            try:
+                records = self._file.load()
+                records[self._key(resource, client_id)] = dict(
+                    record, resource=resource, client_id=client_id, updated_at=time.time()
+                )
+                self._file.save(records)
+            except OSError:
+                pass
+
+    def delete(self, resource: str, client_id: str):
+        """Forget the tokens for a resource/client pair (e.g. revoked refresh token)"""
+        if not self.available or not self._file.usable():
+            return
+        with self._lock:
+            try:
+                records = self._file.load()
+                if records.pop(self._key(resource, client_id), None) is not None:
+                    self._file.save(records)
+            except OSError:
+                pass
+
+
+class ClientRegistrationCache:
+    """Dynamically registered OAuth clients, keyed by registration endpoint and redirect URI"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory for the cache and its key (default: <cache root>/oauth)
+        """
+        cache_dir = cache_dir or os.path.join(cache_root(), "oauth")
+        self.persistent = CRYPTOGRAPHY_AVAILABLE
+        self._file = _EncryptedJSONFile(os.path.join(cache_dir, "registrations.enc"),
+                                        os.path.join(cache_dir, "token.key"),
+                                        "OAuth client registrations") if self.persistent else None
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(registration_endpoint: str, redirect_uri: str) -> str:
+        return f"{registration_endpoint} {redirect_uri}"
+
+    def _on_disk(self) -> bool:
+        # A malformed key disables the file for the rest of the process
+        if self.persistent and not self._file.usable():
+            self.persistent = False
+        return self.persistent
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        return self._file.load() if self._on_disk() else self._memory
+
+    def _save(self, registrations: Dict[str, Dict[str, Any]]):
+        if self._on_disk():
+            self._file.save(registrations)
+
+    def get(self, registration_endpoint: str, redirect_uri: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the registered client (client_id, client_secret, ...) if still usable
+
+        A client whose client_secret_expires_at has passed is treated as missing
+        (0 means the secret never expires, per RFC 7591).
+        """
+        with self._lock:
+            try:
+                registration = self._load().get(self._key(registration_endpoint, redirect_uri))
+            except OSError:
+                return None
+        if not registration or not registration.get("client_id"):
+            return None
+        expires_at = registration.get("client_secret_expires_at") or 0
+        if expires_at and expires_at <= time.time():
+            return None
+        return registration
+
+    def put(self, registration_endpoint: str, redirect_uri: str, registration: Dict[str, Any]):
+        """
+        Remember a registration response
+
+        Args:
+            registration_endpoint: Endpoint the client was registered at
+            redirect_uri: Redirect URI it was registered with
+            registration: Parsed RFC 7591 registration response
+        """
+        entry = {
+            "client_id": registration.get("client_id"),
+            "client_secret": registration.get("client_secret"),
+            "client_secret_expires_at": registration.get("client_secret_expires_at", 0),
+            "registered_at": time.time(),
+        }
+        with self._lock:
+            try:
+                registrations = self._load()
+                registrations[self._key(registration_endpoint, redirect_uri)] = entry
+                self._save(registrations)
+            except OSError:
+                pass
+
+    def forget(self, client_id: str):
+        """
+        Drop every registration of a client the authorization server rejected
+
+        Args:
+            client_id: The rejected client
+        """
+        with self._lock:
+            try:
+                registrations = self._load()
+                stale = [key for key, entry in registrations.items() if entry.get("client_id") == client_id]
+                if not stale:
+                    return
+                for key in stale:
+                    del registrations[key]
+                self._save(registrations)
+            except OSError:
+                pass
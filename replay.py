@@ -0,0 +1,336 @@
+"""
+Replay captured MCP traffic
+
+Re-sends the requests in a capture file (see capture.py) through MCPClient,
+either to the server each one was recorded against or to another one, and
+diffs every new response against the recorded response. One JSONL record is
+streamed per replayed request as it completes:
+
+    {"seq": 12, "server": "fs", "method": "tools/call", "tool": "read_file",
+     "recorded_id": 7, "id": 3, "ok": true, "latency_ms": 4.1,
+     "recorded_latency_ms": 12.4, "match": false,
+     "diff": [{"path": "result.content[0].text", "recorded": "...", "replayed": "..."}]}
+
+Rewriting and re-binding:
+
+    ids          every request gets a fresh id from the replaying client;
+                 "recorded_id" and "id" map one to the other
+    sessions     each recorded Mcp-Session-Id is bound to a session of its
+                 own on the target (a new client, initialized afresh), so
+                 requests that shared a session still share one
+    initialize   initialize and notifications are not replayed: the target
+                 session is initialized when its client starts
+
+Rate:
+
+    "max"        flat out: the next request is sent as soon as a worker is free
+    1.0          as recorded: requests start at their recorded offsets
+    N            N times faster than recorded
+
+In every mode at most `concurrency` requests are in flight; a timed replay
+that cannot keep up falls behind schedule rather than queueing without bound,
+and the summary reports how far behind it got.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, IO, Iterable, List, Optional, Tuple
+
+import codec
+from capture import CaptureReader, IndexEntry
+
+# Requests the replaying client sends itself when a session starts
+SKIPPED_METHODS = frozenset({"initialize"})
+MAX_DIFFS = 20
+_VALUE_PREVIEW = 200
+
+
+def parse_rate(value: str) -> Optional[float]:
+    """
+    Parse a --replay-rate value
+
+    Args:
+        value: "max", "recorded", or a speed-up factor such as "10" or "10x"
+
+    Returns:
+        Speed-up factor, or None for flat out
+
+    Raises:
+        ValueError: If the value is not understood
+    """
+    value = value.strip().lower()
+    if value in ("max", "0"):
+        return None
+    if value == "recorded":
+        return 1.0
+    factor = float(value[:-1] if value.endswith("x") else value)
+    if factor <= 0:
+        raise ValueError("rate must be positive")
+    return factor
+
+
+def _preview(value: Any) -> Any:
+    """Shorten large values in diff output"""
+    if isinstance(value, (dict, list)):
+        text = codec.dumps_str(value)
+        return value if len(text) <= _VALUE_PREVIEW else text[:_VALUE_PREVIEW] + "..."
+    if isinstance(value, str) and len(value) > _VALUE_PREVIEW:
+        return value[:_VALUE_PREVIEW] + "..."
+    return value
+
+
+def diff_json(recorded: Any, replayed: Any, ignore: Iterable[str] = (), limit: int = MAX_DIFFS,
+              path: str = "") -> List[Dict[str, Any]]:
+    """
+    Differences between two decoded JSON values
+
+    Args:
+        recorded: Value from the capture
+        replayed: Value from the replay
+        ignore: Object member names skipped at any depth (timestamps, nonces, ...)
+        limit: Stop after this many differences
+        path: Path of the values, for nested calls
+
+    Returns:
+        [{"path", "recorded", "replayed"}] with a missing member shown as "<missing>"
+    """
+    ignore = ignore if isinstance(ignore, (set, frozenset)) else frozenset(ignore)
+    diffs: List[Dict[str, Any]] = []
+
+    def walk(a: Any, b: Any, where: str):
+        if len(diffs) >= limit:
+            return
+        if isinstance(a, dict) and isinstance(b, dict):
+            for key in list(a) + [key for key in b if key not in a]:
+                if key in ignore:
+                    continue
+                child = f"{where}.{key}" if where else str(key)
+                walk(a.get(key, "<missing>"), b.get(key, "<missing>"), child)
+        elif isinstance(a, list) and isinstance(b, list):
+            for i in range(max(len(a), len(b))):
+                walk(a[i] if i < len(a) else "<missing>", b[i] if i < len(b) else "<missing>", f"{where}[{i}]")
+        elif a != b or type(a) is not type(b):
+            diffs.append({"path": where or "$", "recorded": _preview(a), "replayed": _preview(b)})
+
+    walk(recorded, replayed, path)
+    return diffs
+
+
+def _outcome(response: Any) -> Dict[str, Any]:
+    """The part of a response that is compared: result or error, without id/jsonrpc"""
+    if not isinstance(response, dict):
+        return {"error": response}
+    if "result" in response:
+        return {"result": response["result"]}
+    return {"error": response.get("error", response)}
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class ReplayRunner:
+    """Replays the requests of a capture file and diffs the responses"""
+
+    def __init__(self, open_server: Callable[[str], Any], concurrency: int = 4, rate: Optional[float] = None,
+                 output: Optional[IO[str]] = None, target: Optional[str] = None,
+                 ignore: Iterable[str] = (), diff: bool = True):
+        """
+        Initialize the runner
+
+        Args:
+            open_server: Callable taking a server name and returning a started,
+                         initialized client (or None if the server is unusable);
+                         called once per recorded session
+            concurrency: Maximum requests in flight
+            rate: Speed-up factor over the recorded timing (1.0 as recorded), None for flat out
+            output: Text stream results are written to, one JSON object per line
+            target: Send every request to this server instead of the recorded one
+            ignore: Object member names left out of the diff at any depth
+            diff: Compare responses with the recorded ones
+        """
+        self.open_server = open_server
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.output = output
+        self.target = target
+        self.ignore = frozenset(ignore)
+        self.diff = diff
+        self._write_lock = threading.Lock()
+        self._clients: Dict[Tuple[str, Any], Any] = {}
+        self._failed_sessions: Dict[Tuple[str, Any], str] = {}
+
+    @staticmethod
+    def select(reader: CaptureReader, **filters) -> Tuple[List[IndexEntry], int]:
+        """
+        Capture entries to replay, in recorded order
+
+        Args:
+            reader: Open capture
+            **filters: CaptureReader.find() filters (method, tool, server, source, ...)
+
+        Returns:
+            (entries, number of entries skipped: notifications and initialize)
+        """
+        entries = []
+        skipped = 0
+        for entry in reader.find(**filters):
+            if entry.id is None or entry.method in SKIPPED_METHODS or not entry.method:
+                skipped += 1
+                continue
+            entries.append(entry)
+        entries.sort(key=lambda entry: entry.ts or 0.0)
+        return entries, skipped
+
+    def run(self, path: str, **filters) -> Dict[str, Any]:
+        """
+        Replay every selected request in the capture
+
+        Args:
+            path: Capture file
+            **filters: CaptureReader.find() filters narrowing what is replayed
+
+        Returns:
+            Summary with total/ok/failed/matched/mismatched counts, skipped requests,
+            elapsed seconds, requests per second, latency percentiles (ms),
+            the largest schedule lag (ms) and the session mapping
+        """
+        with CaptureReader(path) as reader:
+            entries, skipped = self.select(reader, **filters)
+            keys = [(self.target or entry.server, reader.meta(entry).get("session_id")) for entry in entries]
+
+            # Start a session per recorded session up front (sequentially, so start-up output stays readable)
+            for key in dict.fromkeys(keys):
+                self._client_for(key)
+
+            outcomes: List[Dict[str, Any]] = []
+            max_lag = 0.0
+            in_flight = threading.BoundedSemaphore(self.concurrency)
+            first_ts = (entries[0].ts or 0.0) if entries else 0.0
+
+            def done(future):
+                in_flight.release()
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="MCPReplayWorker") as executor:
+                futures = []
+                for seq, entry in enumerate(entries, 1):
+                    if self.rate is not None and entry.ts is not None:
+                        due = started + (entry.ts - first_ts) / self.rate
+                        delay = due - time.perf_counter()
+                        if delay > 0:
+                            time.sleep(delay)
+                    in_flight.acquire()
+                    if self.rate is not None and entry.ts is not None:
+                        max_lag = max(max_lag, time.perf_counter() - due)
+                    # Decoded here, one record at a time, so a large capture is never held in memory
+                    record = reader.read(entry)
+                    future = executor.submit(self._execute, seq, record, keys[seq - 1])
+                    future.add_done_callback(done)
+                    futures.append(future)
+                outcomes = [future.result() for future in futures]
+            elapsed = time.perf_counter() - started
+
+        latencies = sorted(outcome["latency_ms"] for outcome in outcomes)
+        ok = sum(1 for outcome in outcomes if outcome["ok"])
+        compared = [outcome for outcome in outcomes if "match" in outcome]
+        matched = sum(1 for outcome in compared if outcome["match"])
+        return {
+            "total": len(outcomes),
+            "ok": ok,
+            "failed": len(outcomes) - ok,
+            "matched": matched,
+            "mismatched": len(compared) - matched,
+            "skipped": skipped,
+            "elapsed_s": elapsed,
+            "requests_per_s": len(outcomes) / elapsed if elapsed > 0 else 0.0,
+            "latency_ms": {
+                "p50": _percentile(latencies, 0.50),
+                "p99": _percentile(latencies, 0.99),
+                "max": latencies[-1] if latencies else 0.0,
+            },
+            "max_lag_ms": round(max_lag * 1000, 3),
+            "sessions": [
+                {"server": server, "recorded_session_id": session_id,
+                 "session_id": getattr(self._clients.get((server, session_id)), "mcp_session_id", None)}
+                for server, session_id in dict.fromkeys(keys)
+            ],
+        }
+
+    def _client_for(self, key: Tuple[str, Any]) -> Any:
+        """Return the client bound to a recorded session, starting it on first use"""
+        if key in self._clients:
+            return self._clients[key]
+        if key in self._failed_sessions:
+            return None
+        server_name = key[0]
+        if not server_name:
+            self._failed_sessions[key] = "Record has no server name; use a target server"
+            return None
+        try:
+            client = self.open_server(server_name)
+        except Exception as e:
+            client = None
+            self._failed_sessions[key] = str(e)
+        if client is None:
+            self._failed_sessions.setdefault(key, f"Could not start server '{server_name}'")
+        else:
+            self._clients[key] = client
+        return client
+
+    def _execute(self, seq: int, record: Dict[str, Any], key: Tuple[str, Any]) -> Dict[str, Any]:
+        """Send one recorded request, diff the response and emit the result record"""
+        request = record.get("request") or {}
+        result: Dict[str, Any] = {
+            "seq": seq,
+            "server": key[0],
+            "method": record.get("method"),
+            "tool": record.get("tool"),
+            "recorded_id": record.get("id"),
+        }
+
+        client = self._clients.get(key)
+        if client is None:
+            result.update(ok=False, latency_ms=0.0, error=self._failed_sessions.get(key))
+            self._emit(result)
+            return result
+
+        started = time.perf_counter()
+        try:
+            response = client.send_request(record["method"], request.get("params"))
+        except Exception as e:
+            response = {"error": {"message": str(e)}}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        result["recorded_latency_ms"] = record.get("latency_ms")
+        if isinstance(response, dict):
+            result["id"] = response.get("id")
+
+        replayed = _outcome(response)
+        result["ok"] = "result" in replayed and not (
+            isinstance(replayed["result"], dict) and replayed["result"].get("isError"))
+        if not result["ok"]:
+            result["error"] = replayed.get("error", replayed.get("result"))
+
+        if self.diff:
+            if record.get("response") is None:
+                # The recorded call failed without a response; only the outcome can be compared
+                result["match"] = not result["ok"]
+                if result["ok"]:
+                    result["diff"] = [{"path": "$", "recorded": record.get("error"), "replayed": "<ok>"}]
+            else:
+                diffs = diff_json(_outcome(record["response"]), replayed, self.ignore)
+                result["match"] = not diffs
+                if diffs:
+                    result["diff"] = diffs
+        self._emit(result)
+        return result
+
+    def _emit(self, record: Dict[str, Any]):
+        """Write one result line (whole lines only, even with many workers)"""
+        line = codec.dumps_str(record)
+        with self._write_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
@@ -0,0 +1,283 @@
+"""
+Session log writer for the MCP Client and Proxy
+
+Every line the CLI prints is mirrored to a session log. Doing that inline
+(regex-stripping ANSI escapes and writing to a line-buffered file on every
+print) roughly doubled the cost of printing large tool results, and made
+every print wait for a disk write.
+
+SessionLogWriter instead queues the text and returns at once. A writer thread
+wakes every FLUSH_INTERVAL seconds (or once WAKE_BYTES are queued), takes
+whatever has accumulated, strips ANSI escapes (only from chunks that
+contain an ESC at all) and writes the batch with one gathered write. The queue is bounded in bytes
+(max_pending_bytes): when the disk cannot keep up, producers wait for room
+rather than letting memory grow or dropping output.
+
+With max_bytes set, the log is rotated when it reaches that size:
+session.log -> session.log.1 -> ... -> session.log.<backups>, optionally
+gzip-compressed (session.log.1.gz, ...), also on the writer thread.
+"""
+
+import atexit
+import gzip
+import os
+import re
+import shutil
+import sys
+import threading
+from collections import deque
+from typing import Optional
+
+# ANSI escape sequences (colors, cursor moves) — stripped from log files
+ANSI_ESCAPE_RE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+# An escape sequence that may still be incomplete at the end of a batch
+_PARTIAL_ESCAPE_RE = re.compile(r'\x1B(?:\[[0-?]*[ -/]*)?\Z')
+
+MAX_PENDING_BYTES = 8 * 1024 * 1024
+# The writer wakes when this much is queued, or every FLUSH_INTERVAL seconds
+WAKE_BYTES = 256 * 1024
+FLUSH_INTERVAL = 0.2
+_IOV_MAX = 1024
+DEFAULT_BACKUPS = 5
+
+
+def write_parts(file, parts: list) -> int:
+    """
+    Append byte strings to an unbuffered file without joining them first
+
+    Args:
+        file: File opened with buffering=0
+        parts: bytes objects, written in order
+
+    Returns:
+        Bytes written
+    """
+    if not hasattr(os, "writev"):
+        data = b''.join(parts)
+        file.write(data)
+        return len(data)
+    fd = file.fileno()
+    total = 0
+    for start in range(0, len(parts), _IOV_MAX):
+        pending = [memoryview(part) for part in parts[start:start + _IOV_MAX] if part]
+        while pending:
+            written = os.writev(fd, pending)
+            total += written
+            while pending and written >= len(pending[0]):
+                written -= len(pending[0])
+                pending.pop(0)
+            if pending and written:
+                pending[0] = pending[0][written:]
+    return total
+
+
+class SessionLogWriter:
+    """Append text to a log file from a background thread"""
+
+    def __init__(self, path: str, max_bytes: int = 0, backups: int = DEFAULT_BACKUPS,
+                 compress: bool = False, max_pending_bytes: int = MAX_PENDING_BYTES):
+        """
+        Open the log file (appending) and start the writer thread
+
+        Args:
+            path: Log file path; parent directories are created
+            max_bytes: Rotate when the file reaches this size (0: never rotate)
+            backups: Rotated segments to keep
+            compress: gzip rotated segments
+            max_pending_bytes: Queued text (in characters) at which write() waits for the writer
+
+        Raises:
+            OSError: If the file cannot be opened
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = max(backups, 1)
+        self.compress = compress
+        self.max_pending_bytes = max_pending_bytes
+
+        log_dir = os.path.dirname(os.path.abspath(path))
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        self._file = open(path, 'ab', buffering=0)
+        self._size = self._file.tell()
+
+        self._chunks = deque()
+        self._pending = 0
+        self._carry = ''  # unfinished escape sequence held back from the last batch
+        self._written = 0  # chunks written, for flush()
+        self._queued = 0
+        self._flush_requested = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self._has_data = threading.Condition(self._lock)
+        self._has_room = threading.Condition(self._lock)
+        self._progress = threading.Condition(self._lock)
+
+        self._thread = threading.Thread(target=self._run, daemon=True, name="SessionLogWriter")
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, text: str):
+        """Queue text for the log; waits only if max_pending_bytes is already queued"""
+        if not text:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            while self._pending >= self.max_pending_bytes and not self._closed:
+                self._has_room.wait()
+            self._chunks.append(text)
+            self._pending += len(text)
+            self._queued += 1
+            if self._pending >= WAKE_BYTES:
+                self._has_data.notify()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until everything queued so far is on disk
+
+        Returns:
+            False if the timeout expired first
+        """
+        with self._lock:
+            target = self._queued
+            self._flush_requested = True
+            self._has_data.notify()
+            return self._progress.wait_for(lambda: self._written >= target or self._closed, timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Write out what is queued and close the file (registered with atexit)"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._has_data.notify()
+            self._has_room.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._has_data.wait_for(
+                    lambda: self._pending >= WAKE_BYTES or self._flush_requested or self._closed,
+                    FLUSH_INTERVAL
+                )
+                self._flush_requested = False
+                chunks = list(self._chunks)
+                self._chunks.clear()
+                self._pending = 0
+                queued = self._queued
+                closing = self._closed
+                self._has_room.notify_all()
+
+            if chunks or (closing and self._carry):
+                try:
+                    self._write_batch(chunks, final=closing)
+                except Exception as e:
+                    # The log file is unusable (e.g. it could not be reopened after a
+                    # rotation): stop logging rather than leave writers waiting on a dead thread
+                    self._abandon(e)
+                    break
+            with self._lock:
+                self._written = queued
+                self._progress.notify_all()
+            if closing and not self._chunks:
+                break
+
+        try:
+            self._file.close()
+        except OSError:
+            pass
+
+    def _abandon(self, error: Exception):
+        """Drop queued and future output after a fatal write error"""
+        with self._lock:
+            self._closed = True
+            self._chunks.clear()
+            self._pending = 0
+            self._written = self._queued
+            self._has_room.notify_all()
+            self._progress.notify_all()
+        try:
+            sys.__stderr__.write(f"⚠️  Session log {self.path} disabled: {error}\n")
+        except Exception:
+            pass
+
+    def _write_batch(self, chunks: list, final: bool = False):
+        """Strip escapes from a batch of chunks and append it to the file in one write"""
+        parts = []
+        carry = self._carry
+        for text in chunks:
+            if carry:
+                text = carry + text
+                carry = ''
+            if '\x1b' in text:
+                partial = _PARTIAL_ESCAPE_RE.search(text, max(len(text) - 64, 0))
+                if partial is not None:
+                    # Finish it with the next chunk
+                    carry = text[partial.start():]
+                    text = text[:partial.start()]
+                text = ANSI_ESCAPE_RE.sub('', text)
+            # Per chunk, so ASCII chunks keep the fast encode path
+            parts.append(text.encode('utf-8', 'replace'))
+        if final and carry:
+            parts.append(ANSI_ESCAPE_RE.sub('', carry).encode('utf-8', 'replace'))
+            carry = ''
+        self._carry = carry
+        try:
+            self._size += write_parts(self._file, parts)
+            if self.max_bytes and self._size >= self.max_bytes:
+                self._rotate()
+        except OSError:
+            pass
+
+    def _segment(self, index: int) -> str:
+        return f"{self.path}.{index}.gz" if self.compress else f"{self.path}.{index}"
+
+    def _rotate(self):
+        """session.log -> session.log.1 (gzipped if compress), shifting older segments up"""
+        self._file.close()
+        try:
+            for index in range(self.backups - 1, 0, -1):
+                if os.path.exists(self._segment(index)):
+                    os.replace(self._segment(index), self._segment(index + 1))
+            if self.compress:
+                with open(self.path, 'rb') as src, gzip.open(self._segment(1), 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self._segment(1))
+        finally:
+            # Keep logging even if rotation failed (e.g. disk full)
+            self._file = open(self.path, 'ab', buffering=0)
+            self._size = self._file.tell()
+
+
+class TeeStream:
+    """
+    File-like wrapper that writes to the original stream AND to a session log.
+    The log copy is queued; ANSI escapes are stripped by the writer thread.
+    """
+
+    def __init__(self, original, log_writer: SessionLogWriter):
+        self._original = original
+        self._log_writer = log_writer
+
+    def write(self, data):
+        self._original.write(data)
+        if isinstance(data, str):
+            self._log_writer.write(data)
+            return len(data)
+        return 0
+
+    def flush(self):
+        self._original.flush()
+
+    def isatty(self):
+        try:
+            return self._original.isatty()
+        except Exception:
+            return False
+
+    def __getattr__(self, name):
+        return getattr(self._original, name)
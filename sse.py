@@ -0,0 +1,99 @@
+"""
+Incremental Server-Sent Events parser
+
+Streamable HTTP MCP servers may answer a POST with a text/event-stream that
+carries progress notifications before the final JSON-RPC response. SSEParser
+turns arbitrary text chunks (e.g. from httpx's iter_text/aiter_text) into
+complete events as soon as their terminating blank line arrives, following
+the WHATWG event-stream rules:
+
+- Lines end in CRLF, LF or CR (a CRLF split across chunks is handled)
+- Lines starting with ':' are comments (keep-alives)
+- "data" lines of one event are joined with newlines
+- "id" sets the last event ID (kept across events, used for Last-Event-ID)
+- "retry" sets the reconnection delay in milliseconds
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+@dataclass
+class SSEEvent:
+    """One dispatched event"""
+    event: str
+    data: str
+    id: Optional[str]
+
+
+class SSEParser:
+    """Feed text chunks in, get complete events out"""
+
+    def __init__(self, last_event_id: Optional[str] = None):
+        """
+        Initialize the parser
+
+        Args:
+            last_event_id: Event ID carried over from an earlier stream (resumption)
+        """
+        self.last_event_id = last_event_id
+        self.retry_ms: Optional[int] = None
+        self._buffer = ""
+        self._pending_cr = False
+        self._event_type = ""
+        self._data: List[str] = []
+
+    def feed(self, chunk: str) -> List[SSEEvent]:
+        """
+        Consume a chunk of the stream
+
+        Args:
+            chunk: Decoded text, split anywhere
+
+        Returns:
+            Events completed by this chunk, in order
+        """
+        if self._pending_cr and chunk.startswith("\n"):
+            # Second half of a CRLF whose CR ended the previous chunk
+            chunk = chunk[1:]
+        self._pending_cr = chunk.endswith("\r")
+
+        events: List[SSEEvent] = []
+        lines = (self._buffer + chunk).replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        self._buffer = lines.pop()  # incomplete last line (empty if the chunk ended a line)
+        for line in lines:
+            event = self._process_line(line)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def _process_line(self, line: str) -> Optional[SSEEvent]:
+        """Apply one complete line; returns an event when the line is the blank terminator"""
+        if not line:
+            return self._dispatch()
+        if line.startswith(":"):
+            return None
+
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._event_type = value
+        elif field == "id":
+            if "\0" not in value:
+                self.last_event_id = value
+        elif field == "retry":
+            if value.isdigit():
+                self.retry_ms = int(value)
+        return None
+
+    def _dispatch(self) -> Optional[SSEEvent]:
+        """Emit the buffered event (events without data are dropped, per spec)"""
+        data, event_type = self._data, self._event_type
+        self._data, self._event_type = [], ""
+        if not data:
+            return None
+        return SSEEvent(event=event_type or "message", data="\n".join(data), id=self.last_event_id)
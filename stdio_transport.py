@@ -0,0 +1,477 @@
+"""
+Stdio transport for MCP servers
+
+Owns the stdin/stdout pipes of a spawned MCP server process so that many
+JSON-RPC requests can be in flight at once:
+
+- Pipes are binary: messages are written as encoded JSON plus b"\n", and
+  stdout is read in large chunks and split into lines with memoryview
+  slices, so text decoding happens only inside codec.loads
+- Writes are serialised by a lock, one newline-delimited message at a time
+- A dedicated reader thread parses every stdout line exactly once
+- Responses resolve the pending request with the matching JSON-RPC id; an
+  error response with a null id goes to the oldest pending request
+- Notifications and server-initiated requests are dispatched separately,
+  so they can never be mistaken for the response to a request
+- A second reader thread keeps stderr drained, so a chatty server can never
+  block on a full pipe buffer; lines go into a bounded ring buffer (see
+  stderr_tail) and to the registered stderr handlers
+
+Request ids are rewritten to transport-private ids on the way in and restored
+on the way out, so callers (e.g. several Burp tabs replaying the same request)
+may reuse ids freely without their responses getting crossed.
+
+request_raw()/send_raw() do the same for messages that are already encoded
+(the proxy's passthrough path): the id is spliced into the bytes, and the
+matching response line is handed back as bytes with the caller's id spliced
+back in, so neither direction is decoded.
+"""
+
+import itertools
+import json
+import os
+import sys
+import threading
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import codec
+from mcp_logging import get_logger
+
+
+logger = get_logger("stdio")
+
+# Upper bound for one read from the server's stdout; large tool results arrive
+# in a few big reads instead of many pipe-buffer-sized ones
+READ_CHUNK_SIZE = 256 * 1024
+
+# Requested pipe capacity (Linux only; capped by /proc/sys/fs/pipe-max-size).
+# The default 64 KB pipe makes a 1 MB message cost ~16 writer/reader handoffs.
+PIPE_SIZE = 1024 * 1024
+
+
+class StdioTransport:
+    """Concurrent, id-correlated JSON-RPC transport over a child process's stdio"""
+
+    def __init__(self, process, debug: bool = False, stderr_buffer_lines: int = 200):
+        """
+        Initialize the transport
+
+        Args:
+            process: subprocess.Popen with binary stdin/stdout pipes
+            debug: Whether to print debug messages
+            stderr_buffer_lines: How many recent stderr lines to keep for diagnostics
+        """
+        self.process = process
+        self.debug = debug
+        self._stderr_buffer = deque(maxlen=max(0, stderr_buffer_lines))
+        self._write_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: Dict[int, tuple] = {}  # transport id -> (future, original id, original raw id)
+        self._raw_pending = 0  # entries from request_raw_async(); stdout lines are only scanned while > 0
+        self._ids = itertools.count(1)
+        self._notification_handlers: List[Callable[[Dict[str, Any]], None]] = []
+        self._stderr_handlers: List[Callable[[str], None]] = []
+        self._reader_thread: Optional[threading.Thread] = None
+        self._stderr_thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._stdout_closed = False
+
+    def _debug_print(self, msg, *args):
+        """Log debug message (lazily formatted) if debug mode is enabled"""
+        if self.debug:
+            logger.debug(msg, *args)
+
+    def start(self):
+        """Start the background stdout (and stderr, if piped) reader threads"""
+        if self._reader_thread is not None:
+            return
+        self._grow_pipes()
+        self._reader_thread = threading.Thread(
+            target=self._read_loop,
+            daemon=True,
+            name=f"MCPStdioReader-{self.process.pid}"
+        )
+        self._reader_thread.start()
+        if self.process.stderr is not None:
+            self._stderr_thread = threading.Thread(
+                target=self._stderr_loop,
+                daemon=True,
+                name=f"MCPStderrReader-{self.process.pid}"
+            )
+            self._stderr_thread.start()
+
+    def _grow_pipes(self):
+        """Best effort: enlarge the stdin/stdout pipes so large messages move in fewer handoffs"""
+        if not sys.platform.startswith("linux"):
+            return
+        import fcntl
+        setpipe_sz = getattr(fcntl, "F_SETPIPE_SZ", 1031)
+        for pipe in (self.process.stdin, self.process.stdout):
+            try:
+                fcntl.fcntl(pipe.fileno(), setpipe_sz, PIPE_SIZE)
+            except (OSError, ValueError, AttributeError):
+                pass
+
+    @property
+    def alive(self) -> bool:
+        """True while the transport is open and the child process is running"""
+        return not self._closed and not self._stdout_closed and self.process.poll() is None
+
+    def add_notification_handler(self, handler: Callable[[Dict[str, Any]], None]):
+        """Register a callback invoked (on the reader thread) for every server notification"""
+        self._notification_handlers.append(handler)
+
+    def add_stderr_handler(self, handler: Callable[[str], None]):
+        """Register a callback invoked (on the stderr thread) for every stderr line"""
+        self._stderr_handlers.append(handler)
+
+    def remove_stderr_handler(self, handler: Callable[[str], None]):
+        """Unregister a stderr callback"""
+        try:
+            self._stderr_handlers.remove(handler)
+        except ValueError:
+            pass
+
+    def send(self, message: Dict[str, Any]):
+        """
+        Write one message to the server without waiting for a reply (notifications)
+
+        Args:
+            message: JSON-RPC message dict
+        """
+        self._write_line(codec.dumps(message))
+
+    def request(self, message: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Send a JSON-RPC request and wait for the response with the same id
+
+        Args:
+            message: JSON-RPC request dict (must contain "id")
+            timeout: Seconds to wait for the response (None waits until the server exits)
+
+        Returns:
+            The response message, carrying the caller's original id
+        """
+        future = self.request_async(message)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self._forget(future)
+            raise RuntimeError(f"Timed out after {timeout}s waiting for response to '{message.get('method')}'")
+
+    def request_async(self, message: Dict[str, Any]) -> Future:
+        """
+        Send a JSON-RPC request and return a Future resolved with its response
+
+        Args:
+            message: JSON-RPC request dict (must contain "id")
+
+        Returns:
+            concurrent.futures.Future for the response message
+        """
+        transport_id, future = self._register(message.get("id"), None)
+        outgoing = dict(message)
+        outgoing["id"] = transport_id
+        self._write_registered(transport_id, codec.dumps(outgoing))
+        return future
+
+    def send_raw(self, data: bytes):
+        """
+        Write one already-encoded message without waiting for a reply (notifications)
+
+        Args:
+            data: A single encoded JSON-RPC message
+        """
+        self._write_line(self._one_line(data))
+
+    def request_raw(self, data: bytes, envelope: "codec.Envelope",
+                    timeout: Optional[float] = None) -> bytes:
+        """
+        Send an already-encoded request and wait for the encoded response
+
+        Args:
+            data: A single encoded JSON-RPC request
+            envelope: codec.scan_envelope(data); must carry an id
+            timeout: Seconds to wait for the response (None waits until the server exits)
+
+        Returns:
+            The response bytes, carrying the caller's original id
+        """
+        future = self.request_raw_async(data, envelope)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self._forget(future)
+            raise RuntimeError(f"Timed out after {timeout}s waiting for response to '{envelope.method}'")
+
+    def request_raw_async(self, data: bytes, envelope: "codec.Envelope") -> Future:
+        """
+        Send an already-encoded request and return a Future resolved with the encoded response
+
+        Args:
+            data: A single encoded JSON-RPC request
+            envelope: codec.scan_envelope(data); must carry an id
+
+        Returns:
+            concurrent.futures.Future for the response bytes
+        """
+        transport_id, future = self._register(None, envelope.id_raw)
+        outgoing = codec.splice_id(data, envelope.id_span, str(transport_id).encode("ascii"))
+        self._write_registered(transport_id, self._one_line(outgoing))
+        return future
+
+    @staticmethod
+    def _one_line(data: bytes) -> bytes:
+        """Fold a pretty-printed message onto one line (raw CR/LF only occur as JSON whitespace)"""
+        return bytes(data).replace(b"\r", b" ").replace(b"\n", b" ")
+
+    def _register(self, original_id: Any, original_raw_id: Optional[bytes]) -> tuple:
+        """Allocate a transport id and a pending Future for a new request"""
+        if not self.alive:
+            raise RuntimeError("MCP server process has exited")
+
+        transport_id = next(self._ids)
+        future: Future = Future()
+        with self._pending_lock:
+            self._pending[transport_id] = (future, original_id, original_raw_id)
+            if original_raw_id is not None:
+                self._raw_pending += 1
+
+        # The reader may have hit EOF before this request was registered
+        if self._stdout_closed:
+            with self._pending_lock:
+                self._take(transport_id)
+            raise RuntimeError("No response from server (stdout closed)")
+        return transport_id, future
+
+    def _write_registered(self, transport_id: int, line: bytes):
+        """Write a registered request, dropping its pending entry if the write fails"""
+        try:
+            self._write_line(line)
+        except Exception:
+            with self._pending_lock:
+                self._take(transport_id)
+            raise
+
+    def stderr_tail(self, lines: int = 20) -> List[str]:
+        """Return the last `lines` lines the server wrote to stderr"""
+        buffered = list(self._stderr_buffer)
+        return buffered[-lines:] if lines > 0 else []
+
+    def join_readers(self, timeout: Optional[float] = None):
+        """Wait for the reader threads to finish (after the process has exited)"""
+        for thread in (self._reader_thread, self._stderr_thread):
+            if thread is not None:
+                thread.join(timeout)
+
+    def close(self):
+        """Stop accepting requests and fail everything still pending"""
+        self._closed = True
+        self._fail_pending(RuntimeError("Stdio transport closed"))
+
+    def _write_line(self, line: bytes):
+        """Write a single newline-terminated message to the server's stdin"""
+        with self._write_lock:
+            if not hasattr(os, "writev"):
+                self.process.stdin.write(line + b"\n")
+                self.process.stdin.flush()
+                return
+            # One gathered syscall for message + newline: no copy of a large
+            # message, and the server never wakes up to a line without its end
+            fd = self.process.stdin.fileno()
+            parts = [memoryview(line), memoryview(b"\n")]
+            while parts:
+                written = os.writev(fd, parts)
+                while parts and written >= len(parts[0]):
+                    written -= len(parts[0])
+                    parts.pop(0)
+                if parts and written:
+                    parts[0] = parts[0][written:]
+
+    def cancel(self, future: Future):
+        """Abandon a request returned by request_async; a late response is dropped"""
+        self._forget(future)
+        future.cancel()
+
+    def _forget(self, future: Future):
+        """Drop a pending request (e.g. after a timeout) so a late response is ignored"""
+        with self._pending_lock:
+            for transport_id, (pending, _, _) in list(self._pending.items()):
+                if pending is future:
+                    self._take(transport_id)
+                    break
+
+    def _take(self, transport_id: Any) -> Optional[tuple]:
+        """Remove and return a pending entry (caller holds _pending_lock)"""
+        try:
+            entry = self._pending.pop(transport_id, None)
+        except TypeError:
+            return None  # unhashable id (e.g. a list): no request of ours
+        if entry is not None and entry[2] is not None:
+            self._raw_pending -= 1
+        return entry
+
+    def _fail_pending(self, error: Exception):
+        """Resolve every pending request with an error"""
+        with self._pending_lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._raw_pending = 0
+        for future, _, _ in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    def _read_loop(self):
+        """Reader thread: split stdout into lines, parse each line once and route it"""
+        stdout = self.process.stdout
+        readinto = getattr(stdout, "readinto1", stdout.readinto)
+        # Reads land in one reused chunk (a fresh 256 KB bytes per read would be
+        # an mmap/munmap pair for every small message)
+        chunk = bytearray(READ_CHUNK_SIZE)
+        chunk_view = memoryview(chunk)
+        buffer = bytearray()
+        try:
+            while True:
+                received = readinto(chunk_view)
+                if not received:
+                    break
+                # Only the new bytes can contain a newline the last pass has not seen
+                search_from = len(buffer)
+                buffer += chunk_view[:received]
+                consumed = 0
+                with memoryview(buffer) as view:
+                    while True:
+                        newline = buffer.find(b"\n", search_from)
+                        if newline < 0:
+                            break
+                        try:
+                            self._handle_line(view[consumed:newline])
+                        except Exception as e:
+                            # One bad line must not stop the reader (and with it the transport)
+                            self._debug_print(f"⚠️  [STDIO DEBUG] Failed to handle line from server: {e}")
+                        consumed = search_from = newline + 1
+                del buffer[:consumed]
+        except Exception as e:
+            self._debug_print(f"❌ [STDIO DEBUG] Reader thread error: {e}")
+        finally:
+            self._stdout_closed = True
+            self._fail_pending(RuntimeError("No response from server (stdout closed)"))
+
+    def _handle_line(self, line: Union[bytes, memoryview]):
+        """
+        Route one stdout line
+
+        `line` may be a view into the reader's buffer, valid only during this
+        call: everything kept from it (futures, handlers) must be a copy.
+        """
+        if self._raw_pending and self._resolve_raw(line):
+            return
+        try:
+            # Surrounding whitespace (e.g. the CR of CRLF framing) is valid JSON whitespace
+            message = codec.loads(line)
+        except json.JSONDecodeError:
+            if bytes(line).strip():
+                self._debug_print("⚠️  [STDIO DEBUG] Ignoring non-JSON line from server: %r", bytes(line[:200]))
+            return
+        if isinstance(message, list):
+            for item in message:
+                self._dispatch(item)
+        else:
+            self._dispatch(message)
+
+    def _stderr_loop(self):
+        """Stderr thread: keep the pipe drained and pass each line to the handlers"""
+        try:
+            for raw_line in iter(self.process.stderr.readline, b''):
+                line = raw_line.decode("utf-8", "replace").rstrip("\r\n")
+                self._stderr_buffer.append(line)
+                for handler in list(self._stderr_handlers):
+                    try:
+                        handler(line)
+                    except Exception as e:
+                        self._debug_print(f"⚠️  [STDIO DEBUG] Stderr handler failed: {e}")
+        except Exception as e:
+            self._debug_print(f"❌ [STDIO DEBUG] Stderr thread error: {e}")
+
+    def _resolve_raw(self, data: Union[bytes, memoryview]) -> bool:
+        """
+        Hand a response line to its request_raw() caller without decoding it
+
+        Returns:
+            True if the line was consumed; False if it needs the parsed path
+        """
+        envelope = codec.scan_envelope(data)
+        if envelope is None or not envelope.is_response or envelope.method is not None:
+            return False
+        if envelope.id_raw is None:
+            return False
+        try:
+            transport_id = int(envelope.id_raw)
+        except (TypeError, ValueError):
+            return False
+        with self._pending_lock:
+            entry = self._pending.get(transport_id)
+            if entry is None or entry[2] is None:
+                return False
+            self._take(transport_id)
+
+        future, _, original_raw_id = entry
+        if not future.done():
+            future.set_result(codec.splice_id(data, envelope.id_span, original_raw_id))
+        return True
+
+    def _dispatch(self, message: Any):
+        """Route one parsed message to a pending request or the notification handlers"""
+        if not isinstance(message, dict):
+            return
+
+        if "method" in message:
+            if "id" in message:
+                self._handle_server_request(message)
+            else:
+                for handler in list(self._notification_handlers):
+                    try:
+                        handler(message)
+                    except Exception as e:
+                        self._debug_print(f"⚠️  [STDIO DEBUG] Notification handler failed: {e}")
+            return
+
+        with self._pending_lock:
+            if message.get("id") is None and "error" in message and self._pending:
+                # An error the server could not tie to a request (e.g. a parse error)
+                # carries a null id; like a plain readline() would, hand it to the
+                # oldest request still waiting rather than leave that caller hanging
+                entry = self._take(next(iter(self._pending)))
+            else:
+                entry = self._take(message.get("id"))
+        if entry is None:
+            self._debug_print(f"⚠️  [STDIO DEBUG] Dropping response with unknown id: {message.get('id')!r}")
+            return
+
+        future, original_id, original_raw_id = entry
+        if original_raw_id is not None:
+            # A request_raw() caller whose response could not be routed from a scan
+            message["id"] = codec.loads(original_raw_id)
+            if not future.done():
+                future.set_result(codec.dumps(message))
+            return
+        message["id"] = original_id
+        if not future.done():
+            future.set_result(message)
+
+    def _handle_server_request(self, message: Dict[str, Any]):
+        """Answer server-initiated requests: ping is supported, everything else is refused"""
+        if message.get("method") == "ping":
+            reply = {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+        else:
+            reply = {
+                "jsonrpc": "2.0",
+                "id": message["id"],
+                "error": {"code": -32601, "message": f"Method not supported by client: {message.get('method')}"}
+            }
+        try:
+            self.send(reply)
+        except Exception as e:
+            self._debug_print(f"⚠️  [STDIO DEBUG] Could not answer server request: {e}")
@@ -0,0 +1,131 @@
+"""
+Persistent tools/list cache for the MCP Client and Proxy
+
+Enumerating tools can take seconds on large servers, and every session (and
+every "List tools again") used to start from scratch. Results are cached on
+disk, one JSON file per server, keyed by a fingerprint of the server's launch
+configuration (command, args, url, env, headers). Editing any of those in
+mcp_config.json therefore starts a fresh cache entry automatically, and two
+configs that differ only in their auth headers never share a tool list.
+
+Entries expire after a TTL and are dropped early when the server sends
+notifications/tools/list_changed (stdio servers at any time; direct-remote
+servers only on the SSE stream of a response, as no standalone GET stream
+is opened). The cache directory defaults to
+~/.cache/appsecco-mcp-client and can be moved with MCP_CLIENT_CACHE_DIR.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def cache_root() -> str:
+    """Base directory for everything the client persists between runs"""
+    return os.environ.get("MCP_CLIENT_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "appsecco-mcp-client"
+    )
+
+
+def atomic_write_json(path: str, data: Any, mode: int = 0o644):
+    """Write JSON to `path` via a temp file + rename, so readers never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def server_fingerprint(server_config: Dict[str, Any]) -> str:
+    """
+    Stable hash of the parts of a server config that determine what it exposes
+
+    Args:
+        server_config: Server configuration from mcp_config.json
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    identity = {
+        "command": server_config.get("command", ""),
+        "args": server_config.get("args", []),
+        "url": server_config.get("url", ""),
+        "env": server_config.get("env", {}),
+        # Auth headers pick the identity, and with it the tools a server exposes
+        "headers": server_config.get("headers", {}),
+    }
+    encoded = json.dumps(identity, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ToolsCache:
+    """On-disk cache of tools/list results with TTL expiry and explicit invalidation"""
+
+    def __init__(self, ttl: float = 3600.0, cache_dir: Optional[str] = None):
+        """
+        Initialize the cache
+
+        Args:
+            ttl: Seconds an entry is considered fresh
+            cache_dir: Directory for entries (default: <cache root>/tools)
+        """
+        self.ttl = ttl
+        self.cache_dir = cache_dir or os.path.join(cache_root(), "tools")
+        self._lock = threading.Lock()
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, f"{fingerprint}.json")
+
+    def get(self, fingerprint: str) -> Optional[Tuple[List[Dict[str, Any]], bool]]:
+        """
+        Look up a cached tool list
+
+        Args:
+            fingerprint: server_fingerprint() of the server
+
+        Returns:
+            (tools, fresh) or None if nothing usable is cached; `fresh` is False
+            once the entry is older than the TTL or was invalidated
+        """
+        try:
+            with open(self._path(fingerprint), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            tools = entry["tools"]
+            fetched_at = float(entry["fetched_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if not isinstance(tools, list):
+            return None
+        fresh = not entry.get("invalidated") and (time.time() - fetched_at) < self.ttl
+        return tools, fresh
+
+    def put(self, fingerprint: str, tools: List[Dict[str, Any]]):
+        """Store a freshly fetched tool list"""
+        with self._lock:
+            try:
+                atomic_write_json(self._path(fingerprint), {"fetched_at": time.time(), "tools": tools})
+            except OSError:
+                pass
+
+    def invalidate(self, fingerprint: str):
+        """
+        Mark an entry stale (e.g. on notifications/tools/list_changed)
+
+        The tools are kept so stale-while-revalidate can still show them.
+        """
+        with self._lock:
+            cached = self.get(fingerprint)
+            if cached is None:
+                return
+            try:
+                atomic_write_json(self._path(fingerprint), {
+                    "fetched_at": 0,
+                    "invalidated": True,
+                    "tools": cached[0]
+                })
+            except OSError:
+                pass